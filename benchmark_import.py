@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+CSV Import Benchmark for TimeTracker Pro
+Times the sequential importer against the process pool importer for
+increasing worker counts on a generated CSV file
+"""
+
+import os
+import sys
+import csv
+import time
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+from main import CsvImporter
+
+def write_sample_csv(filename, rows):
+    """Write a CSV export with unique, valid entries (some memos span lines)"""
+    start = datetime(2015, 1, 1, 8, 0, 0)
+    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['project', 'memo', 'start_time', 'stop_time', 'duration', 'duration_seconds', 'invoiced'])
+        for i in range(rows):
+            begin = start + timedelta(minutes=15 * i)
+            seconds = 300 + (i * 37) % 7200
+            memo = f"Task {i}\nfollow-up, \"notes\"" if i % 10 == 0 else f"Task {i}"
+            writer.writerow([
+                f"Project {i % 25}",
+                memo,
+                begin.strftime("%Y-%m-%d %H:%M:%S"),
+                (begin + timedelta(seconds=seconds)).strftime("%Y-%m-%d %H:%M:%S"),
+                f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}",
+                seconds,
+                'Yes' if i % 3 == 0 else 'No'
+            ])
+
+def time_import(filename, workers):
+    """Return (seconds taken, entries imported) for one import run"""
+    started = time.perf_counter()
+    importer = CsvImporter(filename).run(workers=workers)
+    return time.perf_counter() - started, len(importer.entries)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sequential vs. parallel CSV import")
+    parser.add_argument('--rows', type=int, default=1000000, help="rows in the generated CSV (default: 1,000,000)")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1, help="largest worker count to try")
+    args = parser.parse_args()
+
+    # Always take the parallel path when workers > 1, whatever the file size
+    CsvImporter.PARALLEL_MIN_BYTES = 0
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(temp_dir, 'benchmark.csv')
+        print(f"🔄 Writing {args.rows:,} rows...")
+        write_sample_csv(filename, args.rows)
+        print(f"✅ {os.path.getsize(filename) / (1024 * 1024):.1f} MB written")
+        print(f"   CPU cores: {os.cpu_count()}")
+        print()
+
+        baseline, expected = time_import(filename, workers=1)
+        print(f"{'Workers':>8} {'Seconds':>10} {'Rows/s':>12} {'Speedup':>9}")
+        print(f"{1:>8} {baseline:>10.2f} {args.rows / baseline:>12,.0f} {1.0:>8.2f}x")
+
+        workers = 2
+        while workers <= args.max_workers:
+            elapsed, imported = time_import(filename, workers)
+            if imported != expected:
+                print(f"❌ {workers} workers imported {imported:,} entries, expected {expected:,}")
+                return 1
+            print(f"{workers:>8} {elapsed:>10.2f} {args.rows / elapsed:>12,.0f} {baseline / elapsed:>8.2f}x")
+            workers *= 2
+        return 0
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
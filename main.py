@@ -2,10 +2,39 @@ import tkinter as tk
 from tkinter import messagebox, filedialog, ttk
 import json
 import os
+import sys
 import csv
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import shutil
-from typing import List, Dict, Any
+import io
+import re
+import html
+import glob
+import struct
+import zipfile
+import zlib
+import uuid
+import queue
+import itertools
+import threading
+import subprocess
+import time
+import multiprocessing
+import concurrent.futures
+from collections import OrderedDict
+from decimal import Decimal, ROUND_HALF_UP
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+
+try:
+    import numpy as np
+except ImportError:  # Optional: vectorized report aggregation
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional: Parquet / Arrow IPC analytics export
+    pa = pq = None
 
 class DatePicker:
     """Custom date picker widget for better date selection"""
@@ -315,7 +344,2822 @@ class DatePicker:
             self.calendar_popup.destroy()
             self.calendar_popup = None
 
+class ChangeSet:
+    """Describes the entries affected by one committed batch"""
+
+    def __init__(self, added=None, updated=None, deleted=None, reloaded=False, sequence=0):
+        self.added = added or []          # new entries
+        self.updated = updated or []      # (old_entry, new_entry) pairs
+        self.deleted = deleted or []      # removed entries
+        self.reloaded = reloaded          # True when the whole dataset was replaced
+                                          # (deleted then lists the entries it dropped)
+        self.sequence = sequence          # store sequence number assigned to the deletions
+
+    def __bool__(self):
+        return bool(self.reloaded or self.added or self.updated or self.deleted)
+
+    def __len__(self):
+        return len(self.added) + len(self.updated) + len(self.deleted)
+
+
+class EntryBatch:
+    """Collects entry mutations and applies them to an EntryStore in one commit.
+
+    Use as a context manager to commit on success and discard on error:
+
+        with store.begin() as batch:
+            batch.add(entry)
+            batch.delete(entry_id)
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.added = []
+        self.updates = {}
+        self.deleted = set()
+        self.closed = False
+
+    def add(self, entry: Dict[str, Any]) -> str:
+        """Queue a new entry; returns the ID it will be stored under"""
+        entry = dict(entry)
+        if not entry.get('id'):
+            entry['id'] = EntryStore.new_entry_id()
+        self.added.append(entry)
+        return entry['id']
+
+    def add_many(self, entries: Iterable[Dict[str, Any]]) -> List[str]:
+        return [self.add(entry) for entry in entries]
+
+    def update(self, entry_id: str, fields: Dict[str, Any]):
+        """Queue field changes for an existing entry"""
+        self.updates.setdefault(entry_id, {}).update(fields)
+
+    def update_many(self, updates: Dict[str, Dict[str, Any]]):
+        for entry_id, fields in updates.items():
+            self.update(entry_id, fields)
+
+    def delete(self, entry_id: str):
+        self.deleted.add(entry_id)
+
+    def delete_many(self, entry_ids: Iterable[str]):
+        self.deleted.update(entry_ids)
+
+    def commit(self) -> ChangeSet:
+        """Validate and apply all queued changes with a single write"""
+        if self.closed:
+            raise RuntimeError("Batch already closed")
+        self.closed = True
+        return self.store._commit(self)
+
+    def rollback(self):
+        """Discard all queued changes"""
+        self.closed = True
+        self.added.clear()
+        self.updates.clear()
+        self.deleted.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            if not self.closed:
+                self.commit()
+        else:
+            self.rollback()
+        return False
+
+
+class EntryStore:
+    """In-memory time entry store backed by the JSON data file.
+
+    Entries are cached and only re-read when the file changes on disk.
+    Mutations go through batches so each operation validates, writes,
+    backs up and notifies listeners exactly once.
+    """
+
+    def __init__(self, data_file: str, backup_callback=None):
+        self.data_file = data_file
+        self.backup_callback = backup_callback
+        self._entries = []
+        self._index = {}
+        self._signature = None
+        self._listeners = []
+        self.version = 0          # bumped on every change notification
+        self.sequence = 0         # highest mutation sequence ('seq') seen
+
+    @staticmethod
+    def new_entry_id() -> str:
+        """Generate a unique, stable identifier for a time entry"""
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def normalize_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate an entry and coerce its fields to their stored types"""
+        if not isinstance(entry, dict):
+            raise ValueError("Entry must be a mapping")
+        entry = dict(entry)
+
+        project = str(entry.get('project') or '').strip()
+        if not project:
+            raise ValueError("Entry is missing a project")
+        entry['project'] = project
+
+        seconds = entry.get('duration_seconds')
+        if seconds in (None, ''):
+            seconds = TimeTrackerApp._parse_duration_to_seconds(str(entry.get('duration') or ''))
+        try:
+            seconds = int(float(seconds))
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid duration_seconds: {seconds!r}")
+        if seconds < 0:
+            raise ValueError("Duration cannot be negative")
+        entry['duration_seconds'] = seconds
+        if not entry.get('duration'):
+            entry['duration'] = TimeTrackerApp.format_seconds(seconds)
+
+        invoiced = str(entry.get('invoiced') or 'No').strip().lower()
+        entry['invoiced'] = 'Yes' if invoiced in ('yes', 'y', 'true', '1') else 'No'
+        entry.setdefault('project_id', None)
+
+        if not entry.get('id'):
+            entry['id'] = EntryStore.new_entry_id()
+        return entry
+
+    # Listeners -------------------------------------------------------
+    def subscribe(self, listener):
+        """Register a callable invoked with a ChangeSet after each commit"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, changes: ChangeSet):
+        self.version += 1
+        for listener in list(self._listeners):
+            listener(changes)
+
+    # Reading ---------------------------------------------------------
+    def file_signature(self):
+        """Return (mtime_ns, size) of the data file, or None if it is missing"""
+        try:
+            st = os.stat(self.data_file)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Return the cached entries, re-reading the file if it changed.
+
+        The returned list is owned by the store and must not be modified.
+        """
+        signature = self.file_signature()
+        if signature is not None and signature == self._signature:
+            return self._entries
+
+        if signature is None:
+            data = []
+        else:
+            try:
+                with open(self.data_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except ValueError:
+                data = []
+            if not isinstance(data, list):
+                data = []
+        data = [entry for entry in data if isinstance(entry, dict)]
+
+        # Persist newly assigned IDs so they stay stable between loads
+        missing_ids = False
+        for entry in data:
+            if not entry.get('id'):
+                entry['id'] = self.new_entry_id()
+                missing_ids = True
+        if missing_ids:
+            self._write(data)
+            signature = self._signature
+
+        previous = self._entries
+        self._set_entries(data)
+        self._signature = signature
+        if previous or data:
+            dropped = [entry for entry in previous if entry['id'] not in self._index]
+            self._notify(ChangeSet(deleted=dropped, reloaded=True,
+                                   sequence=self._next_sequence() if dropped else 0))
+        return self._entries
+
+    def data_version(self):
+        """Key identifying the current data: the mutation counter plus the
+        file signature, so edits made outside this process are noticed
+        without re-reading the file."""
+        return (self.version, self.file_signature())
+
+    @property
+    def loaded_signature(self):
+        """Signature of the data file the cached entries were read from"""
+        return self._signature
+
+    def get(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        self.load()
+        position = self._index.get(entry_id)
+        return self._entries[position] if position is not None else None
+
+    def __len__(self):
+        return len(self.load())
+
+    def iter_entries(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over the current entries without copying them.
+
+        Commits replace the entry list rather than modifying it, so the
+        iterator keeps walking the snapshot it started from and is safe
+        to consume on a worker thread. Entries must not be modified.
+        """
+        return iter(self.load())
+
+    # Writing ---------------------------------------------------------
+    def _set_entries(self, data):
+        self._entries = data
+        self._index = {entry['id']: i for i, entry in enumerate(data)}
+        self.sequence = max(self.sequence, max((entry.get('seq') or 0 for entry in data), default=0))
+
+    def _next_sequence(self) -> int:
+        """Next mutation sequence number.
+
+        Sequence numbers are at least the current time in microseconds, so
+        they keep increasing even after the newest entry is deleted or the
+        data file is replaced by an older copy.
+        """
+        self.sequence = max(self.sequence + 1, int(time.time() * 1000000))
+        return self.sequence
+
+    def _stamp(self, entries, previous):
+        """Give added entries, and entries that differ from previous, a new 'seq'"""
+        for entry in entries:
+            old = previous.get(entry['id'])
+            if old is None or {**entry, 'seq': None} != {**old, 'seq': None}:
+                entry['seq'] = self._next_sequence()
+            else:
+                entry['seq'] = old.get('seq')
+
+    def _write(self, data):
+        """Atomically write entries to the data file"""
+        tmp_file = f"{self.data_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_file, self.data_file)
+        self._signature = self.file_signature()
+
+    def _persist(self, data, changes: ChangeSet) -> ChangeSet:
+        if changes.deleted:
+            changes.sequence = self._next_sequence()
+        self._write(data)
+        self._set_entries(data)
+        if self.backup_callback:
+            self.backup_callback()
+        self._notify(changes)
+        return changes
+
+    def begin(self) -> EntryBatch:
+        """Start a batch of mutations"""
+        return EntryBatch(self)
+
+    def replace_all(self, data: List[Dict[str, Any]]) -> ChangeSet:
+        """Replace the whole dataset (used by legacy save paths and restores)"""
+        data = [dict(entry) for entry in data if isinstance(entry, dict)]
+        for entry in data:
+            if not entry.get('id'):
+                entry['id'] = self.new_entry_id()
+        current = self.load()
+        self._stamp(data, {entry['id']: entry for entry in current})
+        kept = {entry['id'] for entry in data}
+        return self._persist(data, ChangeSet(deleted=[entry for entry in current if entry['id'] not in kept], reloaded=True))
+
+    def _commit(self, batch: EntryBatch) -> ChangeSet:
+        current = self.load()
+
+        # Validate everything before touching the file
+        errors = []
+        added = []
+        for entry in batch.added:
+            try:
+                added.append(self.normalize_entry(entry))
+            except ValueError as e:
+                errors.append(f"{entry.get('project', '?')} {entry.get('start_time', '')}: {e}")
+        updated = {}
+        for entry_id, fields in batch.updates.items():
+            if entry_id in batch.deleted:
+                continue
+            position = self._index.get(entry_id)
+            if position is None:
+                errors.append(f"Unknown entry ID: {entry_id}")
+                continue
+            try:
+                new_entry = self.normalize_entry({**current[position], **fields, 'id': entry_id})
+            except ValueError as e:
+                errors.append(f"{entry_id}: {e}")
+                continue
+            updated[entry_id] = new_entry
+        missing = [entry_id for entry_id in batch.deleted if entry_id not in self._index]
+        errors.extend(f"Unknown entry ID: {entry_id}" for entry_id in missing)
+        if errors:
+            raise ValueError("; ".join(errors[:10]) + (f" (+{len(errors) - 10} more)" if len(errors) > 10 else ""))
+
+        self._stamp(added, {})
+        self._stamp(updated.values(), {entry_id: current[self._index[entry_id]] for entry_id in updated})
+
+        changes = ChangeSet()
+        data = []
+        for entry in current:
+            entry_id = entry['id']
+            if entry_id in batch.deleted:
+                changes.deleted.append(entry)
+            elif entry_id in updated:
+                data.append(updated[entry_id])
+                changes.updated.append((entry, updated[entry_id]))
+            else:
+                data.append(entry)
+        data.extend(added)
+        changes.added = added
+
+        if not changes:
+            return changes
+        return self._persist(data, changes)
+
+
+class DailyRollup:
+    """Pre-aggregated totals per (day, project, project_id, invoiced).
+
+    The rollup is kept up to date from EntryStore change notifications and
+    persisted next to the data file, so reports cost time proportional to
+    the number of days and projects rather than the number of entries.
+    Only mutations that change a cell mark it dirty; with schedule_save
+    (called with flush, e.g. through Tk's after) the rewrite of the file is
+    deferred and coalesced, otherwise it happens at once. A file saved
+    before the latest commit records an older data file signature and is
+    rebuilt on the next start, so a deferred save loses nothing.
+    """
+
+    FORMAT = 1
+
+    def __init__(self, store: EntryStore, rollup_file: str, schedule_save=None):
+        self.store = store
+        self.rollup_file = rollup_file
+        self.schedule_save = schedule_save
+        self.cells = {}          # (day, project, project_id, invoiced) -> [seconds, count]
+        self._source = None      # data file signature the cells reflect
+        self._saved_source = None
+        self.dirty = False       # cells changed since the last save
+        self._load_file()
+        self._saved_source = self._source
+        store.subscribe(self._on_change)
+
+    @staticmethod
+    def entry_day(entry: Dict[str, Any]) -> str:
+        """Return the entry's start day as YYYY-MM-DD, or '' if unknown"""
+        start = entry.get('start_time') or ''
+        day = start[:10]
+        try:
+            date.fromisoformat(day)
+        except (TypeError, ValueError):
+            return ''
+        return day
+
+    @classmethod
+    def entry_key(cls, entry: Dict[str, Any]):
+        return (
+            cls.entry_day(entry),
+            entry.get('project', 'Unknown'),
+            entry.get('project_id'),
+            entry.get('invoiced') == 'Yes'
+        )
+
+    @staticmethod
+    def entry_seconds(entry: Dict[str, Any]) -> int:
+        try:
+            return int(entry.get('duration_seconds') or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    def add_entry(self, entry: Dict[str, Any], sign: int = 1):
+        """Add (sign=1) or remove (sign=-1) one entry's contribution"""
+        key = self.entry_key(entry)
+        cell = self.cells.get(key)
+        if cell is None:
+            cell = self.cells[key] = [0, 0]
+        cell[0] += sign * self.entry_seconds(entry)
+        cell[1] += sign
+        if cell[1] <= 0:
+            del self.cells[key]
+
+    def rebuild(self, entries: Iterable[Dict[str, Any]]):
+        """Recompute all cells from scratch"""
+        self.cells = {}
+        for entry in entries:
+            self.add_entry(entry)
+        self._source = self.store.loaded_signature
+        self.save()
+
+    def verify(self) -> bool:
+        """Return True if the cells match a full recompute from the entries"""
+        expected = {}
+        for entry in self.store.load():
+            cell = expected.setdefault(self.entry_key(entry), [0, 0])
+            cell[0] += self.entry_seconds(entry)
+            cell[1] += 1
+        return expected == self.cells
+
+    def sync(self):
+        """Make sure the rollup reflects the data file on disk.
+
+        When the persisted rollup matches the file, nothing is read.
+        """
+        if self._source is not None and self._source == self.store.file_signature():
+            return
+        entries = self.store.load()
+        if self._source != self.store.loaded_signature:
+            self.rebuild(entries)
+
+    def _on_change(self, changes: ChangeSet):
+        if changes.reloaded:
+            if self._source != self.store.loaded_signature:
+                self.rebuild(self.store.load())
+            return
+        changed = bool(changes.deleted or changes.added)
+        for entry in changes.deleted:
+            self.add_entry(entry, -1)
+        for old_entry, new_entry in changes.updated:
+            if (self.entry_key(old_entry) == self.entry_key(new_entry)
+                    and self.entry_seconds(old_entry) == self.entry_seconds(new_entry)):
+                continue    # e.g. a memo edit
+            self.add_entry(old_entry, -1)
+            self.add_entry(new_entry)
+            changed = True
+        for entry in changes.added:
+            self.add_entry(entry)
+        self._source = self.store.loaded_signature
+        if changed:
+            self._mark_dirty()
+
+    def _mark_dirty(self):
+        if self.dirty:
+            return      # a save is already pending
+        self.dirty = True
+        if self.schedule_save is None:
+            self.save()
+        else:
+            self.schedule_save(self.flush)
+
+    def flush(self):
+        """Save pending changes, including a newer data file signature alone"""
+        if self.dirty or self._source != self._saved_source:
+            self.save()
+
+    def rows(self, start: Optional[str] = None, end: Optional[str] = None):
+        """Yield (day, project, project_id, invoiced, seconds, count) tuples,
+        optionally only for days between start and end (YYYY-MM-DD, inclusive)"""
+        ranged = start is not None or end is not None
+        for (day, project, project_id, invoiced), (seconds, count) in self.cells.items():
+            if ranged and not (day and (start is None or day >= start) and (end is None or day <= end)):
+                continue
+            yield day, project, project_id, invoiced, seconds, count
+
+    # Persistence -----------------------------------------------------
+    def _load_file(self):
+        try:
+            with open(self.rollup_file, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            if payload.get('format') != self.FORMAT:
+                return
+            self.cells = {
+                (day, project, project_id, bool(invoiced)): [int(seconds), int(count)]
+                for day, project, project_id, invoiced, seconds, count in payload.get('cells', [])
+            }
+            source = payload.get('source')
+            self._source = tuple(source) if source else None
+        except (OSError, ValueError, TypeError, AttributeError):
+            self.cells = {}
+            self._source = None
+
+    def save(self):
+        """Persist the rollup; failures only cost a rebuild on next start"""
+        payload = {
+            'format': self.FORMAT,
+            'source': list(self._source) if self._source else None,
+            'cells': [list(row) for row in self.rows()]
+        }
+        try:
+            tmp_file = f"{self.rollup_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_file, self.rollup_file)
+        except OSError:
+            pass
+        self.dirty = False
+        self._saved_source = self._source
+
+
+class ReportEngine:
+    """Single-pass aggregation shared by all report views.
+
+    Input is a stream of facts shaped like DailyRollup rows:
+    (day, project, project_id, invoiced, seconds, count). Several named
+    groupings are computed in one pass, each over any combination of the
+    GROUP_KEYS, with the requested measures:
+
+        sum      -> 'seconds'
+        count    -> 'count'
+        min/max  -> 'min' / 'max' (per entry; needs entry facts)
+        split    -> 'invoiced_seconds', 'uninvoiced_seconds',
+                    'invoiced_count', 'uninvoiced_count'
+        revenue  -> 'revenue' as {currency: amount} (needs rates), plus
+                    'invoiced_revenue' / 'uninvoiced_revenue' with split
+
+    Amounts in different currencies are never added together.
+
+    aggregate() and time_series() accept a progress callable which is
+    called with the number of facts read so far every PROGRESS_EVERY facts.
+    """
+
+    PROGRESS_EVERY = 5000
+
+    GROUP_KEYS = ('project', 'project_id', 'day', 'week', 'month', 'quarter', 'year', 'invoiced')
+    GRANULARITIES = ('day', 'week', 'month', 'quarter', 'year')
+    MEASURES = ('sum', 'count', 'min', 'max', 'split', 'revenue')
+
+    @staticmethod
+    def entry_facts(entries: Iterable[Dict[str, Any]]):
+        """Turn time entries into facts (count 1 each)"""
+        for entry in entries:
+            day, project, project_id, invoiced = DailyRollup.entry_key(entry)
+            yield day, project, project_id, invoiced, DailyRollup.entry_seconds(entry), 1
+
+    @staticmethod
+    def rollup_facts(rollup: DailyRollup, start: Optional[str] = None, end: Optional[str] = None):
+        """Facts from the pre-aggregated daily rollup, optionally for a day range"""
+        rollup.sync()
+        return rollup.rows(start, end)
+
+    @staticmethod
+    def _day_parts(day: str):
+        """Return {granularity: label} for a YYYY-MM-DD day"""
+        if not day:
+            return {'week': '', 'month': '', 'quarter': '', 'year': ''}
+        return {
+            'week': ReportEngine.bucket_label(date.fromisoformat(day), 'week'),
+            'month': day[:7],
+            'quarter': f"{day[:4]}-Q{(int(day[5:7]) - 1) // 3 + 1}",
+            'year': day[:4]
+        }
+
+    # Calendar buckets are plain integers so ranges can be walked directly:
+    # day ordinals, ISO weeks since 0001-01-01 (a Monday), months, quarters
+    # and years counted from year 0.
+    @staticmethod
+    def bucket_index(d: date, granularity: str) -> int:
+        if granularity == 'day':
+            return d.toordinal()
+        if granularity == 'week':
+            return (d.toordinal() - 1) // 7
+        if granularity == 'month':
+            return d.year * 12 + d.month - 1
+        if granularity == 'quarter':
+            return d.year * 4 + (d.month - 1) // 3
+        if granularity == 'year':
+            return d.year
+        raise ValueError(f"Unknown granularity: {granularity}")
+
+    @staticmethod
+    def bucket_start(index: int, granularity: str) -> date:
+        if granularity == 'day':
+            return date.fromordinal(index)
+        if granularity == 'week':
+            return date.fromordinal(index * 7 + 1)
+        if granularity == 'month':
+            return date(index // 12, index % 12 + 1, 1)
+        if granularity == 'quarter':
+            return date(index // 4, (index % 4) * 3 + 1, 1)
+        if granularity == 'year':
+            return date(index, 1, 1)
+        raise ValueError(f"Unknown granularity: {granularity}")
+
+    @staticmethod
+    def bucket_label(d: date, granularity: str) -> str:
+        if granularity == 'day':
+            return d.isoformat()
+        if granularity == 'week':
+            year, week, _ = d.isocalendar()
+            return f"{year}-W{week:02d}"
+        if granularity == 'month':
+            return f"{d.year:04d}-{d.month:02d}"
+        if granularity == 'quarter':
+            return f"{d.year:04d}-Q{(d.month - 1) // 3 + 1}"
+        if granularity == 'year':
+            return f"{d.year:04d}"
+        raise ValueError(f"Unknown granularity: {granularity}")
+
+    @classmethod
+    def time_series(cls, facts, granularity: str, start: date, end: date, measures=('sum', 'count', 'split'), rates=None, project_ids=None, progress=None):
+        """Aggregate facts into calendar-aligned buckets covering start..end.
+
+        Returns [(label, bucket start date, measures)] in chronological
+        order, including empty buckets, computed in one pass over facts.
+        """
+        if granularity not in cls.GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        if start > end:
+            raise ValueError("Start date cannot be after end date")
+        first_day, last_day = start.isoformat(), end.isoformat()
+        if progress:
+            facts = cls._reporting(facts, progress)
+        in_range = (fact for fact in facts if fact[0] and first_day <= fact[0] <= last_day)
+        groups = cls.aggregate(in_range, {'series': (granularity,)}, measures=measures, rates=rates, project_ids=project_ids)['series']
+
+        series = []
+        for index in range(cls.bucket_index(start, granularity), cls.bucket_index(end, granularity) + 1):
+            bucket_start = cls.bucket_start(index, granularity)
+            label = cls.bucket_label(bucket_start, granularity)
+            series.append((label, bucket_start, groups.get((label,)) or cls.new_bucket(set(measures))))
+        return series
+
+    @classmethod
+    def aggregate(cls, facts, groupings: Dict[str, Iterable[str]], measures=('sum', 'count', 'split'), rates=None, project_ids=None, progress=None):
+        """Aggregate facts into {grouping name: {key tuple: measures}}.
+
+        rates maps project_id -> (hourly rate, currency) for 'revenue';
+        project_ids maps project names to IDs for facts recorded without one.
+        """
+        measures, groupings = cls._validate(measures, groupings, rates)
+
+        want_min_max = 'min' in measures or 'max' in measures
+        want_split = 'split' in measures
+        want_revenue = 'revenue' in measures
+        needs_day_parts = any(key in ('week', 'month', 'quarter', 'year') for keys in groupings.values() for key in keys)
+        day_parts = {}
+        results = {name: {} for name in groupings}
+        if progress:
+            facts = cls._reporting(facts, progress)
+
+        for day, project, project_id, invoiced, seconds, count in facts:
+            if want_min_max and count != 1:
+                raise ValueError("min/max measures need per-entry facts")
+            if needs_day_parts:
+                parts = day_parts.get(day)
+                if parts is None:
+                    parts = day_parts[day] = cls._day_parts(day)
+            values = {
+                'project': project,
+                'project_id': project_id,
+                'day': day,
+                'invoiced': invoiced
+            }
+            if needs_day_parts:
+                values.update(parts)
+            if want_revenue:
+                rate = cls.rate_for(rates, project_ids, project, project_id)
+                revenue = (rate[1], seconds / 3600 * rate[0]) if rate else None
+
+            for name, keys in groupings.items():
+                group_key = tuple(values[key] for key in keys)
+                bucket = results[name].get(group_key)
+                if bucket is None:
+                    bucket = results[name][group_key] = cls.new_bucket(measures)
+                bucket['seconds'] += seconds
+                bucket['count'] += count
+                if want_min_max:
+                    if bucket['min'] is None or seconds < bucket['min']:
+                        bucket['min'] = seconds
+                    if bucket['max'] is None or seconds > bucket['max']:
+                        bucket['max'] = seconds
+                if want_split:
+                    if invoiced:
+                        bucket['invoiced_seconds'] += seconds
+                        bucket['invoiced_count'] += count
+                    else:
+                        bucket['uninvoiced_seconds'] += seconds
+                        bucket['uninvoiced_count'] += count
+                if want_revenue and revenue:
+                    currency, amount = revenue
+                    bucket['revenue'][currency] = bucket['revenue'].get(currency, 0.0) + amount
+                    if want_split:
+                        split_revenue = bucket['invoiced_revenue'] if invoiced else bucket['uninvoiced_revenue']
+                        split_revenue[currency] = split_revenue.get(currency, 0.0) + amount
+        return results
+
+    @classmethod
+    def _validate(cls, measures, groupings, rates):
+        """Check measures and group keys; return them as a set and a dict of tuples"""
+        measures = set(measures)
+        unknown = measures.difference(cls.MEASURES)
+        if unknown:
+            raise ValueError(f"Unknown measures: {', '.join(sorted(unknown))}")
+        if 'revenue' in measures and rates is None:
+            raise ValueError("Revenue requires a rates mapping")
+        groupings = {name: tuple(keys) for name, keys in groupings.items()}
+        for keys in groupings.values():
+            for key in keys:
+                if key not in cls.GROUP_KEYS:
+                    raise ValueError(f"Unknown group key: {key}")
+        return measures, groupings
+
+    @staticmethod
+    def rate_for(rates, project_ids, project, project_id):
+        """Look up (rate, currency) the way aggregate() does, or None"""
+        rate = rates.get(project_id)
+        if rate is None and not project_id and project_ids:
+            rate = rates.get(project_ids.get(project))
+        return rate
+
+    @classmethod
+    def _reporting(cls, facts, progress):
+        """Yield facts, calling progress(n) every PROGRESS_EVERY facts"""
+        for position, fact in enumerate(facts, 1):
+            if not position % cls.PROGRESS_EVERY:
+                progress(position)
+            yield fact
+
+    @staticmethod
+    def new_bucket(measures):
+        """Return an empty group total holding the given measures"""
+        bucket = {'seconds': 0, 'count': 0}
+        if 'min' in measures or 'max' in measures:
+            bucket['min'] = None
+            bucket['max'] = None
+        if 'split' in measures:
+            bucket.update(invoiced_seconds=0, uninvoiced_seconds=0, invoiced_count=0, uninvoiced_count=0)
+        if 'revenue' in measures:
+            bucket['revenue'] = {}
+            if 'split' in measures:
+                bucket['invoiced_revenue'] = {}
+                bucket['uninvoiced_revenue'] = {}
+        return bucket
+
+    @staticmethod
+    def format_money(amounts: Dict[str, float]) -> str:
+        """Format {currency: amount} as '1,234.50 USD + 99.00 EUR'"""
+        if not amounts:
+            return "—"
+        return " + ".join(f"{amount:,.2f} {currency}" for currency, amount in sorted(amounts.items()))
+
+    @staticmethod
+    def ranked(groups: Dict[tuple, Dict[str, Any]], measure: str = 'seconds'):
+        """Return (key, bucket) pairs sorted by a measure, largest first"""
+        return sorted(groups.items(), key=lambda item: item[1][measure], reverse=True)
+
+
+class ColumnarFacts:
+    """Facts loaded into NumPy columns for VectorEngine.
+
+    Days and (project, project_id) pairs are stored once and referenced
+    by integer codes; invoiced flags, seconds and counts are per-row arrays.
+    """
+
+    def __init__(self, facts, progress=None):
+        if np is None:
+            raise RuntimeError("NumPy is not available")
+        if progress:
+            facts = ReportEngine._reporting(facts, progress)
+        days, pairs = {}, {}
+        day_codes, pair_codes, invoiced, seconds, counts = [], [], [], [], []
+        for day, project, project_id, is_invoiced, fact_seconds, count in facts:
+            code = days.get(day)
+            if code is None:
+                code = days[day] = len(days)
+            day_codes.append(code)
+            code = pairs.get((project, project_id))
+            if code is None:
+                code = pairs[(project, project_id)] = len(pairs)
+            pair_codes.append(code)
+            invoiced.append(bool(is_invoiced))
+            seconds.append(fact_seconds)
+            counts.append(count)
+
+        self.days = list(days)
+        self.pairs = list(pairs)
+        self.day_code = np.array(day_codes, dtype=np.int64)
+        self.pair_code = np.array(pair_codes, dtype=np.int64)
+        self.invoiced = np.array(invoiced, dtype=bool)
+        self.seconds = np.array(seconds, dtype=np.int64)
+        self.count = np.array(counts, dtype=np.int64)
+        # Day ordinal per distinct day; -1 for facts without a valid day
+        self.day_ordinal = np.array(
+            [date.fromisoformat(day).toordinal() if day else -1 for day in self.days],
+            dtype=np.int64
+        )
+
+    def __len__(self):
+        return len(self.seconds)
+
+    def key_column(self, key: str):
+        """Return (per-row codes, labels) for a ReportEngine group key"""
+        if key == 'invoiced':
+            return self.invoiced.astype(np.int64), [False, True]
+        if key == 'day':
+            return self.day_code, self.days
+        if key in ('project', 'project_id'):
+            position = 0 if key == 'project' else 1
+            values = [pair[position] for pair in self.pairs]
+        else:
+            values = [ReportEngine._day_parts(day)[key] for day in self.days]
+        labels = {}
+        lookup = np.array([labels.setdefault(value, len(labels)) for value in values], dtype=np.int64)
+        codes = self.pair_code if key in ('project', 'project_id') else self.day_code
+        return lookup[codes], list(labels)
+
+
+class VectorEngine(ReportEngine):
+    """ReportEngine with NumPy group-bys for large histories.
+
+    Facts are loaded into ColumnarFacts and reduced with bincount and
+    searchsorted instead of per-fact Python loops. Results match
+    ReportEngine; without NumPy every call falls back to it.
+    """
+
+    @classmethod
+    def available(cls) -> bool:
+        return np is not None
+
+    @classmethod
+    def aggregate(cls, facts, groupings: Dict[str, Iterable[str]], measures=('sum', 'count', 'split'), rates=None, project_ids=None, progress=None):
+        if np is None:
+            return super().aggregate(facts, groupings, measures=measures, rates=rates, project_ids=project_ids, progress=progress)
+        measures, groupings = cls._validate(measures, groupings, rates)
+        columns = facts if isinstance(facts, ColumnarFacts) else ColumnarFacts(facts, progress)
+
+        results = {}
+        for name, keys in groupings.items():
+            # Combine the key columns into one mixed-radix code per row
+            combined = np.zeros(len(columns), dtype=np.int64)
+            key_labels = []
+            for key in keys:
+                codes, labels = columns.key_column(key)
+                combined = combined * len(labels) + codes
+                key_labels.append(labels)
+            group_codes, inverse = np.unique(combined, return_inverse=True)
+            buckets = cls._reduce(columns, inverse.reshape(-1), len(group_codes), measures, rates, project_ids)
+
+            groups = {}
+            for group_code, bucket in zip(group_codes.tolist(), buckets):
+                key = []
+                for labels in reversed(key_labels):
+                    group_code, position = divmod(group_code, len(labels))
+                    key.append(labels[position])
+                groups[tuple(reversed(key))] = bucket
+            results[name] = groups
+        return results
+
+    @classmethod
+    def time_series(cls, facts, granularity: str, start: date, end: date, measures=('sum', 'count', 'split'), rates=None, project_ids=None, progress=None):
+        if np is None:
+            return super().time_series(facts, granularity, start, end, measures=measures, rates=rates, project_ids=project_ids, progress=progress)
+        if granularity not in cls.GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        if start > end:
+            raise ValueError("Start date cannot be after end date")
+        measures, _ = cls._validate(measures, {}, rates)
+        columns = facts if isinstance(facts, ColumnarFacts) else ColumnarFacts(facts, progress)
+
+        indexes = range(cls.bucket_index(start, granularity), cls.bucket_index(end, granularity) + 1)
+        starts = [cls.bucket_start(index, granularity) for index in indexes]
+        boundaries = np.array([bucket_start.toordinal() for bucket_start in starts], dtype=np.int64)
+
+        # Place each row in the bucket whose start precedes its day; rows
+        # outside start..end go to an extra bucket that is dropped
+        ordinals = columns.day_ordinal[columns.day_code]
+        positions = np.searchsorted(boundaries, ordinals, side='right') - 1
+        outside = (ordinals < start.toordinal()) | (ordinals > end.toordinal())
+        positions[outside] = len(starts)
+        buckets = cls._reduce(columns, positions, len(starts) + 1, measures, rates, project_ids)
+
+        return [
+            (cls.bucket_label(bucket_start, granularity), bucket_start, bucket)
+            for bucket_start, bucket in zip(starts, buckets)
+        ]
+
+    @classmethod
+    def _reduce(cls, columns: ColumnarFacts, groups, group_count: int, measures, rates, project_ids):
+        """Compute ReportEngine buckets for rows assigned to group_count groups"""
+        def total(weights=None):
+            sums = np.bincount(groups, weights=weights, minlength=group_count)
+            return np.rint(sums).astype(np.int64).tolist()
+
+        if 'min' in measures or 'max' in measures:
+            if len(columns) and (columns.count != 1).any():
+                raise ValueError("min/max measures need per-entry facts")
+        seconds = columns.seconds.astype(np.float64)
+        sums = {'seconds': total(seconds), 'count': total(columns.count.astype(np.float64))}
+        if 'split' in measures:
+            invoiced = columns.invoiced
+            sums['invoiced_seconds'] = total(np.where(invoiced, seconds, 0))
+            sums['uninvoiced_seconds'] = total(np.where(invoiced, 0, seconds))
+            sums['invoiced_count'] = total(np.where(invoiced, columns.count, 0).astype(np.float64))
+            sums['uninvoiced_count'] = total(np.where(invoiced, 0, columns.count).astype(np.float64))
+        if 'min' in measures or 'max' in measures:
+            present = np.bincount(groups, minlength=group_count) > 0
+            lowest = np.full(group_count, np.iinfo(np.int64).max, dtype=np.int64)
+            highest = np.full(group_count, np.iinfo(np.int64).min, dtype=np.int64)
+            np.minimum.at(lowest, groups, columns.seconds)
+            np.maximum.at(highest, groups, columns.seconds)
+            sums['min'] = [int(value) if has else None for value, has in zip(lowest.tolist(), present.tolist())]
+            sums['max'] = [int(value) if has else None for value, has in zip(highest.tolist(), present.tolist())]
+
+        revenue = {}
+        if 'revenue' in measures:
+            currencies = {}
+            pair_rates, pair_currencies = [], []
+            for project, project_id in columns.pairs:
+                rate = cls.rate_for(rates, project_ids, project, project_id)
+                pair_rates.append(float(rate[0]) if rate else 0.0)
+                pair_currencies.append(currencies.setdefault(rate[1], len(currencies)) if rate else -1)
+            currency_code = np.array(pair_currencies, dtype=np.int64)[columns.pair_code]
+            amounts = seconds / 3600 * np.array(pair_rates, dtype=np.float64)[columns.pair_code]
+            billed = currency_code >= 0
+            splits = [('revenue', billed)]
+            if 'split' in measures:
+                splits += [('invoiced_revenue', billed & columns.invoiced), ('uninvoiced_revenue', billed & ~columns.invoiced)]
+            size = group_count * len(currencies)
+            for measure, rows in splits if currencies else ():
+                # One cell per (group, currency); a cell seen at all gets a key
+                cells = groups[rows] * len(currencies) + currency_code[rows]
+                present = np.bincount(cells, minlength=size).reshape(group_count, len(currencies))
+                amount = np.bincount(cells, weights=amounts[rows], minlength=size).reshape(group_count, len(currencies))
+                revenue[measure] = (present, amount)
+
+        buckets = []
+        for group in range(group_count):
+            bucket = cls.new_bucket(measures)
+            for measure, values in sums.items():
+                bucket[measure] = values[group]
+            for measure, (present, amount) in revenue.items():
+                bucket[measure] = {
+                    currency: float(amount[group, code])
+                    for currency, code in currencies.items() if present[group, code]
+                }
+            buckets.append(bucket)
+        return buckets
+
+
+class SessionStatistics:
+    """Distribution statistics over time entries, built in one streaming pass.
+
+    Memory stays bounded however long the history is. Session lengths
+    go into fixed BUCKET_SECONDS buckets up to MAX_TRACKED_SECONDS (plus
+    an overflow bucket), so percentiles are accurate to one bucket. Time
+    of day is a weekday x hour grid of tracked seconds, and per-project
+    mean and variance use Welford's online algorithm.
+    """
+
+    BUCKET_SECONDS = 60
+    MAX_TRACKED_SECONDS = 12 * 3600
+    HISTOGRAM_EDGES = (0, 5 * 60, 15 * 60, 30 * 60, 3600, 2 * 3600, 4 * 3600, 8 * 3600)
+    WEEK_SECONDS = 7 * 24 * 3600
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0
+        self.min_seconds = None
+        self.max_seconds = None
+        self.buckets = [0] * (self.MAX_TRACKED_SECONDS // self.BUCKET_SECONDS + 1)
+        self.heatmap = [[0] * 24 for _ in range(7)]  # [weekday][hour] -> seconds
+        self.projects = {}  # project -> [count, mean, sum of squared deviations]
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict[str, Any]], progress=None) -> 'SessionStatistics':
+        """Build statistics from time entries in a single pass"""
+        stats = cls()
+        if progress:
+            entries = ReportEngine._reporting(entries, progress)
+        for entry in entries:
+            try:
+                start = datetime.fromisoformat(entry.get('start_time', ''))
+            except (TypeError, ValueError):
+                start = None
+            stats.add(DailyRollup.entry_seconds(entry), start, entry.get('project', 'Unknown'))
+        return stats
+
+    def add(self, seconds: int, start: Optional[datetime] = None, project: Optional[str] = None):
+        """Add one session of the given length"""
+        seconds = max(0, int(seconds))
+        self.count += 1
+        self.total_seconds += seconds
+        if self.min_seconds is None or seconds < self.min_seconds:
+            self.min_seconds = seconds
+        if self.max_seconds is None or seconds > self.max_seconds:
+            self.max_seconds = seconds
+        self.buckets[min(seconds // self.BUCKET_SECONDS, len(self.buckets) - 1)] += 1
+
+        if start is not None:
+            self._spread(start, seconds)
+
+        if project is not None:
+            state = self.projects.get(project)
+            if state is None:
+                state = self.projects[project] = [0, 0.0, 0.0]
+            state[0] += 1
+            delta = seconds - state[1]
+            state[1] += delta / state[0]
+            state[2] += delta * (seconds - state[1])
+
+    def _spread(self, start: datetime, seconds: int):
+        """Add a session to the heatmap, split across the hours it covers"""
+        # Whole weeks cover every cell equally; only the rest is walked hour by hour
+        weeks, seconds = divmod(seconds, self.WEEK_SECONDS)
+        if weeks:
+            for row in self.heatmap:
+                for hour in range(24):
+                    row[hour] += weeks * 3600
+        moment = start.replace(microsecond=0)
+        while seconds > 0:
+            hour_end = moment.replace(minute=0, second=0) + timedelta(hours=1)
+            chunk = min(seconds, int((hour_end - moment).total_seconds()))
+            self.heatmap[moment.weekday()][moment.hour] += chunk
+            seconds -= chunk
+            moment = hour_end
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Estimate the p-th percentile session length in seconds (0 <= p <= 100)"""
+        if not self.count:
+            return 0.0
+        target = self.count * min(max(p, 0), 100) / 100
+        seen = 0
+        last = len(self.buckets) - 1
+        for index, bucket_count in enumerate(self.buckets):
+            if bucket_count and seen + bucket_count >= target:
+                low = index * self.BUCKET_SECONDS
+                high = self.max_seconds if index == last else low + self.BUCKET_SECONDS
+                value = low + (high - low) * (target - seen) / bucket_count
+                return float(min(max(value, self.min_seconds), self.max_seconds))
+            seen += bucket_count
+        return float(self.max_seconds)
+
+    def histogram(self, edges=None) -> List[tuple]:
+        """Return [(low, high or None, sessions)] for the given bucket edges in seconds"""
+        edges = list(edges or self.HISTOGRAM_EDGES)
+        counts = [0] * len(edges)
+        for index, bucket_count in enumerate(self.buckets):
+            if bucket_count:
+                low = index * self.BUCKET_SECONDS
+                position = max(i for i, edge in enumerate(edges) if edge <= low)
+                counts[position] += bucket_count
+        highs = edges[1:] + [None]
+        return list(zip(edges, highs, counts))
+
+    def project_spread(self) -> Dict[str, tuple]:
+        """Return {project: (sessions, mean seconds, sample standard deviation)}"""
+        return {
+            project: (count, mean, (m2 / (count - 1)) ** 0.5 if count > 1 else 0.0)
+            for project, (count, mean, m2) in self.projects.items()
+        }
+
+
+class IncrementalReport:
+    """Report groupings kept current from store change deltas.
+
+    Built once from the daily rollup; afterwards each added, edited,
+    deleted or toggled entry only adjusts the buckets it belongs to, so a
+    mutation costs O(number of groupings) whatever the history size.
+    Buckets hold integer seconds and counts per (project, project_id,
+    invoiced), so they stay exact, and revenue is priced when the report
+    is read so rate changes apply immediately. Supports the 'sum',
+    'count', 'split' and 'revenue' measures.
+
+    With verify=True every change is checked against a full recompute
+    from the entries; on_mismatch(message) is called and the report and
+    rollup are rebuilt if they drifted.
+    """
+
+    MEASURES = ('sum', 'count', 'split', 'revenue')
+
+    def __init__(self, rollup: DailyRollup, groupings: Dict[str, Iterable[str]], verify: bool = False, on_mismatch=None):
+        _, self.groupings = ReportEngine._validate((), groupings, None)
+        self.rollup = rollup
+        self.store = rollup.store
+        self.verify = verify
+        self.on_mismatch = on_mismatch
+        self._needs_day_parts = any(
+            key in ('week', 'month', 'quarter', 'year') for keys in self.groupings.values() for key in keys
+        )
+        self._groups = None  # {name: {key: {(project, project_id, invoiced): [seconds, count]}}}
+        self.store.subscribe(self._on_change)
+
+    @property
+    def ready(self) -> bool:
+        return self._groups is not None
+
+    def build(self):
+        """Rebuild all groupings from the rollup in one pass"""
+        self._groups = {name: {} for name in self.groupings}
+        for fact in ReportEngine.rollup_facts(self.rollup):
+            self._apply_fact(fact, 1)
+
+    def _on_change(self, changes: ChangeSet):
+        if self._groups is None:
+            return
+        if changes.reloaded:
+            self._groups = None
+            return
+        for entry in changes.deleted:
+            self._apply_fact(self._fact(entry), -1)
+        for old_entry, new_entry in changes.updated:
+            self._apply_fact(self._fact(old_entry), -1)
+            self._apply_fact(self._fact(new_entry), 1)
+        for entry in changes.added:
+            self._apply_fact(self._fact(entry), 1)
+        if self.verify:
+            self.check()
+
+    @staticmethod
+    def _fact(entry: Dict[str, Any]) -> tuple:
+        return DailyRollup.entry_key(entry) + (DailyRollup.entry_seconds(entry), 1)
+
+    def _apply_fact(self, fact: tuple, sign: int):
+        day, project, project_id, invoiced, seconds, count = fact
+        values = {'project': project, 'project_id': project_id, 'day': day, 'invoiced': invoiced}
+        if self._needs_day_parts:
+            values.update(ReportEngine._day_parts(day))
+        part_key = (project, project_id, invoiced)
+        for name, keys in self.groupings.items():
+            groups = self._groups[name]
+            group_key = tuple(values[key] for key in keys)
+            parts = groups.get(group_key)
+            if parts is None:
+                parts = groups[group_key] = {}
+            part = parts.get(part_key)
+            if part is None:
+                part = parts[part_key] = [0, 0]
+            part[0] += sign * seconds
+            part[1] += sign * count
+            if part[1] <= 0:
+                del parts[part_key]
+                if not parts:
+                    del groups[group_key]
+
+    def report(self, billing=None) -> Dict[str, Any]:
+        """Return {grouping name: {key: measures}} like ReportEngine.aggregate().
+
+        billing is a (rates, project_ids) pair used to price revenue.
+        """
+        # Picks up edits made outside the app (a reload resets the groups)
+        self.rollup.sync()
+        if self._groups is None:
+            self.build()
+        rates, project_ids = billing or ({}, {})
+        measures = set(self.MEASURES)
+        results = {}
+        for name, groups in self._groups.items():
+            buckets = results[name] = {}
+            for group_key, parts in groups.items():
+                bucket = buckets[group_key] = ReportEngine.new_bucket(measures)
+                for (project, project_id, invoiced), (seconds, count) in parts.items():
+                    bucket['seconds'] += seconds
+                    bucket['count'] += count
+                    split = 'invoiced' if invoiced else 'uninvoiced'
+                    bucket[f'{split}_seconds'] += seconds
+                    bucket[f'{split}_count'] += count
+                    rate = ReportEngine.rate_for(rates, project_ids, project, project_id)
+                    if rate:
+                        currency, amount = rate[1], seconds / 3600 * rate[0]
+                        for measure in ('revenue', f'{split}_revenue'):
+                            bucket[measure][currency] = bucket[measure].get(currency, 0.0) + amount
+        return results
+
+    def check(self) -> bool:
+        """Compare against a full recompute; rebuild and report any drift"""
+        expected = ReportEngine.aggregate(
+            ReportEngine.entry_facts(self.store.load()), self.groupings,
+            measures=self.MEASURES, rates={}, project_ids={}
+        )
+        problems = []
+        if self.report() != expected:
+            problems.append("report groupings")
+        if not self.rollup.verify():
+            problems.append("daily rollup")
+            self.rollup.rebuild(self.store.load())
+        if problems:
+            self.build()
+            if self.on_mismatch:
+                self.on_mismatch(f"Incremental aggregates drifted from a full recompute ({', '.join(problems)}); rebuilt")
+            return False
+        return True
+
+
+class ReportCache:
+    """Memoizes report results by (report type, parameters, data version).
+
+    Results computed for an older data version are dropped as soon as a
+    newer version is seen, and at most max_entries results are kept.
+    """
+
+    def __init__(self, store: EntryStore, max_entries: int = 32):
+        self.store = store
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+
+    def _sync_version(self):
+        version = self.store.data_version()
+        if version != self._version:
+            self._results.clear()
+            self._version = version
+        return version
+
+    def lookup(self, report_type: str, params):
+        """Return (True, result) for a current cached result, else (False, None)"""
+        self._sync_version()
+        key = (report_type, params)
+        if key in self._results:
+            self.hits += 1
+            self._results.move_to_end(key)
+            return True, self._results[key]
+        self.misses += 1
+        return False, None
+
+    def put(self, report_type: str, params, result, version=None):
+        """Remember a result computed from the data at the given version.
+
+        Results for a version older than the current data are discarded.
+        """
+        current = self._sync_version()
+        if version is not None and version != current:
+            return
+        self._results[(report_type, params)] = result
+        if len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def get(self, report_type: str, params, compute):
+        """Return the cached result or compute and remember it"""
+        hit, result = self.lookup(report_type, params)
+        if not hit:
+            result = compute()
+            # compute() may have reloaded the file, in which case the
+            # result belongs to the newer version
+            self.put(report_type, params, result)
+        return result
+
+    def clear(self):
+        self._results.clear()
+
+
+class CsvImporter:
+    """Streams time entries out of a CSV file in chunks.
+
+    Rows are read straight from the file CHUNK_ROWS at a time, validated
+    and normalized (timestamps, durations, invoiced flags) and collected
+    for a single batched commit. Invalid rows are skipped and reported by
+    line number. run() may be called from a worker thread; it never
+    touches the entry store.
+
+    Entries passed as existing are indexed by fingerprint so re-importing
+    a file is idempotent: rows whose fingerprint is already known (from
+    the data or earlier in the file) are skipped, and rows for a project
+    and start time already recorded with a different stop time or
+    duration are reported as conflicts and not imported.
+    """
+
+    CHUNK_ROWS = 5000
+    MAX_REPORTED_ERRORS = 20
+    PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+    MAX_WORKERS = 4
+    RANGES_PER_WORKER = 4
+    SCAN_BLOCK_BYTES = 1024 * 1024
+    TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    def __init__(self, filename: str, existing: Optional[Iterable[Dict[str, Any]]] = None):
+        self.filename = filename
+        self.total_bytes = os.path.getsize(filename)
+        self.bytes_read = 0
+        self.rows_read = 0
+        self.entries = []
+        self.errors = []       # (line number, message), at most MAX_REPORTED_ERRORS
+        self.error_count = 0
+        self.skipped_count = 0
+        self.conflicts = []    # (line number, message), at most MAX_REPORTED_ERRORS
+        self.conflict_count = 0
+        self.existing = existing
+        self.fingerprints = set()
+        self.slots = set()     # (project, start_time) pairs already recorded
+
+    @staticmethod
+    def fingerprint(entry: Dict[str, Any]) -> tuple:
+        """Identity of a time entry for duplicate detection"""
+        return (
+            entry.get('project'),
+            entry.get('start_time'),
+            entry.get('stop_time') or '',
+            DailyRollup.entry_seconds(entry)
+        )
+
+    def _remember(self, entry: Dict[str, Any]):
+        self.fingerprints.add(self.fingerprint(entry))
+        self.slots.add((entry.get('project'), entry.get('start_time')))
+
+    @classmethod
+    def parse_timestamp(cls, value) -> Optional[datetime]:
+        """Parse 'YYYY-MM-DD HH:MM[:SS]' (or ISO 'T' separated); None if blank.
+
+        Entries store local wall-clock time, so a timestamp with a UTC offset
+        (common in other tools' exports) is converted to local time.
+        """
+        value = (value or '').strip()
+        if not value:
+            return None
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"Invalid timestamp: {value!r}")
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone().replace(tzinfo=None)
+        return parsed.replace(microsecond=0)
+
+    @classmethod
+    def normalize_row(cls, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a CSV row into a stored entry; raises ValueError if it is invalid"""
+        # DictReader files surplus values under None; they are not fields. The
+        # store assigns its own id and seq: ids from another file may clash
+        entry = {key: value for key, value in row.items() if key not in (None, 'id', 'seq')}
+
+        start = cls.parse_timestamp(entry.get('start_time'))
+        if start is None:
+            raise ValueError("Entry is missing a start_time")
+        stop = cls.parse_timestamp(entry.get('stop_time'))
+        if stop is not None and stop < start:
+            raise ValueError("stop_time is before start_time")
+        entry['start_time'] = start.strftime(cls.TIMESTAMP_FORMAT)
+        entry['stop_time'] = stop.strftime(cls.TIMESTAMP_FORMAT) if stop else ''
+
+        if entry.get('duration_seconds') in (None, '') and not entry.get('duration') and stop is not None:
+            entry['duration_seconds'] = int((stop - start).total_seconds())
+        if not entry.get('project_id'):
+            entry['project_id'] = None
+        if not entry.get('invoice_number'):
+            entry.pop('invoice_number', None)
+        if entry.get('gross_duration_seconds') in (None, ''):
+            entry.pop('gross_duration_seconds', None)
+        else:
+            try:
+                entry['gross_duration_seconds'] = int(float(entry['gross_duration_seconds']))
+            except ValueError:
+                raise ValueError(f"Invalid gross_duration_seconds: {entry['gross_duration_seconds']!r}")
+        return EntryStore.normalize_entry(entry)
+
+    def _lines(self):
+        """Yield decoded lines while counting the bytes consumed"""
+        with open(self.filename, 'rb') as f:
+            for number, raw in enumerate(f):
+                self.bytes_read += len(raw)
+                line = raw.decode('utf-8')
+                if number == 0 and line.startswith('\ufeff'):
+                    line = line[1:]
+                yield line
+
+    @staticmethod
+    def numbered_rows(reader: csv.DictReader, lines_before: int = 0):
+        """Yield (line number of the row's first line, row) from a DictReader"""
+        reader.fieldnames  # reads the header line, if the file has one
+        while True:
+            line_number = lines_before + reader.line_num + 1
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            yield line_number, row
+
+    def chunks(self):
+        """Yield lists of (line number, raw row) pairs, CHUNK_ROWS at a time"""
+        chunk = []
+        for line_number, row in self.numbered_rows(csv.DictReader(self._lines())):
+            chunk.append((line_number, row))
+            if len(chunk) >= self.CHUNK_ROWS:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def add_chunk(self, chunk):
+        """Validate, normalize and deduplicate one chunk of rows"""
+        self.add_parsed(*self.parse_rows(chunk))
+
+    @classmethod
+    def parse_rows(cls, chunk) -> tuple:
+        """Normalize (line number, row) pairs.
+
+        Returns (rows read, [(line number, entry)], [(line number, error)],
+        error count); safe to run in another process.
+        """
+        parsed, errors, error_count = [], [], 0
+        for line_number, row in chunk:
+            try:
+                parsed.append((line_number, cls.normalize_row(row)))
+            except ValueError as e:
+                error_count += 1
+                if len(errors) < cls.MAX_REPORTED_ERRORS:
+                    errors.append((line_number, str(e)))
+        return len(chunk), parsed, errors, error_count
+
+    def add_parsed(self, rows_read: int, parsed, errors, error_count: int):
+        """Merge one parsed chunk, in file order, through the duplicate index"""
+        self.rows_read += rows_read
+        self.error_count += error_count
+        self.errors.extend(errors[:max(0, self.MAX_REPORTED_ERRORS - len(self.errors))])
+        for line_number, entry in parsed:
+            if self.fingerprint(entry) in self.fingerprints:
+                self.skipped_count += 1
+            elif (entry['project'], entry['start_time']) in self.slots:
+                self.conflict_count += 1
+                if len(self.conflicts) < self.MAX_REPORTED_ERRORS:
+                    self.conflicts.append((line_number, f"{entry['project']} at {entry['start_time']} differs from the recorded entry"))
+            else:
+                self._remember(entry)
+                self.entries.append(entry)
+
+    def run(self, progress=None, workers: Optional[int] = None) -> 'CsvImporter':
+        """Read the whole file; progress(kb read, kb total) is called per chunk.
+
+        With workers > 1, files of at least PARALLEL_MIN_BYTES are parsed
+        by a process pool (see run_parallel).
+        """
+        if self.existing is not None:
+            for entry in self.existing:
+                self._remember(entry)
+            self.existing = None
+        if workers and workers > 1 and self.total_bytes >= self.PARALLEL_MIN_BYTES:
+            return self.run_parallel(workers, progress)
+        for chunk in self.chunks():
+            self.add_chunk(chunk)
+            if progress:
+                progress(self.bytes_read // 1024, max(1, self.total_bytes // 1024))
+        return self
+
+    @classmethod
+    def worker_count(cls, configured: int = 0) -> int:
+        """Processes to parse with: configured (if > 0) or up to MAX_WORKERS, never more than the CPUs"""
+        cpus = os.cpu_count() or 1
+        try:
+            configured = int(configured or 0)
+        except (TypeError, ValueError):
+            configured = 0
+        return max(1, min(cpus, configured if configured > 0 else cls.MAX_WORKERS))
+
+    def split_ranges(self, parts: int):
+        """Split the data rows into about `parts` byte ranges on record boundaries.
+
+        A newline only ends a record when an even number of quote
+        characters precede it, so quoted fields spanning lines are never
+        cut. Returns (header fieldnames, [(start, end, lines before start)]).
+        """
+        with open(self.filename, 'rb') as f:
+            header = f.readline()
+            data_start = f.tell()
+            fieldnames = next(csv.reader([header.decode('utf-8').lstrip('\ufeff')]))
+            span = self.total_bytes - data_start
+            targets = [data_start + span * i // parts for i in range(1, parts)]
+
+            starts = [(data_start, header.count(b'\n'))]
+            position, lines_before, quotes_odd = data_start, header.count(b'\n'), False
+            while targets:
+                block = f.read(self.SCAN_BLOCK_BYTES)
+                if not block:
+                    break
+                offset = 0
+                while targets:
+                    offset = max(offset, targets[0] - position)
+                    newline = block.find(b'\n', offset) if offset < len(block) else -1
+                    while newline != -1 and quotes_odd != (block.count(b'"', 0, newline) % 2 == 1):
+                        newline = block.find(b'\n', newline + 1)
+                    if newline == -1:
+                        break
+                    starts.append((position + newline + 1, lines_before + block.count(b'\n', 0, newline + 1)))
+                    offset = newline + 1
+                    while targets and targets[0] < position + offset:
+                        targets.pop(0)
+                quotes_odd = quotes_odd != (block.count(b'"') % 2 == 1)
+                lines_before += block.count(b'\n')
+                position += len(block)
+
+        ends = [start for start, _ in starts[1:]] + [self.total_bytes]
+        ranges = [(start, end, lines) for (start, lines), end in zip(starts, ends) if end > start]
+        return fieldnames, ranges
+
+    def run_parallel(self, workers: int, progress=None) -> 'CsvImporter':
+        """Parse byte ranges of the file across a process pool, merging in order"""
+        fieldnames, ranges = self.split_ranges(workers * self.RANGES_PER_WORKER)
+        cancel = multiprocessing.Event()
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_import_worker, initargs=(cancel,)
+        )
+        futures = [
+            executor.submit(_parse_csv_range, self.filename, start, end, fieldnames, lines_before)
+            for start, end, lines_before in ranges
+        ]
+        try:
+            for (start, end, _), future in zip(ranges, futures):
+                self.add_parsed(*future.result())
+                self.bytes_read = end
+                if progress:
+                    progress(self.bytes_read // 1024, max(1, self.total_bytes // 1024))
+        except BaseException:
+            # Cancelled or failed: queued ranges never start and the workers
+            # still parsing give up at their next chunk
+            cancel.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+        return self
+
+
+_import_cancelled = None    # multiprocessing.Event of the pool this worker serves (see _init_import_worker)
+
+
+def _init_import_worker(cancelled):
+    global _import_cancelled
+    _import_cancelled = cancelled
+
+
+def _parse_csv_range(filename: str, start: int, end: int, fieldnames: List[str], lines_before: int) -> tuple:
+    """Parse bytes start..end of a CSV file in a worker process (see CsvImporter.run_parallel).
+
+    Rows are parsed CHUNK_ROWS at a time and the pool's cancel event is
+    checked before each chunk, so a cancelled import frees the worker soon.
+    """
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+    reader = csv.DictReader(io.StringIO(text, newline=''), fieldnames=fieldnames)
+    rows = CsvImporter.numbered_rows(reader, lines_before)
+    rows_read, parsed, errors, error_count = 0, [], [], 0
+    while True:
+        if _import_cancelled is not None and _import_cancelled.is_set():
+            raise RuntimeError("Import cancelled")
+        chunk = list(itertools.islice(rows, CsvImporter.CHUNK_ROWS))
+        if not chunk:
+            return rows_read, parsed, errors, error_count
+        chunk_read, chunk_parsed, chunk_errors, chunk_error_count = CsvImporter.parse_rows(chunk)
+        rows_read += chunk_read
+        parsed.extend(chunk_parsed)
+        errors.extend(chunk_errors[:max(0, CsvImporter.MAX_REPORTED_ERRORS - len(errors))])
+        error_count += chunk_error_count
+
+
+class EntryExporter:
+    """Streams time entries into a CSV or JSON Lines file.
+
+    Entries are written one at a time as they are pulled from the
+    iterable, so exporting from EntryStore.iter_entries() needs no copy
+    of the data. CSV files get the FIELDS columns (extra keys such as
+    'id' are dropped, missing ones left blank); JSON Lines keeps every
+    key unless fields are given. The file is written next to the target
+    and moved into place once complete, so a failed or cancelled export
+    leaves any existing file untouched. write() may run on a worker thread.
+    """
+
+    FIELDS = ['project', 'memo', 'start_time', 'stop_time', 'duration', 'duration_seconds', 'invoiced', 'project_id', 'invoice_number',
+              'gross_duration_seconds']
+    FORMATS = ('csv', 'jsonl')
+    PROGRESS_EVERY = 5000
+
+    def __init__(self, filename: str, fmt: Optional[str] = None, fields: Optional[List[str]] = None):
+        if fmt is None:
+            extension = os.path.splitext(filename)[1].lower()
+            fmt = 'jsonl' if extension in ('.jsonl', '.ndjson') else 'csv'
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        self.filename = filename
+        self.format = fmt
+        self.fields = list(fields) if fields else None
+        self.count = 0
+
+    def _write_csv(self, f, entries: Iterable[Dict[str, Any]]):
+        writer = csv.DictWriter(f, fieldnames=self.fields or self.FIELDS, extrasaction='ignore', restval='')
+        writer.writeheader()
+        for entry in entries:
+            writer.writerow(entry)
+            yield
+
+    def _write_jsonl(self, f, entries: Iterable[Dict[str, Any]]):
+        for entry in entries:
+            if self.fields:
+                entry = {field: entry.get(field) for field in self.fields}
+            f.write(json.dumps(entry, ensure_ascii=False))
+            f.write('\n')
+            yield
+
+    def write(self, entries: Iterable[Dict[str, Any]], total: Optional[int] = None, progress=None) -> int:
+        """Write entries to the file and return how many were written.
+
+        progress(done, total) is called every PROGRESS_EVERY entries; an
+        exception it raises (e.g. TaskCancelled) aborts the export.
+        """
+        temp_file = self.filename + '.tmp'
+        writer = self._write_csv if self.format == 'csv' else self._write_jsonl
+        self.count = 0
+        try:
+            with open(temp_file, 'w', newline='', encoding='utf-8') as f:
+                for _ in writer(f, entries):
+                    self.count += 1
+                    if progress and self.count % self.PROGRESS_EVERY == 0:
+                        progress(self.count, total)
+            if progress:
+                progress(self.count, total)
+            os.replace(temp_file, self.filename)
+        except BaseException:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+        return self.count
+
+
+class ColumnarExporter:
+    """Writes time entries as typed columns for analytics tools.
+
+    Timestamps are seconds since 1970-01-01 of the recorded wall-clock
+    time (no time zone), durations whole seconds and invoiced a boolean.
+    With pyarrow installed, .parquet files are written as Parquet and
+    .arrow/.feather files as Arrow IPC (without it they are refused); .ttcol
+    and other files get a little-endian binary format, described by a JSON
+    schema file next to it. Entries are pulled from the iterable ROW_GROUP_SIZE
+    at a time and each group is written before the next is read.
+    """
+
+    ROW_GROUP_SIZE = 65536
+    MAGIC = b'TTCOL1\n'
+    NULL_INT = -2 ** 63
+    NULL_LENGTH = 2 ** 32 - 1
+    EPOCH = datetime(1970, 1, 1)
+    # (column, type): 'string', 'timestamp' (int64 seconds), 'int64' or 'bool'
+    COLUMNS = [
+        ('id', 'string'),
+        ('project', 'string'),
+        ('project_id', 'string'),
+        ('memo', 'string'),
+        ('start_time', 'timestamp'),
+        ('stop_time', 'timestamp'),
+        ('duration_seconds', 'int64'),
+        ('gross_duration_seconds', 'int64'),
+        ('invoiced', 'bool'),
+        ('invoice_number', 'string'),
+    ]
+
+    def __init__(self, filename: str, fmt: Optional[str] = None):
+        if fmt is None:
+            extension = os.path.splitext(filename)[1].lower()
+            fmt = {'.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow'}.get(extension, 'ttcol')
+        if fmt in ('parquet', 'arrow') and pa is None:
+            raise RuntimeError(f"{fmt.capitalize()} export needs pyarrow (pip install pyarrow); "
+                               f"save as a .ttcol file instead")
+        if fmt not in ('parquet', 'arrow', 'ttcol'):
+            raise ValueError(f"Unknown columnar format: {fmt}")
+        self.filename = filename
+        self.format = fmt
+        self.schema_file = filename + '.schema.json' if fmt == 'ttcol' else None
+        self.count = 0
+        self.row_groups = 0
+
+    @staticmethod
+    def available() -> bool:
+        """Whether Parquet / Arrow IPC output is available (pyarrow installed)"""
+        return pa is not None
+
+    @classmethod
+    def _timestamp(cls, value) -> Optional[int]:
+        try:
+            return int((datetime.fromisoformat(str(value).strip()) - cls.EPOCH).total_seconds()) if value else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _int(value) -> Optional[int]:
+        try:
+            return None if value in (None, '') else int(float(value))
+        except (TypeError, ValueError):
+            return None     # unreadable stored value; exported as null
+
+    @classmethod
+    def columns_for(cls, entries: List[Dict[str, Any]]) -> Dict[str, list]:
+        """Convert a list of entries into typed column lists (None for nulls)"""
+        columns = {name: [] for name, _ in cls.COLUMNS}
+        for entry in entries:
+            for name, kind in cls.COLUMNS:
+                if kind == 'timestamp':
+                    value = cls._timestamp(entry.get(name))
+                elif name == 'duration_seconds':
+                    value = DailyRollup.entry_seconds(entry)
+                elif kind == 'int64':
+                    value = cls._int(entry.get(name))
+                elif kind == 'bool':
+                    value = str(entry.get(name) or '').strip().lower() in ('yes', 'y', 'true', '1')
+                else:
+                    value = entry.get(name)
+                    value = None if value is None else str(value)
+                columns[name].append(value)
+        return columns
+
+    def _row_groups(self, entries: Iterable[Dict[str, Any]]):
+        group = []
+        for entry in entries:
+            group.append(entry)
+            if len(group) >= self.ROW_GROUP_SIZE:
+                yield self.columns_for(group)
+                group = []
+        if group:
+            yield self.columns_for(group)
+
+    def _arrow_schema(self):
+        types = {'string': pa.string(), 'timestamp': pa.timestamp('s'), 'int64': pa.int64(), 'bool': pa.bool_()}
+        return pa.schema([(name, types[kind]) for name, kind in self.COLUMNS])
+
+    def _write_arrow(self, temp_file: str, groups):
+        schema = self._arrow_schema()
+        if self.format == 'parquet':
+            writer = pq.ParquetWriter(temp_file, schema)
+        else:
+            writer = pa.ipc.new_file(temp_file, schema)
+        try:
+            for columns in groups:
+                writer.write_batch(pa.RecordBatch.from_pydict(columns, schema=schema))
+                yield len(columns['id'])
+        finally:
+            writer.close()
+
+    @classmethod
+    def _pack_column(cls, kind: str, values: list) -> bytes:
+        if kind in ('timestamp', 'int64'):
+            return struct.pack(f'<{len(values)}q', *(cls.NULL_INT if value is None else value for value in values))
+        if kind == 'bool':
+            return bytes(1 if value else 0 for value in values)
+        encoded = [None if value is None else value.encode('utf-8') for value in values]
+        lengths = struct.pack(f'<{len(values)}I', *(cls.NULL_LENGTH if value is None else len(value) for value in encoded))
+        return lengths + b''.join(value for value in encoded if value)
+
+    def _write_ttcol(self, temp_file: str, groups):
+        with open(temp_file, 'wb') as f:
+            f.write(self.MAGIC)
+            for columns in groups:
+                rows = len(columns['id'])
+                f.write(struct.pack('<I', rows))
+                for name, kind in self.COLUMNS:
+                    chunk = self._pack_column(kind, columns[name])
+                    f.write(struct.pack('<Q', len(chunk)))
+                    f.write(chunk)
+                yield rows
+            f.write(struct.pack('<I', 0))
+
+    def schema(self) -> Dict[str, Any]:
+        """The JSON schema written next to a .ttcol file"""
+        return {
+            'format': 'ttcol',
+            'version': 1,
+            'byte_order': 'little',
+            'rows': self.count,
+            'row_groups': self.row_groups,
+            'layout': (
+                "MAGIC, then per row group: uint32 row count followed by each column in order "
+                "as uint64 byte length + data; a row count of 0 ends the file. int64/timestamp: "
+                "int64 values, null = null_int. bool: int8 0/1. string: uint32 byte lengths "
+                "(null = null_length) followed by the concatenated UTF-8 bytes."
+            ),
+            'magic': self.MAGIC.decode('ascii').strip(),
+            'null_int': self.NULL_INT,
+            'null_length': self.NULL_LENGTH,
+            'timestamp_unit': 'seconds since 1970-01-01T00:00:00, local wall-clock time',
+            'columns': [{'name': name, 'type': kind} for name, kind in self.COLUMNS],
+        }
+
+    def write(self, entries: Iterable[Dict[str, Any]], total: Optional[int] = None, progress=None) -> int:
+        """Write entries in row groups and return how many were written.
+
+        progress(done, total) is called after each row group; an exception
+        it raises (e.g. TaskCancelled) aborts the export and removes the
+        partial file.
+        """
+        temp_file = self.filename + '.tmp'
+        writer = self._write_ttcol if self.format == 'ttcol' else self._write_arrow
+        groups = writer(temp_file, self._row_groups(entries))
+        self.count = self.row_groups = 0
+        try:
+            for rows in groups:
+                self.count += rows
+                self.row_groups += 1
+                if progress:
+                    progress(self.count, total)
+            os.replace(temp_file, self.filename)
+        except BaseException:
+            groups.close()  # closes the file before it is removed
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+        if self.schema_file:
+            with open(self.schema_file, 'w', encoding='utf-8') as f:
+                json.dump(self.schema(), f, indent=2)
+        return self.count
+
+    @classmethod
+    def read_ttcol(cls, filename: str) -> Dict[str, list]:
+        """Read a .ttcol file back into column lists (None for nulls)"""
+        columns = {name: [] for name, _ in cls.COLUMNS}
+        with open(filename, 'rb') as f:
+            if f.read(len(cls.MAGIC)) != cls.MAGIC:
+                raise ValueError(f"{filename} is not a TimeTracker columnar file")
+            while True:
+                rows, = struct.unpack('<I', f.read(4))
+                if not rows:
+                    return columns
+                for name, kind in cls.COLUMNS:
+                    size, = struct.unpack('<Q', f.read(8))
+                    chunk = f.read(size)
+                    if kind in ('timestamp', 'int64'):
+                        values = struct.unpack(f'<{rows}q', chunk)
+                        columns[name].extend(None if value == cls.NULL_INT else value for value in values)
+                    elif kind == 'bool':
+                        columns[name].extend(bool(value) for value in chunk)
+                    else:
+                        lengths = struct.unpack(f'<{rows}I', chunk[:4 * rows])
+                        offset = 4 * rows
+                        for length in lengths:
+                            if length == cls.NULL_LENGTH:
+                                columns[name].append(None)
+                            else:
+                                columns[name].append(chunk[offset:offset + length].decode('utf-8'))
+                                offset += length
+
+
+class IncrementalExport:
+    """Exports only the entries added or changed since a target's last run.
+
+    Every stored entry carries a mutation sequence number ('seq') that is
+    raised whenever it is added or changed. The highest sequence exported
+    to each named target (its high-water mark) is kept in marks_file, so a
+    run selects the entries with a higher seq and then advances the mark.
+    Rows include 'id' and 'seq' so the receiving system can update
+    entries it has already seen. Deletions are recorded, while any target
+    has a mark, as tombstones (id, the seq the store gave the deletion,
+    deleted 'Yes') in
+    tombstones_file and exported like changes; tombstones every target
+    has received are pruned.
+    """
+
+    FIELDS = ['id'] + EntryExporter.FIELDS + ['seq', 'deleted']
+
+    def __init__(self, store: EntryStore, marks_file: str, tombstones_file: Optional[str] = None):
+        self.store = store
+        self.marks_file = marks_file
+        self.tombstones_file = tombstones_file or os.path.splitext(marks_file)[0] + '_deleted.json'
+        store.subscribe(self._on_change)
+
+    def _on_change(self, changes: ChangeSet):
+        if not changes.deleted or not self.marks():
+            return
+        tombstones = self.tombstones()
+        tombstones.extend({'id': entry['id'], 'seq': changes.sequence, 'deleted': 'Yes'}
+                          for entry in changes.deleted)
+        self._save_json(self.tombstones_file, tombstones)
+
+    def tombstones(self) -> List[Dict[str, Any]]:
+        """Return the recorded deletions, oldest first"""
+        try:
+            with open(self.tombstones_file, 'r', encoding='utf-8') as f:
+                tombstones = json.load(f)
+            return tombstones if isinstance(tombstones, list) else []
+        except (OSError, ValueError):
+            return []
+
+    @staticmethod
+    def _save_json(filename: str, data):
+        tmp_file = f"{filename}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_file, filename)
+
+    def marks(self) -> Dict[str, Dict[str, Any]]:
+        """Return {target: {'seq', 'exported_at', 'filename', 'count'}}"""
+        try:
+            with open(self.marks_file, 'r', encoding='utf-8') as f:
+                marks = json.load(f)
+            return marks if isinstance(marks, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_marks(self, marks: Dict[str, Dict[str, Any]]):
+        self._save_json(self.marks_file, marks)
+        # Tombstones every target has received are no longer needed
+        tombstones = self.tombstones()
+        if tombstones:
+            oldest = min((mark.get('seq', 0) for mark in marks.values()), default=None)
+            kept = [tombstone for tombstone in tombstones if oldest is not None and tombstone['seq'] > oldest]
+            if len(kept) != len(tombstones):
+                self._save_json(self.tombstones_file, kept)
+
+    def high_water(self, target: str) -> int:
+        return self.marks().get(target, {}).get('seq', 0)
+
+    def pending(self, target: str) -> tuple:
+        """Return (entries changed and tombstones of entries deleted since the target's
+        mark, in sequence order; new mark)"""
+        mark = self.high_water(target)
+        entries = self.store.load()
+        changed = [{**entry, 'deleted': 'No'} for entry in entries if (entry.get('seq') or 0) > mark]
+        deleted = [tombstone for tombstone in self.tombstones() if tombstone['seq'] > mark] if mark else []
+        changed.extend(deleted)
+        changed.sort(key=lambda entry: entry['seq'])
+        sequence = max([self.store.sequence] + [tombstone['seq'] for tombstone in deleted])
+        return changed, sequence
+
+    def advance(self, target: str, sequence: int, filename: Optional[str] = None, count: int = 0):
+        """Record that everything up to sequence has been exported to target"""
+        marks = self.marks()
+        marks[target] = {
+            'seq': max(sequence, marks.get(target, {}).get('seq', 0)),
+            'exported_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'filename': filename,
+            'count': count
+        }
+        self._save_marks(marks)
+
+    def reset(self, target: str):
+        """Forget a target so its next run exports everything"""
+        marks = self.marks()
+        if marks.pop(target, None) is not None:
+            self._save_marks(marks)
+
+    def exporter(self, filename: str, fmt: Optional[str] = None) -> EntryExporter:
+        return EntryExporter(filename, fmt, fields=self.FIELDS)
+
+    def run(self, target: str, filename: str, fmt: Optional[str] = None, progress=None) -> int:
+        """Export the changes for target to filename and advance its mark"""
+        entries, sequence = self.pending(target)
+        count = self.exporter(filename, fmt).write(entries, len(entries), progress)
+        self.advance(target, sequence, filename, count)
+        return count
+
+
+class InvoiceBuilder:
+    """Builds invoices from uninvoiced time entries.
+
+    build() groups the uninvoiced entries of a date range by project and
+    prices them with billing_rates() style lookups; each entry's duration
+    is first rounded to rounding_minutes ('up', 'nearest' or 'down') and
+    amounts are rounded to cents. Projects without a rate are left out
+    and listed in unrated. Documents are rendered as CSV, HTML or plain
+    text, and mark() queues the invoiced flag and invoice number of every
+    included entry on one batch so they are written together.
+
+    Invoice numbers never repeat: the last sequence issued per prefix and
+    year is kept in counter_file (see record()), so numbers freed by
+    un-invoicing or deleting entries are not handed out again, and
+    write() refuses to overwrite an existing invoice document.
+    """
+
+    ROUNDING_MODES = ('up', 'nearest', 'down')
+    FORMATS = {'csv': 'CSV', 'html': 'HTML', 'txt': 'Text'}
+    NUMBER_FORMAT = "{prefix}-{year}-{sequence:04d}"
+
+    def __init__(self, rates, project_ids, rounding_minutes: int = 0, rounding: str = 'up', prefix: str = 'INV',
+                 counter_file: Optional[str] = None):
+        if rounding not in self.ROUNDING_MODES:
+            raise ValueError(f"Unknown rounding mode: {rounding}")
+        if rounding_minutes < 0:
+            raise ValueError("Rounding minutes cannot be negative")
+        self.rates = rates
+        self.project_ids = project_ids
+        self.rounding_minutes = rounding_minutes
+        self.rounding = rounding
+        self.prefix = prefix
+        self.counter_file = counter_file
+        self.unrated = []       # projects left out of the last build() for lack of a rate
+
+    def billed_seconds(self, seconds: int) -> int:
+        """Round a duration to the billing increment"""
+        increment = self.rounding_minutes * 60
+        if not increment or not seconds:
+            return seconds
+        if self.rounding == 'up':
+            units = -(-seconds // increment)
+        elif self.rounding == 'down':
+            units = seconds // increment
+        else:
+            units = (seconds + increment // 2) // increment
+        return units * increment
+
+    def issued(self) -> Dict[str, int]:
+        """Return {'PREFIX-YEAR': last sequence issued} from the counter file"""
+        if not self.counter_file:
+            return {}
+        try:
+            with open(self.counter_file, 'r', encoding='utf-8') as f:
+                counters = json.load(f)
+            return counters if isinstance(counters, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def record(self, invoices: List[Dict[str, Any]]):
+        """Advance the counter past the invoices issued (it only ever increases)"""
+        if not self.counter_file or not invoices:
+            return
+        counters = self.issued()
+        for invoice in invoices:
+            key = f"{self.prefix}-{invoice['issued'][:4]}"
+            counters[key] = max(int(counters.get(key, 0)), invoice['sequence'])
+        tmp_file = f"{self.counter_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(counters, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_file, self.counter_file)
+
+    def next_sequence(self, entries: Iterable[Dict[str, Any]], year: int) -> int:
+        """First invoice sequence number for a year not yet issued or on an entry"""
+        pattern = re.compile(rf"^{re.escape(self.prefix)}-{year}-(\d+)$")
+        try:
+            used = int(self.issued().get(f"{self.prefix}-{year}", 0))
+        except (TypeError, ValueError):
+            used = 0
+        for entry in entries:
+            match = pattern.match(entry.get('invoice_number') or '')
+            if match:
+                used = max(used, int(match.group(1)))
+        return used + 1
+
+    def build(self, entries: Iterable[Dict[str, Any]], start: Optional[str] = None, end: Optional[str] = None,
+              issued: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Return one invoice per project for uninvoiced entries started between start and end (inclusive)"""
+        issued = issued or date.today()
+        entries = list(entries)
+        sequence = self.next_sequence(entries, issued.year)
+        groups = {}
+        for entry in entries:
+            if entry.get('invoiced') == 'Yes':
+                continue
+            day = (entry.get('start_time') or '')[:10]
+            if (start and day < start) or (end and day > end):
+                continue
+            groups.setdefault((entry.get('project'), entry.get('project_id')), []).append(entry)
+
+        invoices = []
+        self.unrated = []
+        for (project, project_id), project_entries in sorted(groups.items(), key=lambda item: str(item[0][0])):
+            rate = ReportEngine.rate_for(self.rates, self.project_ids, project, project_id)
+            if rate is None:
+                self.unrated.append(project)
+                continue
+            rate, currency = rate
+            hourly = Decimal(str(rate))
+            lines = []
+            for entry in sorted(project_entries, key=lambda e: e.get('start_time') or ''):
+                seconds = DailyRollup.entry_seconds(entry)
+                billed = self.billed_seconds(seconds)
+                hours = Decimal(billed) / 3600
+                lines.append({
+                    'id': entry['id'],
+                    'date': (entry.get('start_time') or '')[:10],
+                    'memo': entry.get('memo') or '',
+                    'seconds': seconds,
+                    'billed_seconds': billed,
+                    'hours': hours.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
+                    'amount': (hours * hourly).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+                })
+            billed_seconds = sum(line['billed_seconds'] for line in lines)
+            invoices.append({
+                'number': self.NUMBER_FORMAT.format(prefix=self.prefix, year=issued.year, sequence=sequence),
+                'sequence': sequence,
+                'issued': issued.isoformat(),
+                'period': (start or lines[0]['date'], end or lines[-1]['date']),
+                'project': project,
+                'project_id': project_id,
+                'rate': hourly.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
+                'currency': currency,
+                'lines': lines,
+                'billed_seconds': billed_seconds,
+                'hours': (Decimal(billed_seconds) / 3600).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
+                'total': sum((line['amount'] for line in lines), Decimal('0.00'))
+            })
+            sequence += 1
+        return invoices
+
+    @staticmethod
+    def render_csv(invoice: Dict[str, Any]) -> str:
+        output = io.StringIO(newline='')
+        writer = csv.writer(output)
+        writer.writerow(['invoice_number', 'project', 'date', 'memo', 'hours', 'rate', 'currency', 'amount'])
+        for line in invoice['lines']:
+            writer.writerow([invoice['number'], invoice['project'], line['date'], line['memo'],
+                             line['hours'], invoice['rate'], invoice['currency'], line['amount']])
+        writer.writerow([invoice['number'], invoice['project'], '', 'Total',
+                         invoice['hours'], '', invoice['currency'], invoice['total']])
+        return output.getvalue()
+
+    @staticmethod
+    def render_text(invoice: Dict[str, Any]) -> str:
+        currency = invoice['currency']
+        lines = [
+            f"INVOICE {invoice['number']}",
+            f"Issued:  {invoice['issued']}",
+            f"Project: {invoice['project']}",
+            f"Period:  {invoice['period'][0]} to {invoice['period'][1]}",
+            f"Rate:    {invoice['rate']} {currency}/hour",
+            "",
+            f"{'Date':<12}{'Hours':>8}  {'Amount':>12}  Description",
+            "-" * 60
+        ]
+        for line in invoice['lines']:
+            memo = " ".join(line['memo'].split())
+            lines.append(f"{line['date']:<12}{line['hours']:>8}  {line['amount']:>12}  {memo}")
+        lines.append("-" * 60)
+        lines.append(f"{'Total':<12}{invoice['hours']:>8}  {invoice['total']:>12}  {currency}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def render_html(invoice: Dict[str, Any]) -> str:
+        escape = html.escape
+        rows = "\n".join(
+            f"<tr><td>{line['date']}</td><td>{escape(line['memo'])}</td>"
+            f"<td class=\"num\">{line['hours']}</td><td class=\"num\">{line['amount']}</td></tr>"
+            for line in invoice['lines']
+        )
+        return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Invoice {escape(invoice['number'])}</title>
+<style>
+body {{ font-family: Segoe UI, Arial, sans-serif; color: #1F2937; margin: 40px; }}
+table {{ border-collapse: collapse; width: 100%; }}
+th, td {{ border-bottom: 1px solid #E5E7EB; padding: 6px 8px; text-align: left; }}
+.num {{ text-align: right; }}
+</style>
+</head>
+<body>
+<h1>Invoice {escape(invoice['number'])}</h1>
+<p>Issued: {invoice['issued']}<br>
+Project: {escape(str(invoice['project']))}<br>
+Period: {invoice['period'][0]} to {invoice['period'][1]}<br>
+Rate: {invoice['rate']} {escape(invoice['currency'])}/hour</p>
+<table>
+<tr><th>Date</th><th>Description</th><th class="num">Hours</th><th class="num">Amount</th></tr>
+{rows}
+<tr><th colspan="2">Total</th><th class="num">{invoice['hours']}</th><th class="num">{invoice['total']} {escape(invoice['currency'])}</th></tr>
+</table>
+</body>
+</html>
+"""
+
+    def write(self, invoices: List[Dict[str, Any]], directory: str, formats: Iterable[str]) -> List[str]:
+        """Write each invoice in each format to directory; returns the file paths.
+
+        Existing files are never overwritten (FileExistsError); nothing is
+        left behind if a write fails.
+        """
+        renderers = {'csv': self.render_csv, 'html': self.render_html, 'txt': self.render_text}
+        os.makedirs(directory, exist_ok=True)
+        written = []
+        try:
+            for invoice in invoices:
+                for fmt in formats:
+                    path = os.path.join(directory, f"{invoice['number']}.{fmt}")
+                    with open(path, 'x', newline='', encoding='utf-8') as f:
+                        written.append(path)
+                        f.write(renderers[fmt](invoice))
+        except BaseException:
+            self.remove(written)
+            raise
+        return written
+
+    @staticmethod
+    def remove(paths: Iterable[str]):
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    @staticmethod
+    def mark(batch: EntryBatch, invoices: List[Dict[str, Any]]):
+        """Queue every invoiced entry's flag and invoice number on batch"""
+        for invoice in invoices:
+            for line in invoice['lines']:
+                batch.update(line['id'], {'invoiced': 'Yes', 'invoice_number': invoice['number']})
+
+
+class ReportExporter:
+    """Writes the results computed for the reports dialog as CSV sheets.
+
+    Nothing is recomputed: sheets are generated from a compute_report()
+    result plus, when available, the time series and session statistics
+    the dialog rendered. A .zip target gets one CSV per sheet, each
+    streamed straight into the archive; any other target gets the summary
+    sheet as a single CSV.
+    """
+
+    SUMMARY_FIELDS = ['project', 'total_hours', 'total_seconds', 'entry_count',
+                      'currency', 'revenue', 'invoiced_revenue', 'uninvoiced_revenue']
+
+    def __init__(self, report: Dict[str, Any], series=None, granularity: Optional[str] = None,
+                 statistics: Optional[SessionStatistics] = None):
+        self.report = report
+        self.series = series
+        self.granularity = granularity
+        self.statistics = statistics
+
+    @staticmethod
+    def _money(amounts: Dict[str, float], currency: str) -> str:
+        return f"{amounts.get(currency, 0.0):.2f}"
+
+    def summary_rows(self):
+        """Per-project totals, largest first, one row per currency"""
+        for (project,), stats in ReportEngine.ranked(self.report['project']):
+            row = [project, f"{stats['seconds'] / 3600:.2f}", stats['seconds'], stats['count']]
+            if not stats['revenue']:
+                yield row + ['', '', '', '']
+            for currency in sorted(stats['revenue']):
+                yield row + [currency, self._money(stats['revenue'], currency),
+                             self._money(stats['invoiced_revenue'], currency),
+                             self._money(stats['uninvoiced_revenue'], currency)]
+
+    def invoicing_rows(self):
+        """Invoiced vs. pending time per project, then the overall totals"""
+        groups = ReportEngine.ranked(self.report['project']) + [(('All projects',), self.report['totals'])]
+        for (project,), stats in groups:
+            yield [project, stats['seconds'], stats['invoiced_seconds'], stats['uninvoiced_seconds'],
+                   f"{stats['invoiced_seconds'] / 3600:.2f}", f"{stats['uninvoiced_seconds'] / 3600:.2f}",
+                   stats['invoiced_count'], stats['uninvoiced_count']]
+
+    def revenue_rows(self):
+        """Revenue per currency for the total, each project and each month"""
+        groups = [('total', '', self.report['totals'])]
+        groups += [('project', project, stats) for (project,), stats in ReportEngine.ranked(self.report['project'])]
+        groups += [('month', month, stats) for (month,), stats in sorted(self.report['month'].items(), reverse=True) if month]
+        for grouping, key, stats in groups:
+            for currency in sorted(stats['revenue']):
+                yield [grouping, key, currency, self._money(stats['revenue'], currency),
+                       self._money(stats['invoiced_revenue'], currency),
+                       self._money(stats['uninvoiced_revenue'], currency)]
+
+    def series_rows(self):
+        """One row per time series bucket (and currency)"""
+        for label, bucket_start, stats in self.series:
+            row = [label, bucket_start.isoformat(), stats['seconds'], f"{stats['seconds'] / 3600:.2f}", stats['count']]
+            revenue = stats.get('revenue') or {}
+            if not revenue:
+                yield row + ['', '']
+            for currency in sorted(revenue):
+                yield row + [currency, f"{revenue[currency]:.2f}"]
+
+    def statistics_rows(self):
+        """Session length summary, percentiles, histogram, heatmap and per-project spread"""
+        stats = self.statistics
+        yield ['summary', 'sessions', stats.count]
+        if not stats.count:
+            return
+        yield ['summary', 'mean_seconds', round(stats.mean_seconds)]
+        yield ['summary', 'min_seconds', stats.min_seconds]
+        yield ['summary', 'max_seconds', stats.max_seconds]
+        for p in (25, 50, 75, 90, 95, 99):
+            yield ['percentile_seconds', f"P{p}", round(stats.percentile(p))]
+        for low, high, count in stats.histogram():
+            yield ['histogram_sessions', f"{low // 60}-{high // 60} min" if high else f"{low // 60}+ min", count]
+        for name, row in zip(("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"), stats.heatmap):
+            for hour, seconds in enumerate(row):
+                yield ['heatmap_seconds', f"{name} {hour:02d}", round(seconds)]
+        for project, (count, mean, deviation) in sorted(stats.project_spread().items()):
+            yield ['project_mean_seconds', project, round(mean)]
+            yield ['project_stddev_seconds', project, round(deviation)]
+
+    def sheets(self):
+        """Yield (file name, header, rows) for every available sheet"""
+        yield 'summary.csv', self.SUMMARY_FIELDS, self.summary_rows()
+        yield 'invoicing.csv', ['project', 'total_seconds', 'invoiced_seconds', 'uninvoiced_seconds', 'invoiced_hours',
+                                'uninvoiced_hours', 'invoiced_count', 'uninvoiced_count'], self.invoicing_rows()
+        yield 'revenue.csv', ['grouping', 'key', 'currency', 'revenue', 'invoiced_revenue', 'uninvoiced_revenue'], self.revenue_rows()
+        if self.series is not None:
+            yield (f"time_series_{self.granularity or 'buckets'}.csv",
+                   ['period', 'start_date', 'total_seconds', 'total_hours', 'entry_count', 'currency', 'revenue'],
+                   self.series_rows())
+        if self.statistics is not None:
+            yield 'statistics.csv', ['section', 'label', 'value'], self.statistics_rows()
+
+    def write(self, filename: str) -> List[str]:
+        """Write a .zip of every sheet, or just the summary as CSV; returns the sheet names"""
+        temp_file = filename + '.tmp'
+        written = []
+        try:
+            if filename.lower().endswith('.zip'):
+                with zipfile.ZipFile(temp_file, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+                    for name, header, rows in self.sheets():
+                        with archive.open(name, 'w') as member, \
+                                io.TextIOWrapper(member, encoding='utf-8', newline='') as f:
+                            writer = csv.writer(f)
+                            writer.writerow(header)
+                            writer.writerows(rows)
+                        written.append(name)
+            else:
+                name, header, rows = next(self.sheets())
+                with open(temp_file, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(header)
+                    writer.writerows(rows)
+                written.append(name)
+            os.replace(temp_file, filename)
+        except BaseException:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+        return written
+
+
+class TaskCancelled(Exception):
+    """Raised inside a BackgroundTask once cancel() has been requested"""
+
+
+class BackgroundTask:
+    """Run func(task) on a worker thread and report back through a queue.
+
+    func may call task.progress(done, total), which raises TaskCancelled
+    after cancel(). The Tk thread reads ('progress', done, total),
+    ('done', result), ('error', exception) and ('cancelled', None)
+    messages with poll(); no Tk calls are made from the worker.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.messages = queue.Queue()
+        self._cancel = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> 'BackgroundTask':
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def progress(self, done: int, total: Optional[int] = None):
+        if self._cancel.is_set():
+            raise TaskCancelled()
+        self.messages.put(('progress', done, total))
+
+    def _run(self):
+        try:
+            if self._cancel.is_set():
+                raise TaskCancelled()
+            result = self.func(self)
+        except TaskCancelled:
+            self.messages.put(('cancelled', None))
+        except Exception as e:
+            self.messages.put(('error', e))
+        else:
+            self.messages.put(('done', result))
+
+    def poll(self) -> List[tuple]:
+        """Return all queued messages without blocking"""
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+
+class TimerSession:
+    """Accounts one timed session in integer nanoseconds of a monotonic clock.
+
+    Durations come only from clock() (time.monotonic_ns by default), so
+    wall-clock jumps (NTP, DST, manual changes) cannot stretch or shrink
+    them and pausing loses no fraction of a second. start_time and
+    last_start are wall-clock datetimes kept for display and storage only.
+    Idle gaps cut from the running segment (cut_idle) are kept apart in
+    idle_ns: elapsed time is net of them, gross time includes them.
+    """
+
+    NS_PER_SECOND = 10 ** 9
+    NS_PER_MS = 10 ** 6
+
+    def __init__(self, clock=time.monotonic_ns, wall_clock=datetime.now):
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.reset()
+
+    def reset(self):
+        self.start_time = None          # wall-clock datetime the session started
+        self.last_start = None          # wall-clock datetime the current segment started
+        self.stop_time = None           # wall-clock datetime the session was stopped
+        self.accumulated_ns = 0         # time in completed segments
+        self.segment_start_ns = None    # clock() when the running segment started
+        self.idle_ns = 0                # idle time cut from the segments
+        self.is_running = False
+
+    @property
+    def is_paused(self) -> bool:
+        return self.is_running and self.segment_start_ns is None
+
+    @property
+    def elapsed_seconds(self) -> int:
+        """Whole seconds in completed segments"""
+        return self.accumulated_ns // self.NS_PER_SECOND
+
+    def start(self):
+        if self.is_running:
+            return
+        self.reset()
+        self.segment_start_ns = self.clock()
+        self.start_time = self.wall_clock()
+        self.last_start = self.start_time
+        self.is_running = True
+
+    def pause(self):
+        if not self.is_running or self.segment_start_ns is None:
+            return
+        self.accumulated_ns += self.clock() - self.segment_start_ns
+        self.segment_start_ns = None
+
+    def resume(self):
+        if not self.is_paused:
+            return
+        self.segment_start_ns = self.clock()
+        self.last_start = self.wall_clock()
+
+    def stop(self) -> int:
+        """End the session and return its duration in seconds, rounded once.
+
+        start_time and stop_time stay set until reset() so the caller can
+        record them; stopping again returns the same duration.
+        """
+        self.pause()
+        if self.is_running:
+            self.stop_time = self.wall_clock()
+        self.is_running = False
+        return (self.accumulated_ns + self.NS_PER_SECOND // 2) // self.NS_PER_SECOND
+
+    def cut_idle(self, since_ns: int, until_ns: Optional[int] = None) -> int:
+        """Remove the idle gap [since_ns, until_ns] from the running segment.
+
+        The segment is split: the part before the gap is kept and a new one
+        starts at until_ns. Returns the nanoseconds cut (0 if paused).
+        """
+        if self.segment_start_ns is None:
+            return 0
+        until_ns = self.clock() if until_ns is None else until_ns
+        since_ns = max(since_ns, self.segment_start_ns)
+        if since_ns >= until_ns:
+            return 0
+        self.accumulated_ns += since_ns - self.segment_start_ns
+        self.segment_start_ns = until_ns
+        self.last_start = self.wall_clock()
+        self.idle_ns += until_ns - since_ns
+        return until_ns - since_ns
+
+    def gross_seconds(self) -> int:
+        """Duration including cut idle time, in seconds rounded once"""
+        return (self.elapsed_ns() + self.idle_ns + self.NS_PER_SECOND // 2) // self.NS_PER_SECOND
+
+    def restore(self, start_time: datetime, elapsed_ns: int, paused: bool = False, idle_ns: int = 0):
+        """Continue a session recorded elsewhere (e.g. a checkpoint) from elapsed_ns and idle_ns"""
+        self.reset()
+        self.start_time = start_time
+        self.accumulated_ns = elapsed_ns
+        self.idle_ns = idle_ns
+        self.is_running = True
+        if not paused:
+            self.segment_start_ns = self.clock()
+            self.last_start = self.wall_clock()
+
+    def elapsed_ns(self, now: Optional[int] = None) -> int:
+        total = self.accumulated_ns
+        if self.segment_start_ns is not None:
+            total += (self.clock() if now is None else now) - self.segment_start_ns
+        return total
+
+    def seconds(self, now: Optional[int] = None) -> int:
+        """Whole seconds elapsed, as displayed"""
+        return self.elapsed_ns(now) // self.NS_PER_SECOND
+
+    def next_tick_ms(self, now: Optional[int] = None, unit_seconds: int = 1) -> int:
+        """Milliseconds until the elapsed time reaches its next whole unit (second by default)"""
+        unit_ns = unit_seconds * self.NS_PER_SECOND
+        remaining = unit_ns - self.elapsed_ns(now) % unit_ns
+        return remaining // self.NS_PER_MS + 1
+
+
+class TimerManager:
+    """Any number of concurrent timers, each a TimerSession with its project.
+
+    Timers live in one dict keyed by a small integer ID, in start order.
+    next_tick_ms() is the delay until the soonest running timer reaches
+    its next displayed unit, so a single scheduled callback can redraw
+    every display; stop() hands back the entry record to be saved.
+    """
+
+    def __init__(self, clock=time.monotonic_ns, wall_clock=datetime.now, first_id: int = 1):
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.timers: Dict[int, Dict[str, Any]] = {}
+        self._next_id = first_id
+
+    def __len__(self) -> int:
+        return len(self.timers)
+
+    def __contains__(self, timer_id) -> bool:
+        return timer_id in self.timers
+
+    def __iter__(self):
+        return iter(list(self.timers.items()))
+
+    def session(self, timer_id: int) -> TimerSession:
+        return self.timers[timer_id]['session']
+
+    def start(self, project: str, project_id: Optional[str] = None, memo: str = '') -> int:
+        """Start a new timer and return its ID"""
+        session = TimerSession(clock=self.clock, wall_clock=self.wall_clock)
+        session.start()
+        return self._add(session, project, project_id, memo)
+
+    def restore(self, project: str, project_id: Optional[str], memo: str, start_time: datetime,
+                elapsed_ns: int, paused: bool = False, idle_ns: int = 0) -> int:
+        """Continue a timer recorded elsewhere (e.g. a checkpoint) and return its ID"""
+        session = TimerSession(clock=self.clock, wall_clock=self.wall_clock)
+        session.restore(start_time, elapsed_ns, paused=paused, idle_ns=idle_ns)
+        return self._add(session, project, project_id, memo)
+
+    def _add(self, session: TimerSession, project: str, project_id: Optional[str], memo: str) -> int:
+        timer_id = self._next_id
+        self._next_id += 1
+        self.timers[timer_id] = {'session': session, 'project': project,
+                                 'project_id': project_id, 'memo': memo}
+        return timer_id
+
+    def toggle_pause(self, timer_id: int) -> bool:
+        """Pause a running timer or resume a paused one; returns True if now paused"""
+        session = self.session(timer_id)
+        if session.is_paused:
+            session.resume()
+        else:
+            session.pause()
+        return session.is_paused
+
+    def stop(self, timer_id: int, stop_time: Optional[datetime] = None) -> Dict[str, Any]:
+        """Remove a timer and return its session as an entry record"""
+        timer = self.timers.pop(timer_id)
+        session = timer['session']
+        seconds = session.stop()
+        gross_seconds = session.gross_seconds()
+        stop_time = stop_time or self.wall_clock()
+        h, rem = divmod(seconds, 3600)
+        m, s = divmod(rem, 60)
+        return {
+            "project": timer['project'],
+            "memo": timer['memo'],
+            "start_time": session.start_time.strftime("%Y-%m-%d %H:%M:%S"),
+            "stop_time": stop_time.strftime("%Y-%m-%d %H:%M:%S"),
+            "duration": f"{h:02d}:{m:02d}:{s:02d}",
+            "duration_seconds": int(seconds),
+            "gross_duration_seconds": gross_seconds,
+            "invoiced": "No",
+            "project_id": timer['project_id']
+        }
+
+    def cut_idle(self, since_ns: int, until_ns: int) -> int:
+        """Cut an idle gap from every running timer; returns the most nanoseconds cut from one"""
+        return max([self.session(timer_id).cut_idle(since_ns, until_ns) for timer_id in self.running()], default=0)
+
+    def running(self) -> List[int]:
+        """IDs of the timers that are counting (not paused)"""
+        return [timer_id for timer_id, timer in self.timers.items()
+                if not timer['session'].is_paused]
+
+    def next_tick_ms(self, now: Optional[int] = None, unit_seconds: int = 1) -> Optional[int]:
+        """Milliseconds until the soonest running timer reaches its next unit, or None if none run"""
+        now = self.clock() if now is None else now
+        delays = [self.session(timer_id).next_tick_ms(now, unit_seconds) for timer_id in self.running()]
+        return min(delays) if delays else None
+
+
+class IdleDetector:
+    """Detects when the user has been away for threshold_seconds.
+
+    Idle time comes from provider, which returns the seconds since the
+    last input anywhere on the system (OS idle time), so work in other
+    applications counts as activity. Without a provider (no system idle
+    time on this platform) the detector is disabled: input seen by the
+    app alone cannot tell an absent user from one working elsewhere.
+    check() is run once at the deadline and returns the delay to the next
+    deadline, or flags the user idle and is then polled every
+    POLL_IDLE_MS to notice the return; input in the app ends the idle
+    period at once through activity(). The provider may block (macOS
+    asks ioreg), so read() can run on a worker thread and its reading be
+    passed to check() on the Tk thread. A failing provider is reported to
+    on_error and leaves the idle state as it was until a reading
+    succeeds. Idle spans are (since, until) pairs of clock() nanoseconds.
+    """
+
+    POLL_IDLE_MS = 5000
+
+    def __init__(self, threshold_seconds: int, clock=time.monotonic_ns, provider=None, on_error=None):
+        self.threshold_ns = int(threshold_seconds) * TimerSession.NS_PER_SECOND
+        self.clock = clock
+        self.provider = provider
+        self.on_error = on_error
+        self.last_activity_ns = clock()
+        self.idle_since_ns = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ns > 0 and self.provider is not None
+
+    @property
+    def is_idle(self) -> bool:
+        return self.idle_since_ns is not None
+
+    def read(self) -> tuple:
+        """Return (clock(), system idle nanoseconds or the provider's exception); safe on a worker thread"""
+        try:
+            return self.clock(), int(self.provider() * TimerSession.NS_PER_SECOND)
+        except Exception as e:
+            return self.clock(), e
+
+    def idle_ns(self, now: int, system_idle_ns: int) -> int:
+        """Nanoseconds since the last input on the system (or in the app, if later)"""
+        return max(0, min(system_idle_ns, now - self.last_activity_ns))
+
+    def activity(self, now: Optional[int] = None) -> Optional[tuple]:
+        """Record input; returns the idle span it ends, if the user was idle"""
+        now = self.clock() if now is None else now
+        self.last_activity_ns = now
+        since, self.idle_since_ns = self.idle_since_ns, None
+        return (since, now) if since is not None else None
+
+    def check(self, reading: Optional[tuple] = None) -> tuple:
+        """Return (idle span ended, or None; milliseconds to the next check) for
+        a read() reading, taken now if not given"""
+        now, idle = self.read() if reading is None else reading
+        if isinstance(idle, Exception):
+            if self.on_error:
+                self.on_error(f"System idle time unavailable: {idle}")
+            return None, self.POLL_IDLE_MS if self.is_idle else self.threshold_ns // TimerSession.NS_PER_MS + 1
+        idle = self.idle_ns(now, idle)
+        if self.idle_since_ns is None:
+            if idle < self.threshold_ns:
+                return None, (self.threshold_ns - idle) // TimerSession.NS_PER_MS + 1
+            self.idle_since_ns = now - idle
+            return None, self.POLL_IDLE_MS
+        if now - idle > self.idle_since_ns:
+            # The system saw input since the idle period began
+            span = self.activity(now - idle)
+            return span, (self.threshold_ns - idle) // TimerSession.NS_PER_MS + 1
+        return None, self.POLL_IDLE_MS
+
+    @staticmethod
+    def system_provider():
+        """A callable returning the OS idle time in seconds, or None if unsupported here"""
+        if sys.platform == 'win32':
+            import ctypes
+            import ctypes.wintypes
+
+            class LASTINPUTINFO(ctypes.Structure):
+                _fields_ = [('cbSize', ctypes.wintypes.UINT), ('dwTime', ctypes.wintypes.DWORD)]
+
+            def windows_idle_seconds():
+                info = LASTINPUTINFO(cbSize=ctypes.sizeof(LASTINPUTINFO))
+                if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+                    raise OSError("GetLastInputInfo failed")
+                return ((ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF) / 1000.0
+            return windows_idle_seconds
+        if sys.platform == 'darwin':
+            def mac_idle_seconds():
+                output = subprocess.run(['ioreg', '-c', 'IOHIDSystem', '-d', '4'],
+                                        capture_output=True, text=True, timeout=2).stdout
+                match = re.search(r'"HIDIdleTime" = (\d+)', output)
+                if not match:
+                    raise OSError("HIDIdleTime not reported")
+                return int(match.group(1)) / 1e9
+            return mac_idle_seconds
+        return None
+
+
+class SessionCheckpoint:
+    """Crash-safe record of the running session in a small fixed-size file.
+
+    The file holds two SLOT_SIZE slots that are overwritten in place,
+    alternately, each with a sequence number and CRC32; a write torn by a
+    crash leaves the other slot intact and read() returns the newest
+    valid one. Times are stored as whole seconds of wall-clock time since
+    1970-01-01 (no time zone), the elapsed (net) and cut idle time in
+    nanoseconds at the moment of the checkpoint. Text fields are truncated
+    to fit their slot. Version 1 slots, written before idle time was
+    stored, still read back with no idle time.
+    """
+
+    MAGIC = b'TTCK'
+    VERSION = 2
+    SLOT_SIZE = 1024
+    FLAG_PAUSED = 1
+    HEADER = struct.Struct('<4sHHQqqqQQ')   # magic, version, flags, sequence, start, last start, saved at, elapsed ns, idle ns
+    HEADER_V1 = struct.Struct('<4sHHQqqqQ')
+    TEXT_FIELDS = (('project', 160), ('project_id', 64), ('memo', 740))
+    EPOCH = datetime(1970, 1, 1)
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.sequence = 0
+        self._file = None
+
+    @classmethod
+    def _seconds(cls, value: Optional[datetime]) -> int:
+        return int((value - cls.EPOCH).total_seconds()) if value else 0
+
+    @classmethod
+    def _datetime(cls, seconds: int) -> Optional[datetime]:
+        return cls.EPOCH + timedelta(seconds=seconds) if seconds else None
+
+    @staticmethod
+    def _text(value, size: int) -> bytes:
+        encoded = (value or '').encode('utf-8')[:size]
+        return encoded.decode('utf-8', 'ignore').encode('utf-8').ljust(size, b'\0')
+
+    def _pack(self, state: Dict[str, Any]) -> bytes:
+        record = self.HEADER.pack(
+            self.MAGIC, self.VERSION, self.FLAG_PAUSED if state.get('paused') else 0, self.sequence,
+            self._seconds(state.get('start_time')), self._seconds(state.get('last_start')),
+            self._seconds(state.get('saved_at') or datetime.now()), state.get('elapsed_ns', 0),
+            state.get('idle_ns', 0)
+        )
+        record += b''.join(self._text(state.get(name), size) for name, size in self.TEXT_FIELDS)
+        record = record.ljust(self.SLOT_SIZE - 4, b'\0')
+        return record + struct.pack('<I', zlib.crc32(record))
+
+    def _unpack(self, slot: bytes) -> Optional[Dict[str, Any]]:
+        if len(slot) != self.SLOT_SIZE or zlib.crc32(slot[:-4]) != struct.unpack('<I', slot[-4:])[0]:
+            return None
+        magic, version = struct.unpack_from('<4sH', slot)
+        if magic != self.MAGIC or version not in (1, self.VERSION):
+            return None
+        header = self.HEADER if version == self.VERSION else self.HEADER_V1
+        _, _, flags, sequence, start, last_start, saved_at, elapsed_ns, *idle = header.unpack_from(slot)
+        state = {
+            'sequence': sequence,
+            'paused': bool(flags & self.FLAG_PAUSED),
+            'start_time': self._datetime(start),
+            'last_start': self._datetime(last_start),
+            'saved_at': self._datetime(saved_at),
+            'elapsed_ns': elapsed_ns,
+            'idle_ns': idle[0] if idle else 0
+        }
+        offset = header.size
+        for name, size in self.TEXT_FIELDS:
+            state[name] = slot[offset:offset + size].rstrip(b'\0').decode('utf-8', 'ignore')
+            offset += size
+        return state
+
+    def write(self, state: Dict[str, Any]):
+        """Overwrite the older slot with state (project, project_id, memo,
+        start_time, last_start, elapsed_ns, idle_ns, paused) and flush it to disk"""
+        if self._file is None:
+            existing = self.read()
+            self.sequence = existing['sequence'] if existing else 0
+            mode = 'r+b' if os.path.exists(self.filename) else 'w+b'
+            self._file = open(self.filename, mode)
+            self._file.truncate(2 * self.SLOT_SIZE)
+        self.sequence += 1
+        self._file.seek((self.sequence % 2) * self.SLOT_SIZE)
+        self._file.write(self._pack(state))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Return the newest intact checkpoint, or None"""
+        try:
+            with open(self.filename, 'rb') as f:
+                data = f.read(2 * self.SLOT_SIZE)
+        except OSError:
+            return None
+        states = [self._unpack(data[i:i + self.SLOT_SIZE]) for i in (0, self.SLOT_SIZE)]
+        states = [state for state in states if state and state['start_time']]
+        return max(states, key=lambda state: state['sequence']) if states else None
+
+    def clear(self):
+        """Forget the checkpoint once the session has been saved or discarded"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+
 class TimeTrackerApp:
+    # Groupings shown by every report view
+    REPORT_GROUPINGS = {
+        'total': (),
+        'project': ('project',),
+        'month': ('month',)
+    }
+    # Rollup saves after a mutation are coalesced over this delay
+    ROLLUP_SAVE_DELAY_MS = 5000
+    # How often a system idle time reading is looked for while it is taken
+    IDLE_READ_POLL_MS = 20
+
     def __init__(self, root):
         self.root = root
         self.root.title("⏱️ TimeTracker Pro")
@@ -324,6 +3168,7 @@ class TimeTrackerApp:
         
         # Window management - track open dialogs and prevent multiple instances
         self.open_dialogs = {}
+        self.reports_view = None
         
         # Modern color palette
         self.colors = {
@@ -356,18 +3201,44 @@ class TimeTrackerApp:
         self.backup_dir = 'backups'
         self.projects_file = 'projects.json'
         self.invoice_rates_file = 'invoice_rates.json'
+        self.invoice_dir = 'invoices'
+        self.export_marks_file = 'export_marks.json'
+        self.invoice_counter_file = 'invoice_counter.json'
+        self.checkpoint_file = 'session_checkpoint.bin'
+        self.rollup_file = 'rollup.json'
         
         # Load configuration
         self.load_config()
+
+        # Time entry data layer
+        self.store = EntryStore(self.data_file, backup_callback=self._backup_after_save)
+        self.rollup = DailyRollup(
+            self.store, self.rollup_file,
+            schedule_save=lambda flush: self.root.after(self.ROLLUP_SAVE_DELAY_MS, flush)
+        )
+        self.report_cache = ReportCache(self.store)
+        self.incremental_export = IncrementalExport(self.store, self.export_marks_file)
+        self.live_report = IncrementalReport(
+            self.rollup,
+            self.REPORT_GROUPINGS,
+            verify=self.config.get('verify_aggregates', False),
+            on_mismatch=self.log_error
+        )
         
         # State
         self.project_name = tk.StringVar()
-        self.start_time = None          # datetime when session started
-        self.last_start = None          # datetime when the current running segment started
-        self.elapsed_seconds = 0        # total accumulated seconds across segments
-        self.is_running = False
-        self.is_paused = False
+        self.timer = TimerSession()     # start_time, last_start, elapsed_seconds, is_running, is_paused
         self.timer_after_id = None
+        self.timer_visible = True       # False while the window is minimized, hidden or covered
+        self.session_checkpoint = SessionCheckpoint(self.checkpoint_file)
+        self.interrupted_timers = self.find_timer_checkpoints()    # timer ID -> checkpoint left by a previous run
+        # concurrent timers besides the main one, numbered past any left to recover
+        self.timers = TimerManager(first_id=max(self.interrupted_timers, default=0) + 1)
+        self.timer_rows = {}            # timer ID -> widgets of its row in the Other Timers card
+        self.timer_checkpoints = {}     # timer ID -> checkpoint of a concurrent timer
+        self.checkpoint_after_id = None
+        self.idle_detector = self.create_idle_detector()
+        self.idle_after_id = None
         
         # Project management
         self.projects = []
@@ -385,11 +3256,31 @@ class TimeTrackerApp:
             'body': ('Segoe UI', 11),
             'button': ('Segoe UI', 10, 'bold'),
             'small': ('Segoe UI', 9),
-            'timer': ('Segoe UI', 14, 'bold')
+            'timer': ('Segoe UI', 14, 'bold'),
+            'mono': ('Consolas', 10)
         }
 
         self.create_ui()
 
+        # Only redraw the elapsed time while it can be seen
+        self.root.bind("<Unmap>", self.on_window_hidden, add="+")
+        self.root.bind("<Map>", self.on_window_shown, add="+")
+        self.root.bind("<FocusIn>", self.on_window_shown, add="+")
+        self.root.bind("<Visibility>", self.on_window_visibility, add="+")
+        # Keys and clicks anywhere in the app end an idle period at once; mouse
+        # movement is left to the system idle time rather than a callback per event
+        for sequence in ("<Key>", "<Button>"):
+            self.root.bind_all(sequence, self.on_user_activity, add="+")
+        if self.config.get('idle_threshold_minutes') and not self.idle_detector.enabled:
+            self.update_status("💤 Idle detection is not supported on this system; idle time is not cut",
+                               self.colors['warning'])
+
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Offer to recover sessions left running by a crash or forced shutdown
+        if self.session_checkpoint.read() or self.interrupted_timers:
+            self.root.after(500, self.offer_session_recovery)
+
     def create_ui(self):
         """Create the modern UI layout"""
         # Create menu bar
@@ -448,6 +3339,9 @@ class TimeTrackerApp:
         
         # Timer controls card
         self.create_timer_controls(main_frame)
+
+        # Concurrent timers card
+        self.create_other_timers_card(main_frame)
         
         # Status section
         self.create_status_section(main_frame)
@@ -464,7 +3358,9 @@ class TimeTrackerApp:
         # File Menu
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="📁 File", menu=file_menu)
-        file_menu.add_command(label="📤 Export to CSV", command=lambda: self.export_to_csv(self.load_data()))
+        file_menu.add_command(label="📤 Export to CSV", command=self.export_to_csv)
+        file_menu.add_command(label="📊 Export for Analytics", command=self.export_columnar)
+        file_menu.add_command(label="🔁 Incremental Export", command=self.show_incremental_export)
         file_menu.add_command(label="📥 Import from CSV", command=self.import_from_csv)
         file_menu.add_separator()
         file_menu.add_command(label="💾 Create Backup", command=self.manual_backup)
@@ -484,6 +3380,7 @@ class TimeTrackerApp:
         menubar.add_cascade(label="🛠️ Tools", menu=tools_menu)
         tools_menu.add_command(label="📋 Project Management", command=self.show_project_manager)
         tools_menu.add_command(label="💰 Invoice Rates", command=self.show_invoice_rates)
+        tools_menu.add_command(label="🧾 Generate Invoices", command=self.show_invoice_generator)
         tools_menu.add_command(label="⚙️ Data Management", command=self.import_export_dialog)
         tools_menu.add_command(label="🔧 Settings", command=self.show_settings)
         
@@ -701,6 +3598,83 @@ class TimeTrackerApp:
         # )
         # invoiced_checkbox.pack()
 
+    def create_other_timers_card(self, parent):
+        """Create the card listing timers that run alongside the main one"""
+        card = self.create_card_frame(parent, "⏱️ Other Timers")
+        card.pack(fill="x", pady=(0, 15))
+
+        content_frame = tk.Frame(card, bg=self.colors['bg_card'], padx=20, pady=15)
+        content_frame.pack(fill="x")
+
+        header_frame = tk.Frame(content_frame, bg=self.colors['bg_card'])
+        header_frame.pack(fill="x")
+
+        tk.Label(
+            header_frame,
+            text="Run another timer (e.g. on-call) for the project above",
+            bg=self.colors['bg_card'],
+            fg=self.colors['text_secondary'],
+            font=self.fonts['small']
+        ).pack(side=tk.LEFT)
+
+        self.create_modern_button(
+            header_frame,
+            "➕ Start Another",
+            self.start_other_timer,
+            bg_color=self.colors['secondary'],
+            hover_color=self.colors['secondary_hover'],
+            width=16
+        ).pack(side=tk.RIGHT)
+
+        self.other_timers_frame = tk.Frame(content_frame, bg=self.colors['bg_card'])
+        self.other_timers_frame.pack(fill="x", pady=(10, 0))
+
+    def add_timer_row(self, timer_id: int):
+        """Add a row with the project, elapsed time and controls of a concurrent timer"""
+        timer = self.timers.timers[timer_id]
+        row = tk.Frame(self.other_timers_frame, bg=self.colors['bg_card'])
+        row.pack(fill="x", pady=2)
+
+        tk.Label(
+            row,
+            text=f"📁 {timer['project']}",
+            bg=self.colors['bg_card'],
+            fg=self.colors['text_primary'],
+            font=self.fonts['body'],
+            anchor="w"
+        ).pack(side=tk.LEFT, fill="x", expand=True)
+
+        stop_button = self.create_modern_button(
+            row,
+            "⏹ Stop",
+            lambda: self.stop_other_timer(timer_id),
+            bg_color=self.colors['danger'],
+            hover_color=self.colors['danger_hover'],
+            width=8
+        )
+        stop_button.pack(side=tk.RIGHT)
+
+        pause_button = self.create_modern_button(
+            row,
+            "⏸ Pause",
+            lambda: self.toggle_other_timer(timer_id),
+            bg_color=self.colors['pause'],
+            hover_color=self.colors['pause_hover'],
+            width=8
+        )
+        pause_button.pack(side=tk.RIGHT, padx=(0, 5))
+
+        elapsed_label = tk.Label(
+            row,
+            text=self.format_elapsed(0),
+            bg=self.colors['bg_card'],
+            fg=self.colors['primary'],
+            font=self.fonts['heading']
+        )
+        elapsed_label.pack(side=tk.RIGHT, padx=10)
+
+        self.timer_rows[timer_id] = {'frame': row, 'elapsed': elapsed_label, 'pause': pause_button}
+
     def create_settings_card(self, parent):
         """Create the settings section"""
         card = self.create_card_frame(parent, "⚙️ Quick Settings")
@@ -792,7 +3766,15 @@ class TimeTrackerApp:
             'always_on_top': True,
             'auto_backup': True,
             'backup_interval_days': 7,
-            'theme': 'default'
+            'theme': 'default',
+            'verify_aggregates': False,
+            'invoice_rounding_minutes': 0,
+            'invoice_rounding': 'up',
+            'invoice_prefix': 'INV',
+            'checkpoint_interval_seconds': 30,
+            'timer_display_minutes': False,
+            'import_workers': 0,
+            'idle_threshold_minutes': 0
         }
         
         try:
@@ -877,6 +3859,22 @@ class TimeTrackerApp:
         except Exception as e:
             self.log_error(f"Failed to save invoice rates: {e}")
 
+    def billing_rates(self):
+        """Return (project_id -> (rate, currency), project name -> id) lookups"""
+        rates = {}
+        for project_id, rate_data in self.invoice_rates.items():
+            try:
+                rates[project_id] = (float(rate_data['rate']), rate_data.get('currency', 'USD'))
+            except (KeyError, TypeError, ValueError):
+                continue
+        project_ids = {p.get('name'): p.get('id') for p in self.projects}
+        return rates, project_ids
+
+    @staticmethod
+    def billing_key(rates, project_ids):
+        """Hashable form of billing_rates() for use in report cache keys"""
+        return tuple(sorted(rates.items())), tuple(sorted(project_ids.items(), key=repr))
+
     def get_project_by_id(self, project_id):
         """Get project by ID"""
         for project in self.projects:
@@ -906,6 +3904,18 @@ class TimeTrackerApp:
         m, s = divmod(rem, 60)
         return f"{h:02d}:{m:02d}:{s:02d}"
 
+    def format_entry_row(self, position: int, entry: Dict[str, Any]) -> str:
+        """Format a time entry as a single line for the entries listbox"""
+        memo = entry.get('memo', '') or ""
+        memo_snippet = (memo[:30] + "…") if len(memo) > 30 else memo
+        proj = entry.get('project', '')
+        st = entry.get('start_time', '')
+        et = entry.get('stop_time', '')
+        dur = entry.get('duration') or self.format_seconds(entry.get('duration_seconds', 0))
+        invoiced_status = entry.get('invoiced', 'No')
+        invoiced_icon = "💰" if invoiced_status == "Yes" else "📝"
+        return f"{position+1}. {proj} | {st} - {et} | {dur} | {invoiced_icon} {invoiced_status} | 📝 {memo_snippet}"
+
     def toggle_always_on_top(self):
         """Toggle always-on-top setting"""
         if hasattr(self, 'always_on_top') and self.always_on_top:
@@ -914,13 +3924,18 @@ class TimeTrackerApp:
             self.save_config()
 
     def schedule_tick(self):
-        # ensure only one scheduled callback alive
-        if self.timer_after_id is not None:
-            try:
-                self.root.after_cancel(self.timer_after_id)
-            except Exception:
-                pass
-        self.timer_after_id = self.root.after(1000, self.update_elapsed_time)
+        # ensure only one scheduled callback alive, shared by every timer display
+        self.cancel_tick()
+        # Fire just after the soonest running timer reaches its next displayed unit
+        # so no display lags or skips, however late the previous tick ran
+        unit = 60 if self.config.get('timer_display_minutes', False) else 1
+        now = self.timer.clock()
+        delays = [self.timer.next_tick_ms(now, unit_seconds=unit)] if self.is_running and not self.is_paused else []
+        others = self.timers.next_tick_ms(now, unit_seconds=unit)
+        if others is not None:
+            delays.append(others)
+        if delays:
+            self.timer_after_id = self.root.after(min(delays), self.update_elapsed_time)
 
     def cancel_tick(self):
         if self.timer_after_id is not None:
@@ -931,13 +3946,54 @@ class TimeTrackerApp:
             self.timer_after_id = None
 
     def update_elapsed_time(self):
-        if not self.is_running or self.is_paused:
+        self.timer_after_id = None
+        if not self.timer_visible:
+            # No wakeups while out of sight; showing the window redraws
             return
-        now = datetime.now()
-        total = self.elapsed_seconds + int((now - self.last_start).total_seconds())
-        self.elapsed_label.config(text=f"{self.format_seconds(total)}")
+        if self.is_running:
+            self.elapsed_label.config(text=self.format_elapsed(self.timer.seconds()))
+        for timer_id, timer in self.timers:
+            if timer_id in self.timer_rows:
+                self.timer_rows[timer_id]['elapsed'].config(text=self.format_elapsed(timer['session'].seconds()))
+        # Reschedules only while some timer is counting
         self.schedule_tick()
 
+    def format_elapsed(self, seconds: int) -> str:
+        """Elapsed time at the display resolution (HH:MM:SS, or HH:MM in minute mode)"""
+        if self.config.get('timer_display_minutes', False):
+            return self.format_seconds(seconds)[:-3]
+        return self.format_seconds(seconds)
+
+    def on_window_hidden(self, event=None):
+        """Stop redrawing the elapsed time while the main window is minimized or withdrawn"""
+        if event is not None and event.widget is not self.root:
+            return
+        self.timer_visible = False
+        self.cancel_tick()
+
+    def on_window_shown(self, event=None):
+        """Redraw the elapsed time straight away when the main window is shown or focused"""
+        if event is not None and event.widget is not self.root and str(event.type) != 'FocusIn':
+            return
+        self.timer_visible = True
+        if self.timer_after_id is None:
+            self.update_elapsed_time()
+
+    def on_window_visibility(self, event):
+        if event.widget is not self.root:
+            return
+        if str(event.state) == 'VisibilityFullyObscured':
+            self.on_window_hidden()
+        else:
+            self.on_window_shown()
+
+    def toggle_timer_resolution(self):
+        """Switch the elapsed time display between seconds and minutes"""
+        if hasattr(self, 'timer_display_minutes') and self.timer_display_minutes:
+            self.config['timer_display_minutes'] = self.timer_display_minutes.get()
+            self.save_config()
+            self.update_elapsed_time()
+
     def log_error(self, message: str):
         """Log error messages to status label"""
         self.status_label.config(text=f"⚠️ {message}", fg=self.colors['danger'])
@@ -975,32 +4031,33 @@ class TimeTrackerApp:
             return False
 
     def load_data(self) -> List[Dict[str, Any]]:
-        """Load time tracking data from file"""
+        """Load time tracking data (a copy callers may modify freely)"""
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if not isinstance(data, list):
-                        data = []
-            else:
-                data = []
-            return data
+            return [dict(entry) for entry in self.store.load()]
         except Exception as e:
             self.log_error(f"Failed to load data: {e}")
             return []
 
     def save_data(self, data: List[Dict[str, Any]]):
-        """Save time tracking data to file"""
+        """Replace all time tracking data with the given entries"""
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
-            
-            # Auto-backup if enabled
-            if self.config.get('auto_backup', True):
-                self.auto_backup_data()
-                
+            self.store.replace_all(data)
+        except Exception as e:
+            self.log_error(f"Failed to save data: {e}")
+
+    def commit_batch(self, batch: EntryBatch) -> Optional[ChangeSet]:
+        """Commit a batch of entry changes, reporting failures to the user"""
+        try:
+            return batch.commit()
         except Exception as e:
             self.log_error(f"Failed to save data: {e}")
+            messagebox.showerror("Save Error", f"Failed to save changes: {e}")
+            return None
+
+    def _backup_after_save(self):
+        """Auto-backup hook run once per data write"""
+        if self.config.get('auto_backup', True):
+            self.auto_backup_data()
 
     def auto_backup_data(self):
         """Create automatic backup of data"""
@@ -1031,9 +4088,33 @@ class TimeTrackerApp:
     # -------------------------------
     # Actions
     # -------------------------------
+    @property
+    def start_time(self) -> Optional[datetime]:
+        return self.timer.start_time
+
+    @property
+    def last_start(self) -> Optional[datetime]:
+        return self.timer.last_start
+
+    @property
+    def elapsed_seconds(self) -> int:
+        return self.timer.elapsed_seconds
+
+    @property
+    def is_running(self) -> bool:
+        return self.timer.is_running
+
+    @property
+    def is_paused(self) -> bool:
+        return self.timer.is_paused
+
     def start_timer(self):
         if self.is_running:
             return
+        if self.start_time is not None:
+            messagebox.showwarning("Session Not Saved",
+                                   "The stopped session has not been saved yet. Press Stop to try saving it again.")
+            return
 
         project = self.project_name.get().strip()
         if not project:
@@ -1041,11 +4122,8 @@ class TimeTrackerApp:
             return
 
         # Initialize session state
-        self.start_time = datetime.now()
-        self.last_start = self.start_time
-        self.elapsed_seconds = 0
-        self.is_running = True
-        self.is_paused = False
+        self.timer.start()
+        self.checkpoint_session()
 
         # UI state
         self.start_button.config(state=tk.DISABLED, bg=self.colors['text_muted'])
@@ -1057,6 +4135,7 @@ class TimeTrackerApp:
 
         # Start ticking
         self.update_elapsed_time()
+        self.schedule_idle_check()
         self.update_status(f"Timer started for: {project}")
 
         messagebox.showinfo("Timer Started", f"Timer started for project: {project}")
@@ -1067,33 +4146,34 @@ class TimeTrackerApp:
 
         if not self.is_paused:
             # Pause
-            self.is_paused = True
-            self.elapsed_seconds += int((datetime.now() - self.last_start).total_seconds())
-            self.cancel_tick()
+            self.timer.pause()
+            self.checkpoint_session()
+            self.schedule_tick()
+            self.elapsed_label.config(text=self.format_elapsed(self.timer.seconds()))
             self.pause_button.config(text="▶ Resume", bg=self.colors['secondary'])
             self.update_status("Timer paused")
         else:
             # Resume
-            self.is_paused = False
-            self.last_start = datetime.now()
+            self.timer.resume()
+            self.checkpoint_session()
             self.pause_button.config(text="⏸ Pause", bg=self.colors['pause'])
             self.update_elapsed_time()
+            self.schedule_idle_check()
             self.update_status("Timer resumed")
 
     def stop_timer(self):
-        if not self.is_running:
+        # A stopped session whose save failed keeps its start time and can be stopped again
+        if not self.is_running and self.start_time is None:
             return
 
-        # Freeze time accounting
-        if not self.is_paused:
-            self.elapsed_seconds += int((datetime.now() - self.last_start).total_seconds())
-
-        total_seconds = self.elapsed_seconds
+        # Freeze time accounting; the checkpoint keeps the final state until saved
+        total_seconds = self.timer.stop()
+        self.checkpoint_session()
         duration_str = self.format_seconds(total_seconds)
-        stop_time = datetime.now()
+        stop_time = self.timer.stop_time
 
-        # Stop UI updates
-        self.cancel_tick()
+        # Stop UI updates (other timers keep ticking and checkpointing)
+        self.schedule_tick()
 
         # Prepare record
         record = {
@@ -1103,31 +4183,314 @@ class TimeTrackerApp:
             "stop_time": stop_time.strftime("%Y-%m-%d %H:%M:%S"),
             "duration": duration_str,
             "duration_seconds": int(total_seconds),
+            "gross_duration_seconds": self.timer.gross_seconds(),  # including idle time cut
             "invoiced": "No",  # Default to not invoiced
             "project_id": self.current_project_id  # Store project ID for reference
         }
 
-        # Load existing data and append new record
-        data = self.load_data()
-        data.append(record)
-        self.save_data(data)
+        # Append the new record with a single write
+        batch = self.store.begin()
+        batch.add(record)
+        if self.commit_batch(batch) is None:
+            # Keep the stopped session and its checkpoint for another try or recovery
+            self.pause_button.config(state=tk.DISABLED, text="⏸ Pause", bg=self.colors['text_muted'])
+            self.update_status("⚠️ Session not saved - press Stop to try again", self.colors['danger'])
+            return
+        self.clear_checkpoint()
+
+        # Reset session state & UI
+        self.timer.reset()
+
+        self.start_button.config(state=tk.NORMAL, bg=self.colors['primary'])
+        self.stop_button.config(state=tk.DISABLED, bg=self.colors['text_muted'])
+        self.pause_button.config(state=tk.DISABLED, text="⏸ Pause", bg=self.colors['text_muted'])
+        self.elapsed_label.config(text="00:00:00")
+        self.update_status(f"Session saved: {duration_str}")
+
+        messagebox.showinfo("Timer Stopped",
+                            f"Timer stopped for project: {record['project']}\n"
+                            f"Duration: {duration_str}")
+
+    def create_idle_detector(self) -> IdleDetector:
+        """Build the idle detector from the idle settings (disabled where there is no system idle time)"""
+        minutes = max(0, int(self.config.get('idle_threshold_minutes', 0) or 0))
+        return IdleDetector(minutes * 60, provider=IdleDetector.system_provider() if minutes else None,
+                            on_error=self.log_error)
+
+    def timers_counting(self) -> bool:
+        return (self.is_running and not self.is_paused) or bool(self.timers.running())
+
+    def on_user_activity(self, event=None):
+        """Coming back from idle cuts the idle gap from the running timers"""
+        if self.idle_detector.is_idle:
+            self.cut_idle(*self.idle_detector.activity())
+            self.schedule_idle_check()
+
+    def schedule_idle_check(self):
+        """Check for idleness at the next deadline while a timer is counting"""
+        if self.idle_after_id is None and self.idle_detector.enabled and self.timers_counting():
+            self.check_idle()
+
+    def cancel_idle_check(self):
+        if self.idle_after_id is not None:
+            try:
+                self.root.after_cancel(self.idle_after_id)
+            except Exception:
+                pass
+            self.idle_after_id = None
+
+    def check_idle(self):
+        """Read the system idle time on a worker thread (the query may block) and check it"""
+        self.idle_after_id = None
+        if not self.timers_counting():
+            return
+        detector = self.idle_detector
+        task = BackgroundTask(lambda task: detector.read()).start()
+
+        def poll():
+            self.idle_after_id = None
+            messages = task.poll()
+            if not messages:
+                self.idle_after_id = self.root.after(self.IDLE_READ_POLL_MS, poll)
+            elif detector is self.idle_detector and messages[0][0] == 'done':
+                self.apply_idle_reading(messages[0][1])
+            else:
+                self.schedule_idle_check()      # settings changed meanwhile
+
+        self.idle_after_id = self.root.after(self.IDLE_READ_POLL_MS, poll)
+
+    def apply_idle_reading(self, reading: tuple):
+        if not self.timers_counting():
+            return
+        was_idle = self.idle_detector.is_idle
+        span, delay = self.idle_detector.check(reading)
+        if span is not None:
+            self.cut_idle(*span)
+        elif self.idle_detector.is_idle and not was_idle:
+            self.update_status("💤 Idle - the time away will be cut from running timers", self.colors['warning'])
+        if delay is not None:
+            self.idle_after_id = self.root.after(delay, self.check_idle)
+
+    def cut_idle(self, since_ns: int, until_ns: int):
+        """Cut an idle gap out of every counting timer"""
+        cut = self.timers.cut_idle(since_ns, until_ns)
+        if self.is_running:
+            cut = max(cut, self.timer.cut_idle(since_ns, until_ns))
+        if cut:
+            self.checkpoint_session()
+            self.update_elapsed_time()
+            self.update_status(f"💤 Idle time removed: {self.format_seconds(cut // TimerSession.NS_PER_SECOND)}")
+
+    def update_idle_settings(self):
+        """Apply the idle detection settings"""
+        try:
+            minutes = int(self.idle_threshold_minutes.get())
+        except (tk.TclError, ValueError):
+            return
+        self.config['idle_threshold_minutes'] = max(0, minutes)
+        self.save_config()
+        self.cancel_idle_check()
+        self.idle_detector = self.create_idle_detector()
+        self.schedule_idle_check()
+
+    def start_other_timer(self):
+        """Start a timer for the entered project alongside the main one"""
+        project = self.project_name.get().strip()
+        if not project:
+            messagebox.showwarning("Project Required", "Please enter a project name before starting the timer.")
+            return
+
+        timer_id = self.timers.start(project, self.current_project_id, self.memo_text.get("1.0", "end-1c").strip())
+        self.add_timer_row(timer_id)
+        self.checkpoint_session()
+        self.update_elapsed_time()
+        self.schedule_idle_check()
+        self.update_status(f"Timer started for: {project} ({len(self.timers)} other running)")
+
+    def toggle_other_timer(self, timer_id: int):
+        if timer_id not in self.timers:
+            return
+        paused = self.timers.toggle_pause(timer_id)
+        self.checkpoint_session()
+        row = self.timer_rows[timer_id]
+        if paused:
+            row['pause'].config(text="▶ Resume", bg=self.colors['secondary'])
+        else:
+            row['pause'].config(text="⏸ Pause", bg=self.colors['pause'])
+            self.schedule_idle_check()
+        self.update_elapsed_time()
+
+    def stop_other_timer(self, timer_id: int):
+        """Stop a concurrent timer and save its session as an entry"""
+        if timer_id not in self.timers:
+            return
+
+        record = self.timers.stop(timer_id)
+        self.timer_rows.pop(timer_id)['frame'].destroy()
+        self.schedule_tick()
+
+        batch = self.store.begin()
+        batch.add(record)
+        if self.commit_batch(batch) is not None:
+            self.clear_checkpoint(timer_id)
+        self.update_status(f"Session saved: {record['duration']} ({record['project']})")
+
+    @staticmethod
+    def session_state(session: TimerSession, project: str, project_id: Optional[str], memo: str) -> Dict[str, Any]:
+        """Checkpoint state of a timer session"""
+        return {
+            'project': project,
+            'project_id': project_id,
+            'memo': memo,
+            'start_time': session.start_time,
+            'last_start': session.last_start,
+            'elapsed_ns': session.elapsed_ns(),
+            'idle_ns': session.idle_ns,
+            'paused': not session.is_running or session.is_paused
+        }
+
+    def timer_checkpoint_file(self, timer_id: int) -> str:
+        root, ext = os.path.splitext(self.checkpoint_file)
+        return f"{root}.{timer_id}{ext}"
+
+    def find_timer_checkpoints(self) -> Dict[int, SessionCheckpoint]:
+        """Checkpoints of concurrent timers left by a previous run, by timer ID"""
+        root, ext = os.path.splitext(self.checkpoint_file)
+        found = {}
+        for filename in glob.glob(f"{glob.escape(root)}.*{glob.escape(ext)}"):
+            timer_id = filename[len(root) + 1:len(filename) - len(ext)]
+            if timer_id.isdigit():
+                found[int(timer_id)] = SessionCheckpoint(filename)
+        return dict(sorted(found.items()))
+
+    def checkpoint_session(self):
+        """Write the state of every timer to its checkpoint file and schedule the next periodic write"""
+        self.cancel_checkpoints()
+        try:
+            if self.timer.start_time is not None:
+                self.session_checkpoint.write(self.session_state(
+                    self.timer, self.project_name.get().strip(), self.current_project_id,
+                    self.memo_text.get("1.0", "end-1c").strip()
+                ))
+            for timer_id, timer in self.timers:
+                if timer_id not in self.timer_checkpoints:
+                    self.timer_checkpoints[timer_id] = SessionCheckpoint(self.timer_checkpoint_file(timer_id))
+                self.timer_checkpoints[timer_id].write(self.session_state(
+                    timer['session'], timer['project'], timer['project_id'], timer['memo']
+                ))
+        except Exception as e:
+            self.log_error(f"Failed to checkpoint session: {e}")
+        if self.timers_counting():
+            interval = max(1, int(self.config.get('checkpoint_interval_seconds', 30)))
+            self.checkpoint_after_id = self.root.after(interval * 1000, self.checkpoint_session)
 
-        # Reset session state & UI
-        self.is_running = False
-        self.is_paused = False
-        self.start_time = None
-        self.last_start = None
-        self.elapsed_seconds = 0
+    def cancel_checkpoints(self):
+        if self.checkpoint_after_id is not None:
+            try:
+                self.root.after_cancel(self.checkpoint_after_id)
+            except Exception:
+                pass
+            self.checkpoint_after_id = None
 
-        self.start_button.config(state=tk.NORMAL, bg=self.colors['primary'])
-        self.stop_button.config(state=tk.DISABLED, bg=self.colors['text_muted'])
-        self.pause_button.config(state=tk.DISABLED, text="⏸ Pause", bg=self.colors['text_muted'])
-        self.elapsed_label.config(text="00:00:00")
-        self.update_status(f"Session saved: {duration_str}")
+    def clear_checkpoint(self, timer_id: Optional[int] = None):
+        """Remove the checkpoint of the main timer, or of the concurrent timer timer_id"""
+        try:
+            if timer_id is None:
+                self.session_checkpoint.clear()
+            elif timer_id in self.timer_checkpoints:
+                self.timer_checkpoints.pop(timer_id).clear()
+        except Exception as e:
+            self.log_error(f"Failed to remove session checkpoint: {e}")
+
+    def ask_session_recovery(self, state: Dict[str, Any]) -> Optional[bool]:
+        """Ask whether to resume (True), save (False) or discard (None) an interrupted session"""
+        duration = self.format_seconds(state['elapsed_ns'] // TimerSession.NS_PER_SECOND)
+        saved_at = state['saved_at'] or state['start_time']
+        return messagebox.askyesnocancel(
+            "Recover Session",
+            f"A timer for '{state['project']}' was still running when TimeTracker closed.\n\n"
+            f"Started: {state['start_time']:%Y-%m-%d %H:%M:%S}\n"
+            f"Recorded: {duration} (last saved {saved_at:%Y-%m-%d %H:%M:%S})\n\n"
+            "Yes: resume the timer\nNo: save it as an entry\nCancel: discard it"
+        )
 
-        messagebox.showinfo("Timer Stopped",
-                            f"Timer stopped for project: {record['project']}\n"
-                            f"Duration: {duration_str}")
+    def save_recovered_session(self, state: Dict[str, Any]) -> bool:
+        """Save an interrupted session as an entry ending when it was last checkpointed"""
+        seconds = (state['elapsed_ns'] + TimerSession.NS_PER_SECOND // 2) // TimerSession.NS_PER_SECOND
+        gross_seconds = (state['elapsed_ns'] + state['idle_ns'] + TimerSession.NS_PER_SECOND // 2) // TimerSession.NS_PER_SECOND
+        saved_at = state['saved_at'] or state['start_time']
+        batch = self.store.begin()
+        batch.add({
+            "project": state['project'],
+            "memo": state['memo'],
+            "start_time": state['start_time'].strftime("%Y-%m-%d %H:%M:%S"),
+            "stop_time": saved_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "duration": self.format_seconds(seconds),
+            "duration_seconds": seconds,
+            "gross_duration_seconds": gross_seconds,
+            "invoiced": "No",
+            "project_id": state['project_id'] or None
+        })
+        if self.commit_batch(batch) is None:
+            return False
+        self.update_status(f"Interrupted session saved: {self.format_seconds(seconds)} ({state['project']})")
+        return True
+
+    def offer_session_recovery(self):
+        """Resume, save or discard each session found in the checkpoint files"""
+        self.recover_main_session()
+        for checkpoint in self.interrupted_timers.values():
+            state = checkpoint.read()
+            answer = self.ask_session_recovery(state) if state else None
+            if answer is False and not self.save_recovered_session(state):
+                continue
+            checkpoint.clear()
+            if answer:
+                timer_id = self.timers.restore(
+                    state['project'], state['project_id'] or None, state['memo'], state['start_time'],
+                    state['elapsed_ns'], paused=state['paused'], idle_ns=state['idle_ns']
+                )
+                self.add_timer_row(timer_id)
+                if state['paused']:
+                    self.timer_rows[timer_id]['pause'].config(text="▶ Resume", bg=self.colors['secondary'])
+                self.update_status(f"Timer resumed for: {state['project']}")
+            elif answer is None and state:
+                self.update_status("Interrupted session discarded", self.colors['text_muted'])
+        self.interrupted_timers = {}
+        self.checkpoint_session()
+        self.update_elapsed_time()
+        self.schedule_idle_check()
+
+    def recover_main_session(self):
+        """Resume, save or discard the main timer session found in its checkpoint file"""
+        state = self.session_checkpoint.read()
+        if not state or self.is_running:
+            return
+        answer = self.ask_session_recovery(state)
+        if answer is None:
+            self.clear_checkpoint()
+            self.update_status("Interrupted session discarded", self.colors['text_muted'])
+            return
+
+        if answer:
+            self.project_name.set(state['project'])
+            self.current_project_id = state['project_id'] or None
+            self.memo_text.delete("1.0", tk.END)
+            self.memo_text.insert("1.0", state['memo'])
+            self.timer.restore(state['start_time'], state['elapsed_ns'], paused=state['paused'],
+                               idle_ns=state['idle_ns'])
+            self.start_button.config(state=tk.DISABLED, bg=self.colors['text_muted'])
+            self.stop_button.config(state=tk.NORMAL, bg=self.colors['danger'])
+            if state['paused']:
+                self.pause_button.config(state=tk.NORMAL, text="▶ Resume", bg=self.colors['secondary'])
+            else:
+                self.pause_button.config(state=tk.NORMAL, text="⏸ Pause", bg=self.colors['pause'])
+            self.elapsed_label.config(text=self.format_elapsed(self.timer.seconds()))
+            self.update_status(f"Session resumed for: {state['project']}")
+            return
+
+        if self.save_recovered_session(state):
+            self.clear_checkpoint()
 
     def view_entries(self):
         entries_window = self.create_dialog("view_entries", "📋 View & Edit Entries", "850x750")
@@ -1289,33 +4652,9 @@ class TimeTrackerApp:
         listbox.config(yscrollcommand=entries_scrollbar.set)
         entries_scrollbar.config(command=listbox.yview)
 
-        # Store filtered data and mapping for operations
+        # Entries currently shown in the listbox, one per row
         filtered_data = []
-        original_to_filtered_mapping = {}  # Maps original indices to filtered indices
         
-        def refresh_listbox_with_fresh_data():
-            """Refresh the listbox with fresh data from file"""
-            try:
-                # Always load fresh data from file
-                fresh_data = self.load_data()
-                
-                # Clear current entries
-                listbox.delete(0, tk.END)
-                
-                # Repopulate with fresh data
-                for i, entry in enumerate(fresh_data):
-                    proj = entry.get('project', '')
-                    st = entry.get('start_time', '')
-                    et = entry.get('stop_time', '')
-                    dur = entry.get('duration') or self.format_seconds(entry.get('duration_seconds', 0))
-                    memo_snippet = truncate(entry.get('memo', ''), 30)
-                    invoiced_status = entry.get('invoiced', 'No')
-                    invoiced_icon = "💰" if invoiced_status == "Yes" else "📝"
-                    listbox.insert(tk.END, f"{i+1}. {proj} | {st} - {et} | {dur} | {invoiced_icon} {invoiced_status} | 📝 {memo_snippet}")
-                    
-            except Exception as e:
-                self.log_error(f"Failed to refresh listbox: {e}")
-
         def apply_filter():
             """Apply the selected filter to the listbox"""
             try:
@@ -1325,15 +4664,12 @@ class TimeTrackerApp:
                 
                 listbox.delete(0, tk.END)
                 
-                # Always use fresh data for filtering
-                fresh_data = self.load_data()
+                # Read-only view of the current entries
+                fresh_data = self.store.load()
                 filtered_data.clear()
-                original_to_filtered_mapping.clear()
                 
                 # First filter by status
-                if filter_value == "All":
-                    status_filtered = fresh_data
-                elif filter_value == "Invoiced":
+                if filter_value == "Invoiced":
                     status_filtered = [entry for entry in fresh_data if entry.get('invoiced') == 'Yes']
                 elif filter_value == "Not Invoiced":
                     status_filtered = [entry for entry in fresh_data if entry.get('invoiced') != 'Yes']
@@ -1342,7 +4678,7 @@ class TimeTrackerApp:
                 
                 # Then filter by date range if specified
                 if from_date or to_date:
-                    for i, entry in enumerate(status_filtered):
+                    for entry in status_filtered:
                         try:
                             entry_date = datetime.strptime(entry.get('start_time', ''), "%Y-%m-%d %H:%M:%S").date()
                             
@@ -1364,33 +4700,18 @@ class TimeTrackerApp:
                                 except ValueError:
                                     pass  # Invalid date format, skip this filter
                             
-                            # Store the filtered entry and its original index
-                            original_index = fresh_data.index(entry)
                             filtered_data.append(entry)
-                            original_to_filtered_mapping[original_index] = len(filtered_data) - 1
                             
                         except (ValueError, TypeError):
                             # If date parsing fails, include the entry
-                            original_index = fresh_data.index(entry)
                             filtered_data.append(entry)
-                            original_to_filtered_mapping[original_index] = len(filtered_data) - 1
                 else:
                     # No date filtering, use status filtered data
-                    for i, entry in enumerate(status_filtered):
-                        original_index = fresh_data.index(entry)
-                        filtered_data.append(entry)
-                        original_to_filtered_mapping[original_index] = len(filtered_data) - 1
+                    filtered_data.extend(status_filtered)
                 
                 # Populate with filtered data
                 for i, entry in enumerate(filtered_data):
-                    proj = entry.get('project', '')
-                    st = entry.get('start_time', '')
-                    et = entry.get('stop_time', '')
-                    dur = entry.get('duration') or self.format_seconds(entry.get('duration_seconds', 0))
-                    memo_snippet = truncate(entry.get('memo', ''), 30)
-                    invoiced_status = entry.get('invoiced', 'No')
-                    invoiced_icon = "💰" if invoiced_status == "Yes" else "📝"
-                    listbox.insert(tk.END, f"{i+1}. {proj} | {st} - {et} | {dur} | {invoiced_icon} {invoiced_status} | 📝 {memo_snippet}")
+                    listbox.insert(tk.END, self.format_entry_row(i, entry))
                     
             except Exception as e:
                 self.log_error(f"Failed to apply filter: {e}")
@@ -1399,10 +4720,6 @@ class TimeTrackerApp:
         filter_combo.bind('<<ComboboxSelected>>', lambda e: apply_filter())
         filter_button.config(command=apply_filter)
 
-        def truncate(text, length=40):
-            text = text or ""
-            return (text[:length] + "…") if len(text) > length else text
-
         # Initial population
         apply_filter()
 
@@ -1424,17 +4741,7 @@ class TimeTrackerApp:
                 messagebox.showerror("Error", "Entry no longer exists.")
                 return
             entry = filtered_data[filtered_index]
-            
-            # Find the original index in the full dataset
-            original_index = None
-            for orig_idx, filtered_idx in original_to_filtered_mapping.items():
-                if filtered_idx == filtered_index:
-                    original_index = orig_idx
-                    break
-            
-            if original_index is None:
-                messagebox.showerror("Error", "Could not locate original entry.")
-                return
+            entry_id = entry.get('id')
             
             # Show info if multiple entries were selected
             if len(selected) > 1:
@@ -1548,40 +4855,40 @@ class TimeTrackerApp:
                     messagebox.showerror("Invalid Format", "Duration must be in HH:MM:SS or MM:SS format")
                     return
 
-                # Get fresh data and update
-                fresh_data = self.load_data()
-                if original_index >= len(fresh_data):
+                if self.store.get(entry_id) is None:
                     messagebox.showerror("Error", "Entry no longer exists.")
                     return
 
-                # Update string fields
-                for field in fields:
-                    fresh_data[original_index][field] = entries_widgets[field].get()
-                # Update memo
-                fresh_data[original_index]["memo"] = entries_widgets["memo"].get("1.0", "end-1c")
-                # Update invoiced status
-                fresh_data[original_index]["invoiced"] = entries_widgets["invoiced"].get()
+                # String fields, memo and invoiced status
+                changes = {field: entries_widgets[field].get() for field in fields}
+                changes["memo"] = entries_widgets["memo"].get("1.0", "end-1c")
+                changes["invoiced"] = entries_widgets["invoiced"].get()
 
                 # Try to sync duration_seconds if possible
-                fresh_data[original_index]["duration_seconds"] = self._parse_duration_to_seconds(duration_str)
-
-                self.save_data(fresh_data)
+                changes["duration_seconds"] = self._parse_duration_to_seconds(duration_str)
+                gross_seconds = self.store.get(entry_id).get("gross_duration_seconds")
+                if gross_seconds is not None:
+                    # Gross time never falls below the (edited) net time
+                    changes["gross_duration_seconds"] = max(int(gross_seconds), changes["duration_seconds"])
+
+                batch = self.store.begin()
+                batch.update(entry_id, changes)
+                if self.commit_batch(batch) is None:
+                    return
                 messagebox.showinfo("Saved", "Entry updated successfully.")
                 edit_window.destroy()
-                # Refresh the listbox with fresh data
-                apply_filter()
 
             def delete_entry():
                 if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this entry?"):
-                    # Get fresh data and delete
-                    fresh_data = self.load_data()
-                    if original_index < len(fresh_data):
-                        fresh_data.pop(original_index)
-                        self.save_data(fresh_data)
-                        messagebox.showinfo("Deleted", "Entry deleted successfully.")
-                        edit_window.destroy()
-                        # Refresh the listbox with fresh data
-                        apply_filter()
+                    if self.store.get(entry_id) is None:
+                        messagebox.showerror("Error", "Entry no longer exists.")
+                        return
+                    batch = self.store.begin()
+                    batch.delete(entry_id)
+                    if self.commit_batch(batch) is None:
+                        return
+                    messagebox.showinfo("Deleted", "Entry deleted successfully.")
+                    edit_window.destroy()
 
             # Save and Delete buttons
             button_frame = tk.Frame(form_frame, bg=self.colors['bg_card'])
@@ -1611,58 +4918,60 @@ class TimeTrackerApp:
                 messagebox.showwarning("No Selection", "Please select an entry to delete.")
                 return
 
-            # Handle multiple deletions
-            if len(selected) == 1:
-                filtered_index = selected[0]
-                if filtered_index >= len(filtered_data):
-                    messagebox.showerror("Error", "Entry no longer exists.")
-                    return
-                
-                # Find the original index
-                original_index = None
-                for orig_idx, filtered_idx in original_to_filtered_mapping.items():
-                    if filtered_idx == filtered_index:
-                        original_index = orig_idx
-                        break
-                
-                if original_index is None:
-                    messagebox.showerror("Error", "Could not locate original entry.")
+            entry_ids = [filtered_data[row].get('id') for row in selected if row < len(filtered_data)]
+            if not entry_ids:
+                messagebox.showerror("Error", "Entry no longer exists.")
+                return
+
+            count = len(entry_ids)
+            prompt = "Are you sure you want to delete this entry?" if count == 1 else f"Are you sure you want to delete {count} selected entries?"
+            if messagebox.askyesno("Confirm Delete", prompt):
+                # Delete all selected entries with a single write
+                batch = self.store.begin()
+                batch.delete_many(entry_id for entry_id in entry_ids if self.store.get(entry_id) is not None)
+                if self.commit_batch(batch) is None:
                     return
-                
-                if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete this entry?"):
-                    # Get fresh data and delete
-                    fresh_data = self.load_data()
-                    if original_index < len(fresh_data):
-                        fresh_data.pop(original_index)
-                        self.save_data(fresh_data)
-                        messagebox.showinfo("Deleted", "Entry deleted successfully.")
-                        # Refresh the listbox with fresh data
-                        apply_filter()
-            else:
-                # Multiple deletions
-                count = len(selected)
-                if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete {count} selected entries?"):
-                    # Get fresh data and delete
-                    fresh_data = self.load_data()
-                    original_indices_to_delete = []
-                    
-                    # Find all original indices for selected filtered entries
-                    for filtered_index in selected:
-                        if filtered_index < len(filtered_data):
-                            for orig_idx, filtered_idx in original_to_filtered_mapping.items():
-                                if filtered_idx == filtered_index:
-                                    original_indices_to_delete.append(orig_idx)
-                                    break
-                    
-                    # Delete in reverse order to maintain indices
-                    for original_index in sorted(original_indices_to_delete, reverse=True):
-                        if original_index < len(fresh_data):
-                            fresh_data.pop(original_index)
-                    
-                    self.save_data(fresh_data)
+                if count == 1:
+                    messagebox.showinfo("Deleted", "Entry deleted successfully.")
+                else:
                     messagebox.showinfo("Deleted", f"{count} entries deleted successfully.")
-                    # Refresh the listbox with fresh data
-                    apply_filter()
+
+        def toggle_invoiced_selected():
+            selected = listbox.curselection()
+            if not selected:
+                messagebox.showwarning("Warning", "Please select an entry to mark as invoiced.")
+                return
+
+            rows = [row for row in selected if row < len(filtered_data)]
+            if len(rows) > 1 and not messagebox.askyesno("Confirm Bulk Update", f"Toggle invoiced status for {len(rows)} selected entries?"):
+                return
+
+            self.mark_as_invoiced([filtered_data[row].get('id') for row in rows])
+
+        def on_entries_changed(changes):
+            """Keep the listbox in sync with committed data changes"""
+            if not listbox.winfo_exists():
+                self.store.unsubscribe(on_entries_changed)
+                return
+            if changes.reloaded or changes.added or changes.deleted:
+                apply_filter()
+                return
+
+            # Pure updates: redraw only the affected rows in place
+            rows_by_id = {entry.get('id'): row for row, entry in enumerate(filtered_data)}
+            selection = set(listbox.curselection())
+            for _old, entry in changes.updated:
+                row = rows_by_id.get(entry['id'])
+                if row is None:
+                    continue
+                filtered_data[row] = entry
+                listbox.delete(row)
+                listbox.insert(row, self.format_entry_row(row, entry))
+                if row in selection:
+                    listbox.selection_set(row)
+
+        self.store.subscribe(on_entries_changed)
+        entries_window.bind("<Destroy>", lambda e: self.store.unsubscribe(on_entries_changed) if e.widget is entries_window else None, add="+")
 
         # Action buttons with modern styling
         self.create_modern_button(
@@ -1686,7 +4995,7 @@ class TimeTrackerApp:
         self.create_modern_button(
             buttons_frame, 
             "💰 Toggle Invoiced", 
-            self.mark_as_invoiced, 
+            toggle_invoiced_selected, 
             bg_color=self.colors['accent'],
             hover_color=self.colors['accent_hover'],
             width=18
@@ -1695,39 +5004,357 @@ class TimeTrackerApp:
         self.create_modern_button(
             buttons_frame, 
             "📊 Export CSV", 
-            lambda: self.export_to_csv(filtered_data), 
+            lambda: self.export_to_csv(list(filtered_data)), 
             bg_color=self.colors['secondary'],
             hover_color=self.colors['secondary_hover'],
             width=15
         ).pack(side=tk.LEFT)
 
-    def show_reports(self):
-        """Show time tracking reports and analytics"""
-        reports_window = self.create_dialog("reports", "📊 Time Tracking Reports", "750x550")
-        
-        # Load data
-        data = self.load_data()
-        
-        if not data:
-            # No data message with modern styling
-            no_data_frame = tk.Frame(reports_window, bg=self.colors['bg_primary'])
-            no_data_frame.pack(expand=True, fill="both")
-            
-            tk.Label(
-                no_data_frame, 
-                text="📊 No Data Available", 
-                bg=self.colors['bg_primary'], 
-                fg=self.colors['text_primary'], 
-                font=self.fonts['title']
-            ).pack(expand=True)
-            
+    def compute_report(self, facts, billing=None, progress=None) -> Dict[str, Any]:
+        """Aggregate facts into the groupings shown by every report view.
+
+        billing is a billing_rates() result, looked up when omitted.
+        """
+        rates, project_ids = billing or self.billing_rates()
+        report = VectorEngine.aggregate(
+            facts, self.REPORT_GROUPINGS, measures=IncrementalReport.MEASURES,
+            rates=rates, project_ids=project_ids, progress=progress
+        )
+        report['totals'] = report['total'].get((), ReportEngine.new_bucket(set(IncrementalReport.MEASURES)))
+        return report
+
+    def live_summary_report(self) -> Dict[str, Any]:
+        """The all-time report, maintained incrementally as entries change"""
+        report = self.live_report.report(self.billing_rates())
+        report['totals'] = report['total'].get((), ReportEngine.new_bucket(set(IncrementalReport.MEASURES)))
+        return report
+
+    def run_background_task(self, parent, compute, on_done, total=None, on_cancel=None, message="Computing report", unit="records"):
+        """Run compute(task) on a worker thread with a progress bar in parent.
+
+        on_done(result) is called on the Tk thread; on_cancel() after the
+        user cancels. The task is also cancelled if parent is destroyed.
+        Progress is shown as "<message>... done of total <unit>".
+        """
+        progress_frame = tk.Frame(parent, bg=parent.cget('bg'))
+        progress_frame.pack(fill="x", padx=30, pady=30)
+
+        status_label = tk.Label(
+            progress_frame,
+            text=f"⏳ {message}...",
+            bg=parent.cget('bg'),
+            fg=self.colors['text_secondary'],
+            font=self.fonts['body']
+        )
+        status_label.pack(anchor="w")
+
+        progress_bar = ttk.Progressbar(
+            progress_frame,
+            mode="determinate" if total else "indeterminate",
+            maximum=total or 100,
+            length=400
+        )
+        progress_bar.pack(fill="x", pady=10)
+        if not total:
+            progress_bar.start(15)
+
+        task = BackgroundTask(compute)
+        description = message
+
+        def cancel():
+            task.cancel()
+            progress_frame.destroy()
+            if on_cancel:
+                on_cancel()
+
+        self.create_modern_button(
+            progress_frame,
+            "✖ Cancel",
+            cancel,
+            bg_color=self.colors['danger'],
+            hover_color=self.colors['danger_hover'],
+            width=10
+        ).pack(anchor="w")
+
+        def poll():
+            if not progress_frame.winfo_exists():
+                task.cancel()
+                return
+            for message in task.poll():
+                kind = message[0]
+                if kind == 'progress':
+                    done, count = message[1], message[2]
+                    progress_bar['value'] = done
+                    if count:
+                        status_label.config(text=f"⏳ {description}... {done:,} of {count:,} {unit}")
+                elif kind == 'done':
+                    progress_frame.destroy()
+                    on_done(message[1])
+                    return
+                elif kind == 'error':
+                    progress_frame.destroy()
+                    self.log_error(f"{description} failed: {message[1]}")
+                    messagebox.showerror("Error", f"{description} failed: {message[1]}")
+                    return
+                else:
+                    progress_frame.destroy()
+                    return
+            self.root.after(50, poll)
+
+        task.start()
+        self.root.after(50, poll)
+        return task
+
+    def report_in_background(self, parent, report_type: str, params, facts_source, on_done, compute=None, on_cancel=None):
+        """Compute a report over facts_source() off the Tk thread, via the report cache.
+
+        compute(facts, billing, progress) defaults to compute_report. Cached
+        results are passed to on_done straight away; otherwise the running
+        BackgroundTask is returned. Results are shared and must not be modified.
+        """
+        billing = self.billing_rates()
+        key = (params, self.billing_key(*billing))
+        hit, result = self.report_cache.lookup(report_type, key)
+        if hit:
+            on_done(result)
+            return None
+
+        # Snapshot the facts here: the store and rollup belong to the Tk thread
+        facts = list(facts_source())
+        version = self.store.data_version()
+        compute = compute or self.compute_report
+
+        def finished(result):
+            self.report_cache.put(report_type, key, result, version)
+            on_done(result)
+
+        return self.run_background_task(
+            parent,
+            lambda task: compute(facts, billing, lambda done: task.progress(done, len(facts))),
+            finished,
+            total=len(facts),
+            on_cancel=on_cancel
+        )
+
+    def format_billing_report(self, report: Dict[str, Any]) -> str:
+        """Format revenue per currency, project and month from a computed report"""
+        totals = report['totals']
+        billing_text = "💵 BILLING REPORT\n\n📊 TOTALS BY CURRENCY:\n"
+        currencies = sorted(totals['revenue'])
+        if not currencies:
+            billing_text += "• No invoice rates match the tracked projects\n"
+        for currency in currencies:
+            billing_text += (
+                f"• {currency}: {totals['revenue'][currency]:,.2f} "
+                f"(invoiced {totals['invoiced_revenue'].get(currency, 0.0):,.2f}, "
+                f"pending {totals['uninvoiced_revenue'].get(currency, 0.0):,.2f})\n"
+            )
+
+        billing_text += "\n📋 REVENUE BY PROJECT:\n"
+        for (project,), stats in ReportEngine.ranked(report['project']):
+            if stats['revenue']:
+                billing_text += f"\n• {project}: {ReportEngine.format_money(stats['revenue'])} ({stats['seconds'] / 3600:.2f} hours)"
+
+        billing_text += "\n\n📅 REVENUE BY MONTH:\n"
+        for (month,), stats in sorted(report['month'].items(), reverse=True)[:12]:
+            if month and stats['revenue']:
+                billing_text += f"\n• {month}: {ReportEngine.format_money(stats['revenue'])}"
+        return billing_text
+
+    def format_statistics(self, stats: SessionStatistics) -> str:
+        """Format session length percentiles, histogram and work pattern heatmap"""
+        if not stats.count:
+            return "📐 SESSION STATISTICS\n\nNo sessions recorded yet"
+        lines = [
+            "📐 SESSION STATISTICS",
+            "",
+            f"Sessions: {stats.count}    Mean: {self.format_seconds(stats.mean_seconds)}    "
+            f"Shortest: {self.format_seconds(stats.min_seconds)}    Longest: {self.format_seconds(stats.max_seconds)}",
+            "Percentiles: " + "    ".join(
+                f"P{p}: {self.format_seconds(stats.percentile(p))}" for p in (25, 50, 75, 90, 95, 99)
+            ),
+            "",
+            "⏱️ SESSION LENGTHS:"
+        ]
+        histogram = stats.histogram()
+        largest = max(count for _, _, count in histogram) or 1
+        for low, high, count in histogram:
+            label = f"{low // 60}–{high // 60} min" if high else f"{low // 60}+ min"
+            lines.append(f"{label:>12} {'█' * round(30 * count / largest):<30} {count}")
+
+        lines += ["", "🗓️ WHEN YOU WORK (hour of day, darker = more time):", "     0     6     12    18"]
+        shades = " ░▒▓█"
+        busiest = max(max(row) for row in stats.heatmap) or 1
+        for name, row in zip(("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"), stats.heatmap):
+            cells = "".join(shades[min(len(shades) - 1, -(-seconds * (len(shades) - 1) // busiest))] for seconds in row)
+            lines.append(f"{name}  {cells}  {sum(row) / 3600:.1f}h")
+
+        lines += ["", "📋 PROJECT CONSISTENCY:"]
+        spread = sorted(stats.project_spread().items(), key=lambda item: item[1][0], reverse=True)
+        for project, (count, mean, deviation) in spread:
+            lines.append(
+                f"• {project}: {count} sessions, mean {self.format_seconds(mean)}, "
+                f"std dev {self.format_seconds(deviation)}"
+            )
+        return "\n".join(lines)
+
+    def format_time_series(self, series, granularity: str) -> str:
+        """Format time series buckets as report text"""
+        title = {'day': "DAILY", 'week': "WEEKLY", 'month': "MONTHLY", 'quarter': "QUARTERLY", 'year': "YEARLY"}[granularity]
+        lines = [f"📅 {title} BREAKDOWN ({series[0][0]} – {series[-1][0]}):", ""]
+        for label, _bucket_start, stats in series:
+            hours = stats['seconds'] / 3600
+            line = f"{label}: {self.format_seconds(stats['seconds'])} ({hours:.2f} hours) - {stats['count']} entries"
+            if stats.get('revenue'):
+                line += f" - {ReportEngine.format_money(stats['revenue'])}"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def create_time_series_panel(self, parent, facts_source, report_type="time_series", default_range=None, on_render=None):
+        """Create granularity/range controls and a time series view.
+
+        facts_source is a callable returning the facts to aggregate;
+        report_type names the series in the report cache. default_range is
+        an optional (from, to) pair of YYYY-MM-DD strings. on_render(series,
+        granularity) is called whenever a series is shown.
+        """
+        controls = tk.Frame(parent, bg=self.colors['bg_card'])
+        controls.pack(fill="x", padx=30, pady=(20, 0))
+
+        granularity_labels = {"Day": 'day', "Week": 'week', "Month": 'month', "Quarter": 'quarter', "Year": 'year'}
+        granularity_var = tk.StringVar(value="Week")
+        ttk.Combobox(
+            controls,
+            textvariable=granularity_var,
+            values=list(granularity_labels),
+            state="readonly",
+            font=self.fonts['body'],
+            width=9
+        ).pack(side=tk.LEFT, padx=(0, 10))
+
+        # Default range: the current week and the three before it
+        today = date.today()
+        series_from_var = tk.StringVar()
+        series_to_var = tk.StringVar()
+        for label, var in (("From:", series_from_var), ("To:", series_to_var)):
             tk.Label(
-                no_data_frame, 
-                text="Start tracking time to see reports here", 
-                bg=self.colors['bg_primary'], 
-                fg=self.colors['text_muted'], 
+                controls,
+                text=label,
+                bg=self.colors['bg_card'],
+                fg=self.colors['text_secondary'],
                 font=self.fonts['body']
-            ).pack()
+            ).pack(side=tk.LEFT, padx=(0, 5))
+            range_frame = tk.Frame(controls, bg=self.colors['bg_card'])
+            range_frame.pack(side=tk.LEFT, padx=(0, 10))
+            DatePicker(
+                range_frame,
+                textvariable=var,
+                width=11,
+                font=self.fonts['body'],
+                bg=self.colors['bg_card'],
+                fg=self.colors['text_primary']
+            )
+        if default_range:
+            series_from_var.set(default_range[0])
+            series_to_var.set(default_range[1])
+        else:
+            series_from_var.set((today - timedelta(days=today.weekday(), weeks=3)).isoformat())
+            series_to_var.set(today.isoformat())
+
+        series_label = tk.Label(
+            parent,
+            text="",
+            bg=self.colors['bg_card'],
+            fg=self.colors['text_primary'],
+            font=self.fonts['body'],
+            justify=tk.LEFT
+        )
+        series_label.pack(pady=30, padx=30, anchor="w")
+
+        running = {}
+
+        def render():
+            try:
+                start = date.fromisoformat(series_from_var.get().strip())
+                end = date.fromisoformat(series_to_var.get().strip())
+            except ValueError:
+                messagebox.showerror("Invalid Date Format", "Please ensure dates are in YYYY-MM-DD format.")
+                return
+            if start > end:
+                messagebox.showerror("Invalid Date Range", "From date cannot be after To date")
+                return
+            granularity = granularity_labels[granularity_var.get()]
+            if running.get('task'):
+                running['task'].cancel()
+
+            def compute(facts, billing, progress):
+                rates, project_ids = billing
+                return VectorEngine.time_series(
+                    facts, granularity, start, end,
+                    measures=('sum', 'count', 'revenue'), rates=rates, project_ids=project_ids, progress=progress
+                )
+
+            def show(series):
+                series_label.config(text=self.format_time_series(series, granularity))
+                if on_render:
+                    on_render(series, granularity)
+
+            running['task'] = self.report_in_background(
+                parent, report_type, (granularity, start, end), facts_source, show, compute=compute
+            )
+
+        self.create_modern_button(
+            controls,
+            "🔄 Update",
+            render,
+            bg_color=self.colors['info'],
+            hover_color='#2563EB',
+            width=8
+        ).pack(side=tk.LEFT)
+
+        render()
+        return render
+
+    def create_scrollable_tab(self, notebook, title):
+        """Add a notebook tab with a vertically scrollable content frame"""
+        tab_frame = tk.Frame(notebook, bg=self.colors['bg_card'])
+        notebook.add(tab_frame, text=title)
+
+        canvas = tk.Canvas(tab_frame, bg=self.colors['bg_card'], highlightthickness=0)
+        scrollbar = tk.Scrollbar(tab_frame, orient="vertical", command=canvas.yview)
+        scrollable_frame = tk.Frame(canvas, bg=self.colors['bg_card'])
+
+        scrollable_frame.bind(
+            "<Configure>",
+            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        )
+
+        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
+        canvas.configure(yscrollcommand=scrollbar.set)
+
+        canvas.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        def _on_mousewheel(event):
+            try:
+                if canvas and canvas.winfo_exists() and canvas.winfo_manager():
+                    canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+            except:
+                pass
+        canvas.bind("<MouseWheel>", _on_mousewheel)
+
+        return scrollable_frame
+
+    def show_reports(self, date_range=None):
+        """Show time tracking reports and analytics.
+
+        date_range is an optional (from, to) pair of YYYY-MM-DD strings. If
+        the dialog is already open it is only brought to the front; use
+        refresh_reports() to change its range in place.
+        """
+        already_open = "reports" in self.open_dialogs and self.open_dialogs["reports"].winfo_exists()
+        reports_window = self.create_dialog("reports", "📊 Time Tracking Reports", "750x550")
+        if already_open:
             return
 
         # Header
@@ -1741,6 +5368,16 @@ class TimeTrackerApp:
             fg=self.colors['text_primary'], 
             font=self.fonts['title']
         ).pack()
+
+        # Range and entry count of the report being shown
+        subtitle_label = tk.Label(
+            header_frame,
+            text="",
+            bg=self.colors['bg_primary'],
+            fg=self.colors['text_secondary'],
+            font=self.fonts['body']
+        )
+        subtitle_label.pack(pady=(5, 0))
         
         # Date filter controls for reports
         date_filter_frame = tk.Frame(header_frame, bg=self.colors['bg_primary'], pady=10)
@@ -1785,12 +5422,15 @@ class TimeTrackerApp:
             bg=self.colors['bg_primary'],
             fg=self.colors['text_primary']
         )
+        if date_range:
+            reports_from_date_var.set(date_range[0])
+            reports_to_date_var.set(date_range[1])
         
         # Apply date filter button
         apply_date_filter_button = self.create_modern_button(
             date_filter_frame,
             "🔄 Apply Date Filter",
-            lambda: self.apply_reports_date_filter(data, reports_from_date_var, reports_to_date_var),
+            lambda: self.apply_reports_date_filter(reports_from_date_var, reports_to_date_var),
             bg_color=self.colors['info'],
             hover_color='#2563EB',
             width=15
@@ -1808,9 +5448,100 @@ class TimeTrackerApp:
         )
         clear_reports_date_button.pack(side=tk.LEFT)
 
+        # Tabs are rebuilt inside this frame whenever the range changes
+        content_frame = tk.Frame(reports_window, bg=self.colors['bg_primary'])
+        content_frame.pack(fill="both", expand=True)
+        self.reports_view = {'content': content_frame, 'subtitle': subtitle_label, 'range': date_range}
+
+        self.refresh_reports(date_range, on_cancel=lambda: self.close_dialog("reports"))
+
+    def refresh_reports(self, date_range=None, on_cancel=None):
+        """Recompute the open reports dialog for a (from, to) range, or all data"""
+        view = self.reports_view
+        if not view or not view['content'].winfo_exists():
+            return
+        content_frame = view['content']
+        for child in content_frame.winfo_children():
+            child.destroy()
+        view['range'] = date_range
+        view['subtitle'].config(text=f"Filtered: {date_range[0]} to {date_range[1]}" if date_range else "")
+
+        if not date_range:
+            # The all-time report is kept current by entry deltas
+            self.build_reports_view(content_frame, self.live_summary_report())
+            return
+
+        # Aggregate the rollup cells for the selected days in a single pass on a
+        # worker thread; the same range reuses the result until the data changes
+        start, end = date_range
+        self.report_in_background(
+            content_frame,
+            "summary",
+            date_range,
+            lambda: ReportEngine.rollup_facts(self.rollup, start, end),
+            lambda report: self.build_reports_view(content_frame, report, date_range),
+            on_cancel=on_cancel
+        )
+
+    def entries_in_range(self, date_range=None) -> List[Dict[str, Any]]:
+        """Return the stored entries whose start day lies in a (from, to) range"""
+        entries = self.store.load()
+        if not date_range:
+            return entries
+        start, end = date_range
+
+        def select():
+            selected = []
+            for entry in entries:
+                day = DailyRollup.entry_day(entry)
+                if day and start <= day <= end:
+                    selected.append(entry)
+            return selected
+
+        return self.report_cache.get("date_filter", date_range, select)
+
+    def build_reports_view(self, content_frame, report, date_range=None):
+        """Fill the reports dialog from a computed report"""
+        view = self.reports_view
+        view.update(report=report, series=None, granularity=None, statistics=None)
+        totals = report['totals']
+        total_entries = totals['count']
+        total_seconds = totals['seconds']
+        invoiced_seconds = totals['invoiced_seconds']
+        invoiced_entries_count = totals['invoiced_count']
+        ranked_projects = ReportEngine.ranked(report['project'])
+
+        if date_range:
+            view['subtitle'].config(
+                text=f"Filtered: {date_range[0]} to {date_range[1]} — "
+                     f"showing {total_entries} entries out of {len(self.store.load())} total"
+            )
+        
+        if not total_entries:
+            # No data message with modern styling
+            no_data_frame = tk.Frame(content_frame, bg=self.colors['bg_primary'])
+            no_data_frame.pack(expand=True, fill="both")
+            
+            tk.Label(
+                no_data_frame, 
+                text="📊 No Data in Date Range" if date_range else "📊 No Data Available", 
+                bg=self.colors['bg_primary'], 
+                fg=self.colors['text_primary'], 
+                font=self.fonts['title']
+            ).pack(expand=True)
+            
+            tk.Label(
+                no_data_frame, 
+                text=f"No entries found between {date_range[0]} and {date_range[1]}" if date_range else "Start tracking time to see reports here", 
+                bg=self.colors['bg_primary'], 
+                fg=self.colors['text_muted'], 
+                font=self.fonts['body']
+            ).pack()
+            return
+
         # Create notebook for different report types
-        notebook = ttk.Notebook(reports_window)
-        notebook.pack(fill="both", expand=True, padx=25, pady=25)
+        notebook = ttk.Notebook(content_frame)
+        notebook.pack(fill="both", expand=True, padx=25, pady=(0, 25))
 
         # Summary Report Tab
         summary_frame = tk.Frame(notebook, bg=self.colors['bg_card'])
@@ -1842,26 +5573,15 @@ class TimeTrackerApp:
                 pass
         summary_canvas.bind("<MouseWheel>", _on_summary_mousewheel)
 
-        # Calculate summary statistics
-        total_entries = len(data)
-        total_seconds = sum(entry.get('duration_seconds', 0) for entry in data)
+        # Summary statistics
         total_hours = total_seconds / 3600
-        
-        # Invoiced status breakdown
-        invoiced_seconds = sum(entry.get('duration_seconds', 0) for entry in data if entry.get('invoiced') == 'Yes')
         not_invoiced_seconds = total_seconds - invoiced_seconds
         invoiced_hours = invoiced_seconds / 3600
         not_invoiced_hours = not_invoiced_seconds / 3600
-        
-        # Project breakdown
-        project_totals = {}
-        for entry in data:
-            project = entry.get('project', 'Unknown')
-            duration = entry.get('duration_seconds', 0)
-            project_totals[project] = project_totals.get(project, 0) + duration
 
         # Display summary
-        summary_text = f"""📊 TIME TRACKING SUMMARY
+        range_line = f"\nDate Range: {date_range[0]} to {date_range[1]}" if date_range else ""
+        summary_text = f"""📊 TIME TRACKING SUMMARY{range_line}
 
 Total Entries: {total_entries}
 Total Time: {self.format_seconds(total_seconds)} ({total_hours:.2f} hours)
@@ -1870,14 +5590,17 @@ Total Time: {self.format_seconds(total_seconds)} ({total_hours:.2f} hours)
 • Invoiced: {self.format_seconds(invoiced_seconds)} ({invoiced_hours:.2f} hours)
 • Not Invoiced: {self.format_seconds(not_invoiced_seconds)} ({not_invoiced_hours:.2f} hours)
 
+💵 REVENUE:
+• Total: {ReportEngine.format_money(totals['revenue'])}
+• Invoiced: {ReportEngine.format_money(totals['invoiced_revenue'])}
+• Pending: {ReportEngine.format_money(totals['uninvoiced_revenue'])}
+
 📋 TOP PROJECTS:
 """
         
-        # Sort projects by time
-        sorted_projects = sorted(project_totals.items(), key=lambda x: x[1], reverse=True)
-        for i, (project, duration) in enumerate(sorted_projects[:5], 1):
-            hours = duration / 3600
-            summary_text += f"\n{i}. {project}: {self.format_seconds(duration)} ({hours:.2f} hours)"
+        for i, ((project,), stats) in enumerate(ranked_projects[:5], 1):
+            hours = stats['seconds'] / 3600
+            summary_text += f"\n{i}. {project}: {self.format_seconds(stats['seconds'])} ({hours:.2f} hours)"
 
         summary_label = tk.Label(
             summary_scrollable_frame, 
@@ -1889,67 +5612,12 @@ Total Time: {self.format_seconds(total_seconds)} ({total_hours:.2f} hours)
         )
         summary_label.pack(pady=30, padx=30, anchor="w")
 
-        # Weekly Report Tab
-        weekly_frame = tk.Frame(notebook, bg=self.colors['bg_card'])
-        notebook.add(weekly_frame, text="📅 Weekly")
-
-        # Create scrollable frame for weekly
-        weekly_canvas = tk.Canvas(weekly_frame, bg=self.colors['bg_card'], highlightthickness=0)
-        weekly_scrollbar = tk.Scrollbar(weekly_frame, orient="vertical", command=weekly_canvas.yview)
-        weekly_scrollable_frame = tk.Frame(weekly_canvas, bg=self.colors['bg_card'])
-        
-        weekly_scrollable_frame.bind(
-            "<Configure>",
-            lambda e: weekly_canvas.configure(scrollregion=weekly_canvas.bbox("all"))
-        )
-        
-        weekly_canvas.create_window((0, 0), window=weekly_scrollable_frame, anchor="nw")
-        weekly_canvas.configure(yscrollcommand=weekly_scrollbar.set)
-        
-        # Pack canvas and scrollbar
-        weekly_canvas.pack(side="left", fill="both", expand=True)
-        weekly_scrollbar.pack(side="right", fill="y")
-
-        # Bind mousewheel to weekly canvas
-        def _on_weekly_mousewheel(event):
-            try:
-                if weekly_canvas and weekly_canvas.winfo_exists() and weekly_canvas.winfo_manager():
-                    weekly_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-            except:
-                pass
-        weekly_canvas.bind("<MouseWheel>", _on_weekly_mousewheel)
-
-        # Calculate weekly totals for last 4 weeks
-        weekly_text = "📅 WEEKLY BREAKDOWN (Last 4 weeks):\n\n"
-        
-        for i in range(4):
-            week_start = datetime.now() - timedelta(weeks=i+1)
-            week_end = datetime.now() - timedelta(weeks=i)
-            
-            week_seconds = 0
-            week_entries = []
-            
-            for entry in data:
-                try:
-                    entry_date = datetime.strptime(entry.get('start_time', ''), "%Y-%m-%d %H:%M:%S")
-                    if week_start <= entry_date < week_end:
-                        week_seconds += entry.get('duration_seconds', 0)
-                        week_entries.append(entry)
-                except:
-                    continue
-            
-            week_hours = week_seconds / 3600
-            weekly_text += f"Week ending {week_end.strftime('%Y-%m-%d')}: {self.format_seconds(week_seconds)} ({week_hours:.2f} hours) - {len(week_entries)} entries\n"
-
-        weekly_label = tk.Label(
-            weekly_scrollable_frame, 
-            text=weekly_text, 
-            bg=self.colors['bg_card'], 
-            fg=self.colors['text_primary'],
-            font=self.fonts['body'], 
-            justify=tk.LEFT
+        # Time Series Report Tab (calendar-aligned buckets over any range)
+        series_scrollable_frame = self.create_scrollable_tab(notebook, "📅 Time Series")
+        self.create_time_series_panel(
+            series_scrollable_frame, lambda: ReportEngine.rollup_facts(self.rollup), default_range=date_range,
+            on_render=lambda series, granularity: view.update(series=series, granularity=granularity)
         )
-        weekly_label.pack(pady=30, padx=30, anchor="w")
 
         # Invoicing Report Tab
         invoicing_frame = tk.Frame(notebook, bg=self.colors['bg_card'])
@@ -1978,30 +5646,8 @@ Total Time: {self.format_seconds(total_seconds)} ({total_hours:.2f} hours)
                 if invoicing_canvas and invoicing_canvas.winfo_exists() and invoicing_canvas.winfo_manager():
                     invoicing_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
             except:
-                pass
-        invoicing_canvas.bind("<MouseWheel>", _on_invoicing_mousewheel)
-
-        # Calculate invoicing statistics
-        invoiced_entries = [entry for entry in data if entry.get('invoiced') == 'Yes']
-        not_invoiced_entries = [entry for entry in data if entry.get('invoiced') != 'Yes']
-        
-        invoiced_seconds = sum(entry.get('duration_seconds', 0) for entry in invoiced_entries)
-        not_invoiced_seconds = sum(entry.get('duration_seconds', 0) for entry in not_invoiced_entries)
-        
-        invoiced_hours = invoiced_seconds / 3600
-        not_invoiced_hours = not_invoiced_seconds / 3600
-        
-        # Project invoicing breakdown
-        project_invoicing = {}
-        for entry in data:
-            project = entry.get('project', 'Unknown')
-            if project not in project_invoicing:
-                project_invoicing[project] = {'invoiced': 0, 'not_invoiced': 0}
-            
-            if entry.get('invoiced') == 'Yes':
-                project_invoicing[project]['invoiced'] += entry.get('duration_seconds', 0)
-            else:
-                project_invoicing[project]['not_invoiced'] += entry.get('duration_seconds', 0)
+                pass
+        invoicing_canvas.bind("<MouseWheel>", _on_invoicing_mousewheel)
 
         # Display invoicing report
         invoicing_text = f"""💰 INVOICING REPORT
@@ -2009,27 +5655,23 @@ Total Time: {self.format_seconds(total_seconds)} ({total_hours:.2f} hours)
 📊 OVERVIEW:
 • Total Invoiced: {self.format_seconds(invoiced_seconds)} ({invoiced_hours:.2f} hours)
 • Total Not Invoiced: {self.format_seconds(not_invoiced_seconds)} ({not_invoiced_hours:.2f} hours)
-• Invoiced Entries: {len(invoiced_entries)}
-• Pending Entries: {len(not_invoiced_entries)}
+• Invoiced Entries: {invoiced_entries_count}
+• Pending Entries: {total_entries - invoiced_entries_count}
 
 📋 PROJECT BREAKDOWN:
 """
         
-        # Sort projects by total time
-        sorted_projects = sorted(project_invoicing.items(), 
-                               key=lambda x: x[1]['invoiced'] + x[1]['not_invoiced'], 
-                               reverse=True)
-        
-        for project, stats in sorted_projects[:8]:  # Show top 8 projects
-            total_project_time = stats['invoiced'] + stats['not_invoiced']
+        for (project,), stats in ranked_projects[:8]:  # Show top 8 projects
+            total_project_time = stats['seconds']
             total_project_hours = total_project_time / 3600
-            invoiced_project_hours = stats['invoiced'] / 3600
-            not_invoiced_project_hours = stats['not_invoiced'] / 3600
+            invoiced_project_hours = stats['invoiced_seconds'] / 3600
+            not_invoiced_project_hours = stats['uninvoiced_seconds'] / 3600
             
             invoicing_text += f"\n• {project}:"
             invoicing_text += f"\n  - Total: {self.format_seconds(total_project_time)} ({total_project_hours:.2f} hours)"
-            invoicing_text += f"\n  - Invoiced: {self.format_seconds(stats['invoiced'])} ({invoiced_project_hours:.2f} hours)"
-            invoicing_text += f"\n  - Pending: {self.format_seconds(stats['not_invoiced'])} ({not_invoiced_project_hours:.2f} hours)"
+            invoicing_text += f"\n  - Invoiced: {self.format_seconds(stats['invoiced_seconds'])} ({invoiced_project_hours:.2f} hours)"
+            invoicing_text += f"\n  - Pending: {self.format_seconds(stats['uninvoiced_seconds'])} ({not_invoiced_project_hours:.2f} hours)"
+            invoicing_text += f"\n  - Revenue: {ReportEngine.format_money(stats['invoiced_revenue'])} billed, {ReportEngine.format_money(stats['uninvoiced_revenue'])} pending"
 
         invoicing_label = tk.Label(
             invoicing_scrollable_frame, 
@@ -2041,14 +5683,51 @@ Total Time: {self.format_seconds(total_seconds)} ({total_hours:.2f} hours)
         )
         invoicing_label.pack(pady=30, padx=30, anchor="w")
 
+        # Billing Report Tab
+        billing_scrollable_frame = self.create_scrollable_tab(notebook, "💵 Billing")
+        billing_text = self.format_billing_report(report)
+
+        tk.Label(
+            billing_scrollable_frame, 
+            text=billing_text, 
+            bg=self.colors['bg_card'], 
+            fg=self.colors['text_primary'],
+            font=self.fonts['body'], 
+            justify=tk.LEFT
+        ).pack(pady=30, padx=30, anchor="w")
+
+        # Statistics Tab (per-session distributions, streamed from the entries)
+        statistics_scrollable_frame = self.create_scrollable_tab(notebook, "📐 Statistics")
+        statistics_label = tk.Label(
+            statistics_scrollable_frame,
+            text="",
+            bg=self.colors['bg_card'],
+            fg=self.colors['text_primary'],
+            font=self.fonts['mono'],
+            justify=tk.LEFT
+        )
+        statistics_label.pack(pady=30, padx=30, anchor="w")
+        def show_statistics(stats):
+            view['statistics'] = stats
+            statistics_label.config(text=self.format_statistics(stats))
+
+        self.report_in_background(
+            statistics_scrollable_frame,
+            "statistics",
+            date_range,
+            lambda: self.entries_in_range(date_range),
+            show_statistics,
+            compute=lambda entries, billing, progress: SessionStatistics.from_entries(entries, progress)
+        )
+
         # Export button
-        export_frame = tk.Frame(reports_window, bg=self.colors['bg_primary'], pady=10)
+        export_frame = tk.Frame(content_frame, bg=self.colors['bg_primary'], pady=10)
         export_frame.pack()
         
         self.create_modern_button(
             export_frame, 
             "📁 Export Report", 
-            lambda: self.export_report_to_csv(data),
+            self.export_report,
             bg_color=self.colors['accent'],
             hover_color=self.colors['accent_hover'],
             width=20
@@ -2082,7 +5761,7 @@ Total Time: {self.format_seconds(total_seconds)} ({total_hours:.2f} hours)
         self.create_modern_button(
             buttons_frame, 
             "📤 Export to CSV", 
-            lambda: self.export_to_csv(self.load_data()),
+            self.export_to_csv,
             bg_color=self.colors['secondary'],
             hover_color=self.colors['secondary_hover'],
             width=25
@@ -2118,77 +5797,238 @@ Total Time: {self.format_seconds(total_seconds)} ({total_hours:.2f} hours)
             width=25
         ).pack(pady=12)
 
-    def export_to_csv(self, data):
-        """Export time tracking data to CSV file"""
-        if not data:
+    def export_to_csv(self, data=None):
+        """Export time entries (all entries when data is None) to CSV or JSON Lines"""
+        total = len(self.store) if data is None else len(data)
+        if not total:
             messagebox.showwarning("No Data", "No data available to export.")
             return
 
         try:
             filename = filedialog.asksaveasfilename(
                 defaultextension=".csv",
-                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+                filetypes=[("CSV files", "*.csv"), ("JSON Lines files", "*.jsonl"), ("All files", "*.*")],
                 title="Save CSV file"
             )
             
             if filename:
-                with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                    fieldnames = ['project', 'memo', 'start_time', 'stop_time', 'duration', 'duration_seconds', 'invoiced', 'project_id']
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    
-                    writer.writeheader()
-                    for entry in data:
-                        writer.writerow(entry)
+                exporter = EntryExporter(filename)
+                # Stream straight from the store's current snapshot on a worker thread
+                entries = self.store.iter_entries() if data is None else iter(data)
+                dialog = self.create_dialog("export", "📤 Export", "480x220")
+                
+                tk.Label(
+                    dialog,
+                    text=f"📤 Exporting to {os.path.basename(filename)}",
+                    bg=self.colors['bg_primary'],
+                    fg=self.colors['text_primary'],
+                    font=self.fonts['heading']
+                ).pack(pady=(20, 0))
                 
-                self.update_status(f"Data exported to {os.path.basename(filename)}")
-                messagebox.showinfo("Export Successful", f"Data exported to:\n{filename}")
+                self.run_background_task(
+                    dialog,
+                    lambda task: exporter.write(entries, total, progress=task.progress),
+                    lambda count: self.finish_export(count, filename),
+                    total=total,
+                    on_cancel=lambda: self.close_dialog("export"),
+                    message="Exporting",
+                    unit="entries"
+                )
                 
         except Exception as e:
             self.log_error(f"Export failed: {e}")
             messagebox.showerror("Export Error", f"Failed to export data: {e}")
 
-    def export_report_to_csv(self, data):
-        """Export report data to CSV file"""
-        if not data:
+    def finish_export(self, count: int, filename: str):
+        """Report a completed entry export"""
+        self.close_dialog("export")
+        self.update_status(f"Exported {count} entries to {os.path.basename(filename)}")
+        messagebox.showinfo("Export Successful", f"Exported {count} entries to:\n{filename}")
+
+    def export_columnar(self):
+        """Export all entries as typed columns (Parquet / Arrow IPC, or .ttcol without pyarrow)"""
+        total = len(self.store)
+        if not total:
             messagebox.showwarning("No Data", "No data available to export.")
             return
 
         try:
+            if ColumnarExporter.available():
+                filetypes = [("Parquet files", "*.parquet"), ("Arrow IPC files", "*.arrow")]
+                default_extension = ".parquet"
+            else:
+                filetypes = [("TimeTracker columnar files", "*.ttcol")]
+                default_extension = ".ttcol"
+            filename = filedialog.asksaveasfilename(
+                defaultextension=default_extension,
+                filetypes=filetypes + [("All files", "*.*")],
+                title="Save analytics export"
+            )
+            
+            if filename:
+                exporter = ColumnarExporter(filename)
+                entries = self.store.iter_entries()
+                dialog = self.create_dialog("export", "📊 Export for Analytics", "480x220")
+                
+                tk.Label(
+                    dialog,
+                    text=f"📊 Exporting to {os.path.basename(exporter.filename)}",
+                    bg=self.colors['bg_primary'],
+                    fg=self.colors['text_primary'],
+                    font=self.fonts['heading']
+                ).pack(pady=(20, 0))
+                
+                self.run_background_task(
+                    dialog,
+                    lambda task: exporter.write(entries, total, progress=task.progress),
+                    lambda count: self.finish_export(count, exporter.filename),
+                    total=total,
+                    on_cancel=lambda: self.close_dialog("export"),
+                    message="Exporting",
+                    unit="entries"
+                )
+                
+        except Exception as e:
+            self.log_error(f"Analytics export failed: {e}")
+            messagebox.showerror("Export Error", f"Failed to export data: {e}")
+
+    def show_incremental_export(self):
+        """Dialog for exporting only what changed since the last export to a named target"""
+        already_open = "incremental_export" in self.open_dialogs and self.open_dialogs["incremental_export"].winfo_exists()
+        dialog = self.create_dialog("incremental_export", "🔁 Incremental Export", "520x300")
+        if already_open:
+            return
+        
+        tk.Label(
+            dialog,
+            text="🔁 Incremental Export",
+            bg=self.colors['bg_primary'],
+            fg=self.colors['text_primary'],
+            font=self.fonts['title']
+        ).pack(pady=(20, 5))
+        
+        target_frame = tk.Frame(dialog, bg=self.colors['bg_primary'], pady=10)
+        target_frame.pack()
+        tk.Label(target_frame, text="Export target:", bg=self.colors['bg_primary'], fg=self.colors['text_secondary'],
+                 font=self.fonts['body']).pack(side=tk.LEFT, padx=(0, 5))
+        targets = sorted(self.incremental_export.marks())
+        target_var = tk.StringVar(value=targets[0] if targets else "billing")
+        target_combo = ttk.Combobox(target_frame, textvariable=target_var, values=targets, width=24, font=self.fonts['body'])
+        target_combo.pack(side=tk.LEFT)
+        
+        status_label = tk.Label(
+            dialog,
+            text="",
+            bg=self.colors['bg_primary'],
+            fg=self.colors['text_secondary'],
+            font=self.fonts['body'],
+            justify=tk.LEFT
+        )
+        status_label.pack(pady=10)
+        
+        def refresh_status(*_):
+            target = target_var.get().strip()
+            if not target:
+                status_label.config(text="Enter a name for the export target.")
+                return
+            mark = self.incremental_export.marks().get(target)
+            entries, _ = self.incremental_export.pending(target)
+            last_run = (f"Last export: {mark['exported_at']} ({mark['count']} entries)"
+                        if mark else "Never exported: the first run includes all entries")
+            status_label.config(text=f"{last_run}\n{len(entries)} entries added or changed since then")
+        
+        def reset():
+            target = target_var.get().strip()
+            if target and messagebox.askyesno("Reset Target", f"Forget the export history of '{target}'?\n\nIts next export will include all entries."):
+                self.incremental_export.reset(target)
+                refresh_status()
+        
+        target_var.trace_add("write", refresh_status)
+        
+        buttons_frame = tk.Frame(dialog, bg=self.colors['bg_primary'], pady=10)
+        buttons_frame.pack()
+        self.create_modern_button(
+            buttons_frame,
+            "📤 Export Changes",
+            lambda: self.run_incremental_export(target_var.get().strip()),
+            bg_color=self.colors['secondary'],
+            hover_color=self.colors['secondary_hover'],
+            width=16
+        ).pack(side=tk.LEFT, padx=(0, 10))
+        self.create_modern_button(
+            buttons_frame,
+            "🔄 Reset",
+            reset,
+            bg_color=self.colors['text_secondary'],
+            hover_color=self.colors['text_primary'],
+            width=8
+        ).pack(side=tk.LEFT)
+        
+        refresh_status()
+
+    def run_incremental_export(self, target: str):
+        """Export the entries changed since target's last run, then advance its mark"""
+        if not target:
+            messagebox.showwarning("No Target", "Enter a name for the export target.")
+            return
+        
+        try:
+            entries, sequence = self.incremental_export.pending(target)
+            if not entries:
+                messagebox.showinfo("Up to Date", f"Nothing has changed since the last export to '{target}'.")
+                return
+            
             filename = filedialog.asksaveasfilename(
                 defaultextension=".csv",
-                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
-                title="Save Report CSV file"
+                initialfile=f"{target}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                filetypes=[("CSV files", "*.csv"), ("JSON Lines files", "*.jsonl"), ("All files", "*.*")],
+                title=f"Save changes for {target}"
+            )
+            if not filename:
+                return
+            
+            exporter = self.incremental_export.exporter(filename)
+            self.show_incremental_export()
+            
+            def finished(count):
+                self.incremental_export.advance(target, sequence, filename, count)
+                self.close_dialog("incremental_export")
+                self.update_status(f"Exported {count} changed entries to {os.path.basename(filename)}")
+                messagebox.showinfo("Export Successful", f"Exported {count} entries changed since the last run to:\n{filename}")
+            
+            self.run_background_task(
+                self.open_dialogs["incremental_export"],
+                lambda task: exporter.write(entries, len(entries), progress=task.progress),
+                finished,
+                total=len(entries),
+                message="Exporting",
+                unit="entries"
+            )
+        
+        except Exception as e:
+            self.log_error(f"Incremental export failed: {e}")
+            messagebox.showerror("Export Error", f"Failed to export changes: {e}")
+
+    def export_report(self):
+        """Export the results shown in the reports dialog (a .zip of CSV sheets, or the summary CSV)"""
+        view = self.reports_view
+        if not view or not view.get('report') or not view['report']['totals']['count']:
+            messagebox.showwarning("No Data", "No data available to export.")
+            return
+
+        try:
+            filename = filedialog.asksaveasfilename(
+                defaultextension=".zip",
+                filetypes=[("All report sheets (ZIP of CSV files)", "*.zip"), ("Summary CSV file", "*.csv"), ("All files", "*.*")],
+                title="Save Report"
             )
             
             if filename:
-                with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                    fieldnames = ['project', 'total_hours', 'total_seconds', 'entry_count']
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    
-                    writer.writeheader()
-                    
-                    # Calculate project totals
-                    project_totals = {}
-                    for entry in data:
-                        project = entry.get('project', 'Unknown')
-                        duration = entry.get('duration_seconds', 0)
-                        if project not in project_totals:
-                            project_totals[project] = {'total_seconds': 0, 'entry_count': 0}
-                        project_totals[project]['total_seconds'] += duration
-                        project_totals[project]['entry_count'] += 1
-                    
-                    # Write project summaries
-                    for project, stats in project_totals.items():
-                        total_hours = stats['total_seconds'] / 3600
-                        writer.writerow({
-                            'project': project,
-                            'total_hours': f"{total_hours:.2f}",
-                            'total_seconds': stats['total_seconds'],
-                            'entry_count': stats['entry_count']
-                        })
+                exporter = ReportExporter(view['report'], view['series'], view['granularity'], view['statistics'])
+                sheets = exporter.write(filename)
                 
                 self.update_status(f"Report exported to {os.path.basename(filename)}")
-                messagebox.showinfo("Export Successful", f"Report exported to:\n{filename}")
+                messagebox.showinfo("Export Successful", f"Report exported to:\n{filename}\n\n" + "\n".join(f"• {name}" for name in sheets))
                 
         except Exception as e:
             self.log_error(f"Report export failed: {e}")
@@ -2203,34 +6043,69 @@ Total Time: {self.format_seconds(total_seconds)} ({total_hours:.2f} hours)
             )
             
             if filename:
-                imported_data = []
-                with open(filename, 'r', encoding='utf-8') as csvfile:
-                    reader = csv.DictReader(csvfile)
-                    for row in reader:
-                        # Validate required fields
-                        if row.get('project') and row.get('start_time'):
-                            # Ensure new fields exist with defaults
-                            if 'invoiced' not in row:
-                                row['invoiced'] = 'No'
-                            if 'project_id' not in row:
-                                row['project_id'] = None
-                            imported_data.append(row)
+                # Snapshot the current entries for the worker's duplicate index
+                importer = CsvImporter(filename, existing=list(self.store.load()))
+                workers = CsvImporter.worker_count(self.config.get('import_workers', 0))
+                dialog = self.create_dialog("csv_import", "📥 Import from CSV", "480x220")
                 
-                if imported_data:
-                    # Load existing data and append imported data
-                    existing_data = self.load_data()
-                    existing_data.extend(imported_data)
-                    self.save_data(existing_data)
-                    
-                    self.update_status(f"Imported {len(imported_data)} entries from {os.path.basename(filename)}")
-                    messagebox.showinfo("Import Successful", f"Imported {len(imported_data)} entries successfully.")
-                else:
-                    messagebox.showwarning("Import Warning", "No valid data found in the CSV file.")
+                tk.Label(
+                    dialog,
+                    text=f"📥 Importing {os.path.basename(filename)}",
+                    bg=self.colors['bg_primary'],
+                    fg=self.colors['text_primary'],
+                    font=self.fonts['heading']
+                ).pack(pady=(20, 0))
+                
+                # Parse and validate on a worker thread; commit once on the Tk thread
+                self.run_background_task(
+                    dialog,
+                    lambda task: importer.run(progress=task.progress, workers=workers),
+                    lambda result: self.finish_csv_import(result, filename),
+                    total=max(1, importer.total_bytes // 1024),
+                    on_cancel=lambda: self.close_dialog("csv_import"),
+                    message="Reading",
+                    unit="KB"
+                )
                     
         except Exception as e:
             self.log_error(f"Import failed: {e}")
             messagebox.showerror("Import Error", f"Failed to import data: {e}")
 
+    def finish_csv_import(self, importer: CsvImporter, filename: str):
+        """Commit the entries read by a CsvImporter in one batched write"""
+        self.close_dialog("csv_import")
+        skipped = ""
+        if importer.skipped_count:
+            skipped += f"\n\nSkipped {importer.skipped_count} rows already recorded."
+        for title, count, problems in (
+            ("conflicting rows (same project and start time, different times)", importer.conflict_count, importer.conflicts),
+            ("invalid rows", importer.error_count, importer.errors)
+        ):
+            if count:
+                skipped += f"\n\nSkipped {count} {title}:\n" + "\n".join(
+                    f"• Line {line}: {problem}" for line, problem in problems
+                )
+                if count > len(problems):
+                    skipped += "\n• ..."
+        
+        if not importer.entries:
+            if importer.skipped_count and not (importer.conflict_count or importer.error_count):
+                messagebox.showinfo("Import Complete", "Nothing new to import." + skipped)
+            else:
+                messagebox.showwarning("Import Warning", "No valid data found in the CSV file." + skipped)
+            return
+        
+        batch = self.store.begin()
+        batch.add_many(importer.entries)
+        if self.commit_batch(batch) is None:
+            return
+        
+        self.update_status(
+            f"Imported {len(importer.entries)} entries from {os.path.basename(filename)}"
+            f" ({importer.skipped_count} duplicates, {importer.conflict_count} conflicts skipped)"
+        )
+        messagebox.showinfo("Import Successful", f"Imported {len(importer.entries)} entries successfully." + skipped)
+
     def restore_from_backup(self):
         """Restore data from a backup file"""
         try:
@@ -2343,7 +6218,7 @@ Total Time: {self.format_seconds(total_seconds)} ({total_hours:.2f} hours)
 
     def show_settings(self):
         """Show the settings dialog"""
-        settings_window = self.create_dialog("settings", "⚙️ Settings", "500x400")
+        settings_window = self.create_dialog("settings", "⚙️ Settings", "500x560")
         
         # Header
         header_frame = tk.Frame(settings_window, bg=self.colors['bg_primary'], pady=20)
@@ -2397,6 +6272,60 @@ Total Time: {self.format_seconds(total_seconds)} ({total_hours:.2f} hours)
         )
         auto_backup_cb.pack(anchor="w", pady=10)
 
+        # Timer display resolution
+        self.timer_display_minutes = tk.BooleanVar(value=self.config.get('timer_display_minutes', False))
+        tk.Checkbutton(
+            settings_frame,
+            text="Show the running timer in minutes (fewer updates, saves battery)",
+            variable=self.timer_display_minutes,
+            command=self.toggle_timer_resolution,
+            bg=self.colors['bg_card'],
+            fg=self.colors['text_primary'],
+            font=self.fonts['body'],
+            activebackground=self.colors['bg_card'],
+            selectcolor=self.colors['bg_card'],
+            anchor="w"
+        ).pack(anchor="w", pady=10)
+
+        # Idle detection
+        idle_frame = tk.Frame(settings_frame, bg=self.colors['bg_card'])
+        idle_frame.pack(fill="x", pady=(10, 0))
+
+        tk.Label(
+            idle_frame,
+            text="Cut idle time after (minutes, 0 = off):",
+            bg=self.colors['bg_card'],
+            fg=self.colors['text_primary'],
+            font=self.fonts['body']
+        ).pack(side=tk.LEFT)
+
+        idle_supported = IdleDetector.system_provider() is not None
+        self.idle_threshold_minutes = tk.IntVar(value=self.config.get('idle_threshold_minutes', 0))
+        idle_spinbox = tk.Spinbox(
+            idle_frame,
+            from_=0,
+            to=240,
+            width=5,
+            textvariable=self.idle_threshold_minutes,
+            command=self.update_idle_settings,
+            font=self.fonts['body'],
+            state=tk.NORMAL if idle_supported else tk.DISABLED
+        )
+        idle_spinbox.pack(side=tk.LEFT, padx=(10, 0))
+        idle_spinbox.bind("<FocusOut>", lambda e: self.update_idle_settings())
+        idle_spinbox.bind("<Return>", lambda e: self.update_idle_settings())
+
+        tk.Label(
+            settings_frame,
+            text=("Uses the system idle time, so work in other applications counts as activity"
+                  if idle_supported else
+                  "Not supported on this system (needs the system idle time of Windows or macOS)"),
+            bg=self.colors['bg_card'],
+            fg=self.colors['text_secondary'] if idle_supported else self.colors['warning'],
+            font=self.fonts['small'],
+            anchor="w"
+        ).pack(anchor="w", pady=10)
+
         # Backup retention info
         info_frame = tk.Frame(settings_frame, bg=self.colors['bg_card'])
         info_frame.pack(fill="x", pady=20)
@@ -2689,7 +6618,8 @@ Total Time: {self.format_seconds(total_seconds)} ({total_hours:.2f} hours)
         ).pack(side=tk.RIGHT)
 
     # Utility to parse HH:MM:SS safely
-    def _parse_duration_to_seconds(self, s: str) -> int:
+    @staticmethod
+    def _parse_duration_to_seconds(s: str) -> int:
         try:
             parts = s.split(":")
             if len(parts) == 3:
@@ -3118,103 +7048,239 @@ Total Time: {self.format_seconds(total_seconds)} ({total_hours:.2f} hours)
             self.log_error(f"Failed to delete invoice rate: {e}")
             messagebox.showerror("Error", f"Failed to delete invoice rate: {e}")
 
-    def mark_as_invoiced(self):
-        """Mark selected time entries as invoiced"""
-        try:
-            # Get the current view_entries window
-            entries_window = None
-            for widget in self.root.winfo_children():
-                if isinstance(widget, tk.Toplevel) and widget.title() == "📋 View & Edit Entries":
-                    entries_window = widget
-                    break
-            else:
-                messagebox.showwarning("Warning", "Please open the View Entries window first.")
+    def show_invoice_generator(self):
+        """Dialog for invoicing all uninvoiced entries of a date range at once"""
+        already_open = "invoices" in self.open_dialogs and self.open_dialogs["invoices"].winfo_exists()
+        dialog = self.create_dialog("invoices", "🧾 Generate Invoices", "640x560")
+        if already_open:
+            return
+        
+        tk.Label(
+            dialog,
+            text="🧾 Generate Invoices",
+            bg=self.colors['bg_primary'],
+            fg=self.colors['text_primary'],
+            font=self.fonts['title']
+        ).pack(pady=(20, 10))
+        
+        # Date range
+        range_frame = tk.Frame(dialog, bg=self.colors['bg_primary'], pady=5)
+        range_frame.pack()
+        
+        tk.Label(range_frame, text="From:", bg=self.colors['bg_primary'], fg=self.colors['text_secondary'],
+                 font=self.fonts['body']).pack(side=tk.LEFT, padx=(0, 5))
+        from_var = tk.StringVar()
+        DatePicker(range_frame, textvariable=from_var, width=12, font=self.fonts['body'],
+                   bg=self.colors['bg_primary'], fg=self.colors['text_primary'])
+        tk.Label(range_frame, text="To:", bg=self.colors['bg_primary'], fg=self.colors['text_secondary'],
+                 font=self.fonts['body']).pack(side=tk.LEFT, padx=(0, 5))
+        to_var = tk.StringVar()
+        DatePicker(range_frame, textvariable=to_var, width=12, font=self.fonts['body'],
+                   bg=self.colors['bg_primary'], fg=self.colors['text_primary'])
+        from_var.set(date.today().replace(day=1).isoformat())
+        
+        # Rounding
+        rounding_frame = tk.Frame(dialog, bg=self.colors['bg_primary'], pady=5)
+        rounding_frame.pack()
+        
+        tk.Label(rounding_frame, text="Round each entry to:", bg=self.colors['bg_primary'], fg=self.colors['text_secondary'],
+                 font=self.fonts['body']).pack(side=tk.LEFT, padx=(0, 5))
+        minutes_var = tk.StringVar(value=str(self.config.get('invoice_rounding_minutes', 0)))
+        ttk.Combobox(rounding_frame, textvariable=minutes_var, values=["0", "1", "5", "6", "10", "15", "30", "60"],
+                     width=4, font=self.fonts['body']).pack(side=tk.LEFT)
+        tk.Label(rounding_frame, text="minutes, rounding", bg=self.colors['bg_primary'], fg=self.colors['text_secondary'],
+                 font=self.fonts['body']).pack(side=tk.LEFT, padx=5)
+        rounding_var = tk.StringVar(value=self.config.get('invoice_rounding', 'up'))
+        ttk.Combobox(rounding_frame, textvariable=rounding_var, values=list(InvoiceBuilder.ROUNDING_MODES),
+                     state="readonly", width=8, font=self.fonts['body']).pack(side=tk.LEFT)
+        
+        # Document formats
+        formats_frame = tk.Frame(dialog, bg=self.colors['bg_primary'], pady=5)
+        formats_frame.pack()
+        format_vars = {}
+        for fmt, label in InvoiceBuilder.FORMATS.items():
+            format_vars[fmt] = tk.BooleanVar(value=True)
+            tk.Checkbutton(
+                formats_frame,
+                text=label,
+                variable=format_vars[fmt],
+                bg=self.colors['bg_primary'],
+                fg=self.colors['text_primary'],
+                font=self.fonts['body'],
+                activebackground=self.colors['bg_primary'],
+                selectcolor=self.colors['bg_primary']
+            ).pack(side=tk.LEFT, padx=10)
+        
+        preview_text = tk.Text(dialog, height=14, font=self.fonts['mono'], bg=self.colors['bg_card'],
+                               fg=self.colors['text_primary'], relief="flat", wrap="none")
+        
+        def options():
+            try:
+                minutes = int(minutes_var.get() or 0)
+            except ValueError:
+                raise ValueError("Rounding minutes must be a whole number")
+            return from_var.get().strip() or None, to_var.get().strip() or None, minutes, rounding_var.get()
+        
+        def preview():
+            try:
+                start, end, minutes, rounding = options()
+                builder = InvoiceBuilder(*self.billing_rates(), minutes, rounding,
+                                         self.config.get('invoice_prefix', 'INV'), self.invoice_counter_file)
+                invoices = builder.build(self.store.iter_entries(), start, end)
+            except ValueError as e:
+                messagebox.showerror("Invalid Options", str(e))
                 return
-            
-            # Find the listbox in the entries window
-            listbox = None
-            for widget in entries_window.winfo_children():
-                if isinstance(widget, tk.Frame):
-                    for child in widget.winfo_children():
-                        if isinstance(child, tk.Frame):
-                            for grandchild in child.winfo_children():
-                                if isinstance(grandchild, tk.Listbox):
-                                    listbox = grandchild
-                                    break
-            
-            if not listbox:
-                messagebox.showwarning("Warning", "Could not find entries list.")
+            preview_text.config(state="normal")
+            preview_text.delete("1.0", tk.END)
+            if not invoices and not builder.unrated:
+                preview_text.insert(tk.END, "No uninvoiced entries in this range.")
+            for invoice in invoices:
+                preview_text.insert(
+                    tk.END,
+                    f"{invoice['number']}  {invoice['project']}: {len(invoice['lines'])} entries, "
+                    f"{invoice['hours']} h, {invoice['total']} {invoice['currency']}\n"
+                )
+            for project in builder.unrated:
+                preview_text.insert(tk.END, f"⚠️ {project}: no invoice rate set, will be skipped\n")
+            preview_text.config(state="disabled")
+        
+        def generate():
+            try:
+                start, end, minutes, rounding = options()
+            except ValueError as e:
+                messagebox.showerror("Invalid Options", str(e))
                 return
-            
-            # Get selection
-            selection = listbox.curselection()
-            if not selection:
-                messagebox.showwarning("Warning", "Please select an entry to mark as invoiced.")
+            formats = [fmt for fmt, var in format_vars.items() if var.get()]
+            if not formats:
+                messagebox.showwarning("No Format", "Select at least one document format.")
                 return
+            if self.generate_invoices(start, end, minutes, rounding, formats):
+                self.close_dialog("invoices")
+        
+        buttons_frame = tk.Frame(dialog, bg=self.colors['bg_primary'], pady=10)
+        buttons_frame.pack()
+        self.create_modern_button(
+            buttons_frame,
+            "🔍 Preview",
+            preview,
+            bg_color=self.colors['info'],
+            hover_color='#2563EB',
+            width=12
+        ).pack(side=tk.LEFT, padx=(0, 10))
+        self.create_modern_button(
+            buttons_frame,
+            "🧾 Generate Invoices",
+            generate,
+            bg_color=self.colors['secondary'],
+            hover_color=self.colors['secondary_hover'],
+            width=18
+        ).pack(side=tk.LEFT)
+        
+        preview_text.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+        preview()
+
+    def generate_invoices(self, start: Optional[str], end: Optional[str], rounding_minutes: int = 0,
+                          rounding: str = 'up', formats=('csv', 'html', 'txt')) -> List[Dict[str, Any]]:
+        """Write invoice documents for the uninvoiced entries of a range and mark them invoiced.
+
+        All included entries are updated in one batch; if saving fails the
+        documents are removed again. Returns the invoices generated.
+        """
+        try:
+            builder = InvoiceBuilder(*self.billing_rates(), rounding_minutes, rounding,
+                                     self.config.get('invoice_prefix', 'INV'), self.invoice_counter_file)
+            invoices = builder.build(self.store.iter_entries(), start, end)
+            unrated = ""
+            if builder.unrated:
+                unrated = ("No invoice rate is set for these projects, so their entries were left uninvoiced:\n"
+                           + "\n".join(f"• {project}" for project in builder.unrated)
+                           + "\n\nSet their rates under Invoice Rates and generate again.")
+            if not invoices:
+                if unrated:
+                    messagebox.showwarning("Missing Invoice Rates", unrated)
+                else:
+                    messagebox.showinfo("Nothing to Invoice", "There are no uninvoiced entries in this range.")
+                return []
             
-            # Load data and update
-            data = self.load_data()
-            updated_count = 0
+            directory = filedialog.askdirectory(title="Save invoices to", initialdir=os.path.abspath(self.invoice_dir))
+            if not directory:
+                return []
             
-            if len(selection) == 1:
-                # Single selection - toggle status
-                filtered_index = selection[0]
-                
-                # We need to find the actual entry in the filtered view
-                # Since we can't directly access the filtered_data from here,
-                # we'll work with the current listbox content
-                if filtered_index < listbox.size():
-                    # Get the entry text to extract project and time info
-                    entry_text = listbox.get(filtered_index)
-                    # Parse the entry to find the original entry in data
-                    # This is a fallback approach - ideally we'd have access to filtered_data
-                    for i, entry in enumerate(data):
-                        if (entry.get('project', '') in entry_text and 
-                            entry.get('start_time', '') in entry_text):
-                            current_status = entry.get('invoiced', 'No')
-                            new_status = 'Yes' if current_status == 'No' else 'No'
-                            
-                            entry['invoiced'] = new_status
-                            updated_count = 1
-                            
-                            status_text = "invoiced" if new_status == 'Yes' else "not invoiced"
-                            self.update_status(f"Entry marked as {status_text}")
-                            break
-            else:
-                # Multiple selection - toggle status for each entry
-                count = len(selection)
-                if messagebox.askyesno("Confirm Bulk Update", f"Toggle invoiced status for {count} selected entries?"):
-                    # For multiple selection, we'll need to find each entry
-                    for filtered_index in selection:
-                        if filtered_index < listbox.size():
-                            entry_text = listbox.get(filtered_index)
-                            for i, entry in enumerate(data):
-                                if (entry.get('project', '') in entry_text and 
-                                    entry.get('start_time', '') in entry_text):
-                                    # Toggle the status: Yes -> No, No -> Yes
-                                    current_status = entry.get('invoiced', 'No')
-                                    new_status = 'Yes' if current_status == 'No' else 'No'
-                                    data[i]['invoiced'] = new_status
-                                    updated_count += 1
-                                    break
-                    
-                    self.update_status(f"{updated_count} entries status toggled")
-                else:
-                    return
+            written = builder.write(invoices, directory, formats)
+            batch = self.store.begin()
+            builder.mark(batch, invoices)
+            if self.commit_batch(batch) is None:
+                builder.remove(written)
+                return []
+            try:
+                builder.record(invoices)
+            except OSError as e:
+                # The numbers are on the entries, so they are still never reissued
+                self.log_error(f"Failed to save the invoice counter: {e}")
             
-            if updated_count > 0:
-                # Save changes
-                self.save_data(data)
-                
-                # Refresh the listbox content by triggering a filter refresh
-                # We'll need to find and call the apply_filter function
-                # For now, let's just refresh the entire window
-                entries_window.destroy()
-                self.view_entries()
-                
+            self.config['invoice_rounding_minutes'] = rounding_minutes
+            self.config['invoice_rounding'] = rounding
+            self.save_config()
+            
+            entry_count = sum(len(invoice['lines']) for invoice in invoices)
+            summary = "\n".join(
+                f"• {invoice['number']} {invoice['project']}: {invoice['total']} {invoice['currency']}"
+                for invoice in invoices
+            )
+            self.update_status(f"Generated {len(invoices)} invoices for {entry_count} entries")
+            messagebox.showinfo(
+                "Invoices Generated",
+                f"Generated {len(invoices)} invoices covering {entry_count} entries:\n\n{summary}\n\nSaved to:\n{directory}"
+            )
+            if unrated:
+                messagebox.showwarning("Missing Invoice Rates", unrated)
+            return invoices
+        
+        except Exception as e:
+            self.log_error(f"Invoice generation failed: {e}")
+            messagebox.showerror("Invoice Error", f"Failed to generate invoices: {e}")
+            return []
+
+    def mark_as_invoiced(self, entry_ids: Iterable[str], status: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Set (or toggle, when status is None) the invoiced flag of entries by ID.
+
+        All matching entries are updated in a single pass over the data and
+        written with one save. Returns the updated entries keyed by ID.
+        """
+        try:
+            ids = {entry_id for entry_id in entry_ids if entry_id}
+            if not ids:
+                return {}
+
+            batch = self.store.begin()
+            for entry in self.store.load():
+                if entry['id'] in ids:
+                    if status is None:
+                        new_status = 'No' if entry.get('invoiced') == 'Yes' else 'Yes'
+                    else:
+                        new_status = status
+                    fields = {'invoiced': new_status}
+                    if new_status == 'No' and entry.get('invoice_number'):
+                        fields['invoice_number'] = None
+                    batch.update(entry['id'], fields)
+
+            changes = batch.commit()
+            updated = {new['id']: new for _old, new in changes.updated}
+            if updated:
+                if len(updated) == 1:
+                    new_status = next(iter(updated.values()))['invoiced']
+                    status_text = "invoiced" if new_status == 'Yes' else "not invoiced"
+                    self.update_status(f"Entry marked as {status_text}")
+                elif status is None:
+                    self.update_status(f"{len(updated)} entries status toggled")
+                else:
+                    self.update_status(f"{len(updated)} entries marked as invoiced: {status}")
+            return updated
+
         except Exception as e:
             self.log_error(f"Failed to mark as invoiced: {e}")
             messagebox.showerror("Error", f"Failed to mark as invoiced: {e}")
+            return {}
 
     def refresh_entries_listbox(self, listbox, data=None):
         """Refresh the entries listbox with updated data"""
@@ -3226,20 +7292,9 @@ Total Time: {self.format_seconds(total_seconds)} ({total_hours:.2f} hours)
             # Clear current entries
             listbox.delete(0, tk.END)
             
-            def truncate(text, length=40):
-                text = text or ""
-                return (text[:length] + "…") if len(text) > length else text
-            
             # Repopulate with updated data
             for i, entry in enumerate(data):
-                proj = entry.get('project', '')
-                st = entry.get('start_time', '')
-                et = entry.get('stop_time', '')
-                dur = entry.get('duration') or self.format_seconds(entry.get('duration_seconds', 0))
-                memo_snippet = truncate(entry.get('memo', ''), 30)
-                invoiced_status = entry.get('invoiced', 'No')
-                invoiced_icon = "💰" if invoiced_status == "Yes" else "📝"
-                listbox.insert(tk.END, f"{i+1}. {proj} | {st} - {et} | {dur} | {invoiced_icon} {invoiced_status} | 📝 {memo_snippet}")
+                listbox.insert(tk.END, self.format_entry_row(i, entry))
                 
         except Exception as e:
             self.log_error(f"Failed to refresh entries listbox: {e}")
@@ -3251,8 +7306,8 @@ Total Time: {self.format_seconds(total_seconds)} ({total_hours:.2f} hours)
         # Re-apply filter to refresh the listbox
         # This will be handled by the apply_filter function when called
 
-    def apply_reports_date_filter(self, data, from_date_var, to_date_var):
-        """Apply date filter to reports data"""
+    def apply_reports_date_filter(self, from_date_var, to_date_var):
+        """Apply a date filter to the open reports dialog"""
         try:
             from_date = from_date_var.get().strip()
             to_date = to_date_var.get().strip()
@@ -3268,156 +7323,25 @@ Total Time: {self.format_seconds(total_seconds)} ({total_hours:.2f} hours)
                         messagebox.showerror("Invalid Date Range", "From date cannot be after To date")
                         return
                     
-                    filtered_data = []
-                    for entry in data:
-                        try:
-                            entry_date = datetime.strptime(entry.get('start_time', ''), "%Y-%m-%d %H:%M:%S").date()
-                            if from_date_obj <= entry_date <= to_date_obj:
-                                filtered_data.append(entry)
-                        except (ValueError, TypeError):
-                            # Skip entries with invalid dates
-                            continue
-                    
-                    # Show filtered reports
-                    self.show_filtered_reports(filtered_data, from_date, to_date)
+                    self.refresh_reports((from_date_obj.isoformat(), to_date_obj.isoformat()))
                     
                 except ValueError as e:
                     messagebox.showerror("Invalid Date Format", f"Please ensure dates are in YYYY-MM-DD format.\n\nError: {str(e)}")
                     return
             else:
                 # No valid dates, show all data
-                self.show_reports()
+                self.refresh_reports()
                 
         except Exception as e:
             self.log_error(f"Failed to apply reports date filter: {e}")
             messagebox.showerror("Error", f"Failed to apply reports date filter: {e}")
 
-    def show_filtered_reports(self, filtered_data, from_date, to_date):
-        """Show reports with filtered data"""
-        try:
-            # Create a new reports window with filtered data
-            reports_window = self.create_dialog("filtered_reports", f"📊 Time Tracking Reports (Filtered: {from_date} to {to_date})", "750x550")
-            
-            if not filtered_data:
-                # No filtered data message
-                no_data_frame = tk.Frame(reports_window, bg=self.colors['bg_primary'])
-                no_data_frame.pack(expand=True, fill="both")
-                
-                tk.Label(
-                    no_data_frame, 
-                    text="📊 No Data in Date Range", 
-                    bg=self.colors['bg_primary'], 
-                    fg=self.colors['text_primary'], 
-                    font=self.fonts['title']
-                ).pack(expand=True)
-                
-                tk.Label(
-                    no_data_frame, 
-                    text=f"No entries found between {from_date} and {to_date}", 
-                    bg=self.colors['bg_primary'], 
-                    fg=self.colors['text_muted'], 
-                    font=self.fonts['body']
-                ).pack()
-                return
-            
-            # Header
-            header_frame = tk.Frame(reports_window, bg=self.colors['bg_primary'], pady=20)
-            header_frame.pack(fill="x")
-            
-            tk.Label(
-                header_frame, 
-                text=f"📊 Analytics & Reports (Filtered: {from_date} to {to_date})", 
-                bg=self.colors['bg_primary'], 
-                fg=self.colors['text_primary'], 
-                font=self.fonts['title']
-            ).pack()
-            
-            # Show filtered data count
-            tk.Label(
-                header_frame, 
-                text=f"Showing {len(filtered_data)} entries out of {len(self.load_data())} total", 
-                bg=self.colors['bg_primary'], 
-                fg=self.colors['text_secondary'], 
-                font=self.fonts['body']
-            ).pack(pady=(5, 0))
-            
-            # Create notebook for different report types
-            notebook = ttk.Notebook(reports_window)
-            notebook.pack(fill="both", expand=True, padx=25, pady=25)
-            
-            # Summary Report Tab
-            summary_frame = tk.Frame(notebook, bg=self.colors['bg_card'])
-            notebook.add(summary_frame, text="📈 Summary")
-            
-            # Calculate summary statistics for filtered data
-            total_entries = len(filtered_data)
-            total_seconds = sum(entry.get('duration_seconds', 0) for entry in filtered_data)
-            total_hours = total_seconds / 3600
-            
-            # Invoiced status breakdown
-            invoiced_seconds = sum(entry.get('duration_seconds', 0) for entry in filtered_data if entry.get('invoiced') == 'Yes')
-            not_invoiced_seconds = total_seconds - invoiced_seconds
-            invoiced_hours = invoiced_seconds / 3600
-            not_invoiced_hours = not_invoiced_seconds / 3600
-            
-            # Project breakdown
-            project_totals = {}
-            for entry in filtered_data:
-                project = entry.get('project', 'Unknown')
-                duration = entry.get('duration_seconds', 0)
-                project_totals[project] = project_totals.get(project, 0) + duration
-            
-            # Display summary
-            summary_text = f"""📊 FILTERED TIME TRACKING SUMMARY
-Date Range: {from_date} to {to_date}
-
-Total Entries: {total_entries}
-Total Time: {self.format_seconds(total_seconds)} ({total_hours:.2f} hours)
-
-💰 INVOICING STATUS:
-• Invoiced: {self.format_seconds(invoiced_seconds)} ({invoiced_hours:.2f} hours)
-• Not Invoiced: {self.format_seconds(not_invoiced_seconds)} ({not_invoiced_hours:.2f} hours)
-
-📋 TOP PROJECTS:
-"""
-            
-            # Sort projects by time
-            sorted_projects = sorted(project_totals.items(), key=lambda x: x[1], reverse=True)
-            for i, (project, duration) in enumerate(sorted_projects[:5], 1):
-                hours = duration / 3600
-                summary_text += f"\n{i}. {project}: {self.format_seconds(duration)} ({hours:.2f} hours)"
-            
-            summary_label = tk.Label(
-                summary_frame, 
-                text=summary_text, 
-                bg=self.colors['bg_card'], 
-                fg=self.colors['text_primary'],
-                font=self.fonts['body'], 
-                justify=tk.LEFT
-            )
-            summary_label.pack(pady=30, padx=30, anchor="w")
-            
-            # Export button for filtered data
-            export_frame = tk.Frame(reports_window, bg=self.colors['bg_primary'], pady=10)
-            export_frame.pack()
-            
-            self.create_modern_button(
-                export_frame, 
-                "📁 Export Filtered Report", 
-                lambda: self.export_to_csv(filtered_data),
-                bg_color=self.colors['accent'],
-                hover_color=self.colors['accent_hover'],
-                width=20
-            ).pack()
-            
-        except Exception as e:
-            self.log_error(f"Failed to show filtered reports: {e}")
-            messagebox.showerror("Error", f"Failed to show filtered reports: {e}")
-
     def clear_reports_date_filters(self, from_date_var, to_date_var):
-        """Clear date filters for reports"""
+        """Clear date filters for reports and show all data again"""
         from_date_var.set("")
         to_date_var.set("")
+        if self.reports_view and self.reports_view['range']:
+            self.refresh_reports()
 
     def create_dialog(self, dialog_type, title, geometry, modal=True):
         """Create a properly positioned dialog with single instance enforcement"""
@@ -3467,6 +7391,11 @@ Total Time: {self.format_seconds(total_seconds)} ({total_hours:.2f} hours)
         
         return dialog
 
+    def on_close(self):
+        """Save pending rollup changes and close the application"""
+        self.rollup.flush()
+        self.root.destroy()
+
     def close_dialog(self, dialog_type):
         """Close a specific dialog if it's open"""
         if dialog_type in self.open_dialogs and self.open_dialogs[dialog_type].winfo_exists():
@@ -3479,6 +7408,8 @@ Total Time: {self.format_seconds(total_seconds)} ({total_hours:.2f} hours)
             self.close_dialog(dialog_type)
 
 if __name__ == "__main__":
+    # Needed for the CSV import process pool in frozen executables
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = TimeTrackerApp(root)
     root.mainloop()
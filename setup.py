@@ -3,7 +3,7 @@ from cx_Freeze import setup, Executable
 
 # Dependencies are automatically detected, but some modules need help
 build_exe_options = {
-    "packages": ["tkinter", "json", "os", "csv", "datetime", "shutil", "typing"],
+    "packages": ["tkinter", "json", "os", "csv", "datetime", "shutil", "typing", "multiprocessing", "concurrent.futures", "struct"],
     "excludes": ["unittest", "test"],
     "include_files": [],
     "optimize": 2
@@ -2,14 +2,23 @@ import unittest
 import tempfile
 import os
 import json
+import csv
+import io
 import shutil
+import zipfile
 from unittest.mock import patch, MagicMock
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import tkinter as tk
+from tkinter import ttk
 import time
+import threading
+import multiprocessing
+import struct
+import zlib
 
 # Import the TimeTrackerApp class
-from main import TimeTrackerApp
+import main
+from main import TimeTrackerApp, EntryStore, DailyRollup, ReportEngine, VectorEngine, ReportCache, BackgroundTask, SessionStatistics, IncrementalReport, CsvImporter, EntryExporter, ColumnarExporter, IncrementalExport, InvoiceBuilder, ReportExporter, TimerSession, TimerManager, IdleDetector, SessionCheckpoint
 
 class TestTimeTracker(unittest.TestCase):
     """Test suite for TimeTracker application"""
@@ -268,6 +277,194 @@ class TestTimeTracker(unittest.TestCase):
         self.assertEqual(self.app.stop_button['state'], 'disabled')
         self.assertEqual(self.app.pause_button['state'], 'disabled')
     
+    def test_timer_stop_keeps_session_when_save_fails(self):
+        """Test that a failed save leaves the stopped session and its checkpoint for a retry"""
+        self.app.project_name.set("Test Project")
+        self.app.start_timer()
+        count = len(self.app.load_data())
+        
+        with patch.object(EntryStore, '_write', side_effect=OSError("disk full")), \
+                patch('main.messagebox.showerror'), patch('main.messagebox.showinfo') as info:
+            self.app.stop_timer()
+        info.assert_not_called()
+        self.assertFalse(self.app.is_running)
+        self.assertIsNotNone(self.app.start_time)
+        self.assertIsNotNone(self.app.session_checkpoint.read())
+        self.assertEqual(self.app.stop_button['state'], 'normal')
+        
+        # Starting again must not overwrite the unsaved session
+        with patch('main.messagebox.showwarning'):
+            self.app.start_timer()
+        self.assertIsNotNone(self.app.session_checkpoint.read())
+        
+        stopped_at = self.app.timer.stop_time
+        with patch('main.messagebox.showinfo'):
+            self.app.stop_timer()
+        data = self.app.load_data()
+        self.assertEqual(len(data), count + 1)
+        self.assertEqual(data[-1]['stop_time'], stopped_at.strftime("%Y-%m-%d %H:%M:%S"))
+        self.assertIsNone(self.app.start_time)
+        self.assertIsNone(self.app.session_checkpoint.read())
+    
+    def test_timer_hidden_window_stops_ticks(self):
+        """Test that display ticks stop while hidden and resume when shown"""
+        self.app.project_name.set("Test Project")
+        self.app.start_timer()
+        self.assertIsNotNone(self.app.timer_after_id)
+        
+        # Minimized: no scheduled redraws
+        self.app.on_window_hidden()
+        self.assertFalse(self.app.timer_visible)
+        self.assertIsNone(self.app.timer_after_id)
+        
+        # Restored: redrawn at once and ticking again
+        self.app.elapsed_label.config(text="stale")
+        self.app.on_window_shown()
+        self.assertTrue(self.app.timer_visible)
+        self.assertEqual(self.app.elapsed_label['text'], "00:00:00")
+        self.assertIsNotNone(self.app.timer_after_id)
+        
+        # Minute resolution
+        self.app.config['timer_display_minutes'] = True
+        self.app.update_elapsed_time()
+        self.assertEqual(self.app.elapsed_label['text'], "00:00")
+    
+    def test_other_timers_share_tick(self):
+        """Test that concurrent timers run on the main tick and save an entry when stopped"""
+        self.app.project_name.set("On-call")
+        self.app.start_other_timer()
+        self.app.start_other_timer()
+        self.assertEqual(len(self.app.timers), 2)
+        self.assertEqual(len(self.app.timer_rows), 2)
+        self.assertIsNotNone(self.app.timer_after_id)
+        
+        first, second = sorted(self.app.timer_rows)
+        self.app.toggle_other_timer(first)
+        self.assertEqual(self.app.timer_rows[first]['pause']['text'], "▶ Resume")
+        
+        count = len(self.app.load_data())
+        self.app.stop_other_timer(second)
+        self.app.stop_other_timer(first)
+        data = self.app.load_data()
+        self.assertEqual(len(data), count + 2)
+        self.assertEqual(data[-1]['project'], "On-call")
+        self.assertEqual(self.app.timer_rows, {})
+        self.assertIsNone(self.app.timer_after_id)
+    
+    def test_other_timers_are_checkpointed_and_recovered(self):
+        """Test that concurrent timers get their own checkpoint and are offered for recovery"""
+        self.app.project_name.set("On-call")
+        self.app.start_other_timer()
+        timer_id = next(iter(self.app.timer_rows))
+        filename = self.app.timer_checkpoint_file(timer_id)
+        self.assertTrue(os.path.exists(filename))
+        self.app.cancel_checkpoints()
+        self.root.destroy()
+        
+        # Next launch after a crash: resume the concurrent timer
+        self.root = tk.Tk()
+        self.app = TimeTrackerApp(self.root)
+        self.assertEqual(list(self.app.interrupted_timers), [timer_id])
+        with patch('main.messagebox.askyesnocancel', return_value=True):
+            self.app.offer_session_recovery()
+        self.assertEqual(len(self.app.timers), 1)
+        restored_id = next(iter(self.app.timer_rows))
+        self.assertGreater(restored_id, timer_id)
+        self.assertFalse(os.path.exists(filename))
+        self.assertTrue(os.path.exists(self.app.timer_checkpoint_file(restored_id)))
+        
+        count = len(self.app.load_data())
+        self.app.stop_other_timer(restored_id)
+        self.assertEqual(len(self.app.load_data()), count + 1)
+        self.assertFalse(os.path.exists(self.app.timer_checkpoint_file(restored_id)))
+    
+    def test_idle_return_cuts_running_timer(self):
+        """Test that input after an idle period cuts the gap and the entry keeps gross time"""
+        self.assertFalse(self.app.idle_detector.enabled)   # off by default
+        self.app.idle_detector = IdleDetector(600, provider=lambda: 0)
+        self.app.project_name.set("Test Project")
+        self.app.start_timer()
+        self.assertIsNotNone(self.app.idle_after_id)
+        
+        # Idle since the timer started, then input arrives
+        self.app.idle_detector.idle_since_ns = self.app.timer.segment_start_ns
+        self.app.on_user_activity()
+        self.assertFalse(self.app.idle_detector.is_idle)
+        self.assertGreater(self.app.timer.idle_ns, 0)
+        
+        self.app.stop_timer()
+        entry = self.app.load_data()[-1]
+        self.assertIn('gross_duration_seconds', entry)
+        self.assertGreaterEqual(entry['gross_duration_seconds'], entry['duration_seconds'])
+    
+    def test_view_entries_action_buttons(self):
+        """Test that the entries dialog offers edit, delete, invoiced and export actions"""
+        self.app.view_entries()
+        window = self.app.open_dialogs['view_entries']
+        
+        texts = set()
+        widgets = [window]
+        while widgets:
+            widget = widgets.pop()
+            if isinstance(widget, tk.Button):
+                texts.add(widget['text'])
+            widgets.extend(widget.winfo_children())
+        for text in ("✏️ Edit Selected (1st)", "🗑️ Delete Selected", "💰 Toggle Invoiced", "📊 Export CSV"):
+            self.assertIn(text, texts)
+    
+    def _wait_for_report(self, count):
+        """Let the Tk loop deliver the open reports dialog's report with count entries"""
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            report = (self.app.reports_view or {}).get('report')
+            if report is not None and report['totals']['count'] == count:
+                return report
+            self.root.update()
+            time.sleep(0.01)
+        self.fail(f"report with {count} entries not shown")
+    
+    def _report_tabs(self):
+        notebooks = [child for child in self.app.reports_view['content'].winfo_children()
+                     if isinstance(child, ttk.Notebook)]
+        self.assertEqual(len(notebooks), 1)
+        return [notebooks[0].tab(tab, 'text') for tab in notebooks[0].tabs()]
+    
+    def test_filtered_reports_update_open_dialog(self):
+        """Test that a date range refilters every tab in place and Clear restores all data"""
+        with self.app.store.begin() as batch:
+            batch.add({"project": "Test Project 3", "start_time": "2024-02-01 09:00:00", "duration_seconds": 600})
+        self.app.show_reports()
+        self._wait_for_report(3)
+        all_tabs = self._report_tabs()
+        
+        from_var, to_var = tk.StringVar(value="2024-02-01"), tk.StringVar(value="2024-02-29")
+        self.app.apply_reports_date_filter(from_var, to_var)
+        report = self._wait_for_report(1)
+        self.assertEqual(self.app.reports_view['range'], ("2024-02-01", "2024-02-29"))
+        self.assertEqual(list(report['project']), [("Test Project 3",)])
+        self.assertIn("showing 1 entries out of 3 total", self.app.reports_view['subtitle']['text'])
+        self.assertEqual(self._report_tabs(), all_tabs)
+        self.assertNotIn("filtered_reports", self.app.open_dialogs)
+        
+        # Clear goes back to all data in the same dialog
+        self.app.clear_reports_date_filters(from_var, to_var)
+        self._wait_for_report(3)
+        self.assertIsNone(self.app.reports_view['range'])
+        self.assertEqual(self.app.reports_view['subtitle']['text'], "")
+    
+    def test_entries_in_range_is_cached_per_range(self):
+        """Test that the filtered entry subset is reused until the data changes"""
+        date_range = ("2024-01-01", "2024-01-31")
+        first = self.app.entries_in_range(date_range)
+        self.assertEqual(len(first), 2)
+        self.assertIs(self.app.entries_in_range(date_range), first)
+        self.assertEqual(self.app.entries_in_range(("2024-02-01", "2024-02-29")), [])
+        self.assertEqual(len(self.app.entries_in_range()), 2)
+        
+        with self.app.store.begin() as batch:
+            batch.add({"project": "Test Project 3", "start_time": "2024-01-20 09:00:00", "duration_seconds": 600})
+        self.assertEqual(len(self.app.entries_in_range(date_range)), 3)
+    
     def test_backup_functionality(self):
         """Test backup functionality"""
         # Create backup directory
@@ -402,8 +599,14 @@ class TestTimeTracker(unittest.TestCase):
     def test_csv_export(self):
         """Test CSV export functionality"""
         # Mock filedialog to return a test filename
-        with patch('tkinter.filedialog.asksaveasfilename', return_value='test_export.csv'):
+        with patch('tkinter.filedialog.asksaveasfilename', return_value='test_export.csv'), \
+             patch('tkinter.messagebox.showinfo'):
             self.app.export_to_csv(self.sample_data)
+            # The file is written on a worker thread; let the Tk loop deliver the result
+            deadline = time.time() + 10
+            while "export" in self.app.open_dialogs and time.time() < deadline:
+                self.root.update()
+                time.sleep(0.01)
         
         # Verify CSV was created
         self.assertTrue(os.path.exists('test_export.csv'))
@@ -431,8 +634,14 @@ class TestTimeTracker(unittest.TestCase):
             })
         
         # Mock filedialog to return the test CSV filename
-        with patch('tkinter.filedialog.askopenfilename', return_value=test_csv):
+        with patch('tkinter.filedialog.askopenfilename', return_value=test_csv), \
+             patch('tkinter.messagebox.showinfo'):
             self.app.import_from_csv()
+            # The file is read on a worker thread; let the Tk loop deliver the result
+            deadline = time.time() + 10
+            while "csv_import" in self.app.open_dialogs and time.time() < deadline:
+                self.root.update()
+                time.sleep(0.01)
         
         # Verify data was imported
         data = self.app.load_data()
@@ -595,6 +804,38 @@ class TestTimeTracker(unittest.TestCase):
         
         self.assertEqual(new_status, 'No')  # Yes -> No
 
+    def test_entry_ids_assigned_and_stable(self):
+        """Test that entries get persistent IDs on load"""
+        data = self.app.load_data()
+        ids = [entry.get('id') for entry in data]
+        self.assertTrue(all(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+        
+        # IDs must survive a reload
+        reloaded_ids = [entry.get('id') for entry in self.app.load_data()]
+        self.assertEqual(ids, reloaded_ids)
+
+    def test_mark_as_invoiced_by_id(self):
+        """Test bulk invoiced toggling by entry ID"""
+        # Projects sharing a name prefix must not be confused
+        prefix_data = [
+            {"project": "Acme", "start_time": "2024-01-01 09:00:00", "duration_seconds": 60, "invoiced": "No"},
+            {"project": "Acme Corp", "start_time": "2024-01-01 09:00:00", "duration_seconds": 60, "invoiced": "No"}
+        ]
+        self.app.save_data(prefix_data)
+        ids = [entry['id'] for entry in self.app.load_data()]
+        
+        updated = self.app.mark_as_invoiced([ids[1]])
+        self.assertEqual(list(updated.keys()), [ids[1]])
+        data = self.app.load_data()
+        self.assertEqual(data[0]['invoiced'], 'No')
+        self.assertEqual(data[1]['invoiced'], 'Yes')
+        
+        # Explicit status applies to every ID in one pass
+        updated = self.app.mark_as_invoiced(ids, status='Yes')
+        self.assertEqual(len(updated), 2)
+        self.assertTrue(all(entry['invoiced'] == 'Yes' for entry in self.app.load_data()))
+
     def test_filtered_data_management(self):
         """Test filtered data and index mapping functionality"""
         # Test data structure
@@ -979,6 +1220,1358 @@ class TestTimeTrackerIntegration(unittest.TestCase):
                 pass
 
 
+
+class TestEntryStore(unittest.TestCase):
+    """Tests for the batched time entry data layer (no UI required)"""
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.test_dir, 'work_hours.json')
+        self.backups = []
+        self.store = EntryStore(self.data_file, backup_callback=lambda: self.backups.append(1))
+    
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def _entry(self, project="Project", seconds=3600, start="2024-01-01 09:00:00"):
+        return {"project": project, "start_time": start, "duration_seconds": seconds}
+    
+    def test_batch_commit_writes_once(self):
+        """A batch validates, writes, backs up and notifies exactly once"""
+        notifications = []
+        self.store.subscribe(notifications.append)
+        
+        with self.store.begin() as batch:
+            ids = batch.add_many(self._entry(f"P{i}") for i in range(100))
+        
+        self.assertEqual(len(self.backups), 1)
+        self.assertEqual(len(notifications), 1)
+        self.assertEqual(len(notifications[0].added), 100)
+        with open(self.data_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)), 100)
+        
+        # Mixed update/delete batch
+        batch = self.store.begin()
+        batch.update(ids[0], {"invoiced": "Yes"})
+        batch.delete_many(ids[1:51])
+        changes = batch.commit()
+        self.assertEqual(len(changes.updated), 1)
+        self.assertEqual(len(changes.deleted), 50)
+        self.assertEqual(len(self.store.load()), 50)
+        self.assertEqual(self.store.get(ids[0])['invoiced'], 'Yes')
+        self.assertEqual(len(self.backups), 2)
+    
+    def test_batch_validation_is_all_or_nothing(self):
+        """An invalid entry rejects the whole batch without writing"""
+        batch = self.store.begin()
+        batch.add(self._entry())
+        batch.add({"project": "", "duration_seconds": 10})
+        with self.assertRaises(ValueError):
+            batch.commit()
+        self.assertFalse(os.path.exists(self.data_file))
+        self.assertEqual(self.backups, [])
+        
+        with self.assertRaises(ValueError):
+            with self.store.begin() as batch:
+                batch.delete("missing-id")
+    
+    def test_external_file_changes_are_reloaded(self):
+        """The cache is refreshed when the data file changes on disk"""
+        with self.store.begin() as batch:
+            batch.add(self._entry())
+        self.assertEqual(len(self.store.load()), 1)
+        
+        with open(self.data_file, 'w', encoding='utf-8') as f:
+            json.dump([self._entry("A"), self._entry("B"), self._entry("C")], f)
+        entries = self.store.load()
+        self.assertEqual(len(entries), 3)
+        self.assertTrue(all(entry.get('id') for entry in entries))
+        
+        # Normalization coerces imported string fields
+        with self.store.begin() as batch:
+            entry_id = batch.add({"project": "CSV", "duration_seconds": "90", "invoiced": "yes"})
+        self.assertEqual(self.store.get(entry_id)['duration_seconds'], 90)
+        self.assertEqual(self.store.get(entry_id)['invoiced'], 'Yes')
+
+
+class TestDailyRollup(unittest.TestCase):
+    """Tests for the persistent day x project x invoiced rollup"""
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.test_dir, 'work_hours.json')
+        self.rollup_file = os.path.join(self.test_dir, 'rollup.json')
+        self.store = EntryStore(self.data_file)
+        self.rollup = DailyRollup(self.store, self.rollup_file)
+    
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def _recomputed(self):
+        fresh = DailyRollup(EntryStore(self.data_file), os.path.join(self.test_dir, 'scratch.json'))
+        fresh.rebuild(fresh.store.load())
+        return fresh.cells
+    
+    def test_incremental_updates_match_rebuild(self):
+        """Adds, edits, toggles and deletes keep the rollup exact"""
+        with self.store.begin() as batch:
+            ids = batch.add_many([
+                {"project": "A", "start_time": "2024-01-01 09:00:00", "duration_seconds": 3600},
+                {"project": "A", "start_time": "2024-01-01 13:00:00", "duration_seconds": 1800},
+                {"project": "B", "start_time": "2024-01-02 09:00:00", "duration_seconds": 600},
+                {"project": "B", "start_time": "", "duration_seconds": 60}
+            ])
+        self.assertEqual(self.rollup.cells[("2024-01-01", "A", None, False)], [5400, 2])
+        
+        with self.store.begin() as batch:
+            batch.update(ids[0], {"invoiced": "Yes"})
+            batch.update(ids[2], {"start_time": "2024-01-03 09:00:00"})
+            batch.delete(ids[3])
+        self.assertEqual(self.rollup.cells[("2024-01-01", "A", None, True)], [3600, 1])
+        self.assertNotIn(("2024-01-02", "B", None, False), self.rollup.cells)
+        self.assertEqual(self.rollup.cells, self._recomputed())
+        
+        # Date-filtered reports select cells by day
+        self.assertEqual([row[0] for row in self.rollup.rows("2024-01-02", "2024-01-31")], ["2024-01-03"])
+    
+    def test_ranged_report_matches_filtered_entries(self):
+        """A report over a day range of rollup cells equals one over the entries in that range"""
+        entries = [
+            {"project": "A", "start_time": "2024-01-31 23:30:00", "duration_seconds": 3600},
+            {"project": "A", "start_time": "2024-02-01 00:00:00", "duration_seconds": 1800, "invoiced": "Yes"},
+            {"project": "B", "start_time": "2024-02-15 09:00:00", "duration_seconds": 600},
+            {"project": "B", "start_time": "2024-02-29 18:00:00", "duration_seconds": 900},
+            {"project": "C", "start_time": "2024-03-01 09:00:00", "duration_seconds": 60},
+            {"project": "C", "start_time": "", "duration_seconds": 30}
+        ]
+        with self.store.begin() as batch:
+            batch.add_many(entries)
+        groupings = {'total': (), 'project': ('project',), 'month': ('month',)}
+        in_range = [entry for entry in self.store.load() if "2024-02-01" <= entry['start_time'][:10] <= "2024-02-29"]
+        
+        ranged = ReportEngine.aggregate(ReportEngine.rollup_facts(self.rollup, "2024-02-01", "2024-02-29"), groupings)
+        self.assertEqual(ranged, ReportEngine.aggregate(ReportEngine.entry_facts(in_range), groupings))
+        self.assertEqual(ranged['total'][()]['count'], 3)
+        self.assertEqual(sorted(ranged['project']), [('A',), ('B',)])
+        
+        # No range means all data, including entries without a start day
+        everything = ReportEngine.aggregate(ReportEngine.rollup_facts(self.rollup), groupings)
+        self.assertEqual(everything['total'][()]['count'], 6)
+    
+    def test_persisted_rollup_is_reused(self):
+        """A matching sidecar file is loaded without reading the entries"""
+        with self.store.begin() as batch:
+            batch.add({"project": "A", "start_time": "2024-01-01 09:00:00", "duration_seconds": 3600})
+        
+        reopened_store = EntryStore(self.data_file)
+        reopened = DailyRollup(reopened_store, self.rollup_file)
+        reopened.sync()
+        self.assertEqual(reopened.cells, self.rollup.cells)
+        self.assertEqual(reopened_store.loaded_signature, None)  # entries never parsed
+        
+        # An external edit of the data file forces a rebuild
+        with open(self.data_file, 'w', encoding='utf-8') as f:
+            json.dump([{"project": "C", "start_time": "2024-02-01 09:00:00", "duration_seconds": 60}], f)
+        reopened.sync()
+        self.assertEqual(list(reopened.cells.keys()), [("2024-02-01", "C", None, False)])
+    
+    def test_saves_are_deferred_and_skip_unchanged_cells(self):
+        """Mutations schedule one save; edits that leave every cell alone schedule none"""
+        scheduled = []
+        rollup = DailyRollup(self.store, os.path.join(self.test_dir, 'deferred.json'), schedule_save=scheduled.append)
+        with self.store.begin() as batch:
+            entry_id = batch.add({"project": "A", "start_time": "2024-01-01 09:00:00", "duration_seconds": 3600})
+        with self.store.begin() as batch:
+            batch.update(entry_id, {"duration_seconds": 1800})
+        self.assertEqual(len(scheduled), 1)
+        self.assertFalse(os.path.exists(rollup.rollup_file))
+        scheduled.pop()()
+        self.assertFalse(rollup.dirty)
+        
+        with self.store.begin() as batch:
+            batch.update(entry_id, {"memo": "Only the memo"})
+        self.assertEqual(scheduled, [])
+        # Closing still records the new data file signature so the next start reuses the file
+        rollup.flush()
+        reopened = DailyRollup(EntryStore(self.data_file), rollup.rollup_file)
+        reopened.sync()
+        self.assertEqual(reopened.cells, {("2024-01-01", "A", None, False): [1800, 1]})
+        self.assertIsNone(reopened.store.loaded_signature)
+
+
+class TestReportEngine(unittest.TestCase):
+    """Tests for the shared single-pass aggregation engine"""
+    
+    def setUp(self):
+        self.entries = [
+            {"project": "A", "project_id": "a", "start_time": "2024-01-01 09:00:00", "duration_seconds": 3600, "invoiced": "Yes"},
+            {"project": "A", "project_id": "a", "start_time": "2024-01-07 09:00:00", "duration_seconds": 1800, "invoiced": "No"},
+            {"project": "B", "project_id": "b", "start_time": "2024-01-08 09:00:00", "duration_seconds": 600, "invoiced": "No"},
+            {"project": "B", "project_id": "b", "start_time": "2024-02-01 09:00:00", "duration_seconds": 900, "invoiced": "Yes"}
+        ]
+    
+    def test_multiple_groupings_in_one_pass(self):
+        """Project, ISO week and month groupings with all entry measures"""
+        report = ReportEngine.aggregate(
+            ReportEngine.entry_facts(self.entries),
+            {'project': ('project',), 'week': ('week',), 'month_invoiced': ('month', 'invoiced')},
+            measures=('sum', 'count', 'min', 'max', 'split')
+        )
+        project_a = report['project'][('A',)]
+        self.assertEqual(project_a['seconds'], 5400)
+        self.assertEqual(project_a['count'], 2)
+        self.assertEqual((project_a['min'], project_a['max']), (1800, 3600))
+        self.assertEqual(project_a['invoiced_seconds'], 3600)
+        self.assertEqual(project_a['uninvoiced_count'], 1)
+        
+        # 2024-01-01 and 2024-01-07 share ISO week 1; 2024-01-08 starts week 2
+        self.assertEqual(report['week'][('2024-W01',)]['seconds'], 5400)
+        self.assertEqual(report['week'][('2024-W02',)]['seconds'], 600)
+        self.assertEqual(report['month_invoiced'][('2024-02', True)]['seconds'], 900)
+        
+        ranked = ReportEngine.ranked(report['project'])
+        self.assertEqual([key for key, _ in ranked], [('A',), ('B',)])
+    
+    def test_revenue_per_currency(self):
+        """Revenue uses project rates and keeps currencies separate"""
+        self.entries.append({"project": "Legacy", "project_id": None, "start_time": "2024-02-02 09:00:00", "duration_seconds": 7200, "invoiced": "No"})
+        rates = {"a": (100.0, "USD"), "b": (60.0, "EUR"), "legacy": (10.0, "USD")}
+        report = ReportEngine.aggregate(
+            ReportEngine.entry_facts(self.entries),
+            {'total': (), 'month': ('month',)},
+            measures=('sum', 'split', 'revenue'),
+            rates=rates,
+            project_ids={"Legacy": "legacy"}
+        )
+        total = report['total'][()]
+        self.assertAlmostEqual(total['revenue']['USD'], 150.0 + 20.0)
+        self.assertAlmostEqual(total['revenue']['EUR'], 10.0 + 15.0)
+        self.assertAlmostEqual(total['invoiced_revenue']['USD'], 100.0)
+        self.assertAlmostEqual(total['uninvoiced_revenue']['EUR'], 10.0)
+        self.assertAlmostEqual(report['month'][('2024-02',)]['revenue']['EUR'], 15.0)
+        self.assertEqual(ReportEngine.format_money({"USD": 1234.5}), "1,234.50 USD")
+        
+        with self.assertRaises(ValueError):
+            ReportEngine.aggregate([], {'total': ()}, measures=('revenue',))
+
+    def test_time_series_calendar_buckets(self):
+        """Time series buckets are calendar aligned and include empty periods"""
+        facts = list(ReportEngine.entry_facts(self.entries))
+        weekly = ReportEngine.time_series(facts, 'week', date(2024, 1, 3), date(2024, 1, 20))
+        self.assertEqual([label for label, _, _ in weekly], ['2024-W01', '2024-W02', '2024-W03'])
+        self.assertEqual(weekly[0][1], date(2024, 1, 1))  # Monday-aligned
+        # Range filtering is by day: 2024-01-01 falls before the range start
+        self.assertEqual(weekly[0][2]['seconds'], 1800)
+        self.assertEqual(weekly[2][2]['count'], 0)
+        
+        quarterly = ReportEngine.time_series(facts, 'quarter', date(2023, 12, 1), date(2024, 6, 30))
+        self.assertEqual([label for label, _, _ in quarterly], ['2023-Q4', '2024-Q1', '2024-Q2'])
+        self.assertEqual(quarterly[1][2]['seconds'], 6900)
+        
+        # A five-year monthly view has exactly 60 buckets
+        monthly = ReportEngine.time_series(facts, 'month', date(2020, 1, 1), date(2024, 12, 31))
+        self.assertEqual(len(monthly), 60)
+        self.assertEqual(sum(stats['seconds'] for _, _, stats in monthly), 6900)
+        
+        with self.assertRaises(ValueError):
+            ReportEngine.time_series(facts, 'fortnight', date(2024, 1, 1), date(2024, 1, 2))
+
+    def test_rollup_facts_match_entry_facts(self):
+        """Aggregating rollup cells gives the same sums as raw entries"""
+        test_dir = tempfile.mkdtemp()
+        try:
+            store = EntryStore(os.path.join(test_dir, 'work_hours.json'))
+            rollup = DailyRollup(store, os.path.join(test_dir, 'rollup.json'))
+            with store.begin() as batch:
+                batch.add_many(self.entries)
+            groupings = {'project': ('project',), 'month': ('month', 'invoiced')}
+            from_rollup = ReportEngine.aggregate(ReportEngine.rollup_facts(rollup), groupings)
+            from_entries = ReportEngine.aggregate(ReportEngine.entry_facts(self.entries), groupings)
+            self.assertEqual(from_rollup, from_entries)
+            
+            # Per-entry measures cannot be answered from pre-aggregated cells
+            with store.begin() as batch:
+                batch.add(self.entries[0])
+            with self.assertRaises(ValueError):
+                ReportEngine.aggregate(ReportEngine.rollup_facts(rollup), groupings, measures=('min',))
+        finally:
+            shutil.rmtree(test_dir, ignore_errors=True)
+
+class TestReportCache(unittest.TestCase):
+    """Tests for report results memoized by data version"""
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.test_dir, 'work_hours.json')
+        self.store = EntryStore(self.data_file)
+        self.cache = ReportCache(self.store)
+        self.computed = []
+    
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def _report(self, params=None):
+        def compute():
+            self.computed.append(params)
+            return ReportEngine.aggregate(ReportEngine.entry_facts(self.store.load()), {'total': ()})
+        return self.cache.get("summary", params, compute)
+    
+    def test_results_reused_until_data_changes(self):
+        """Repeated requests hit the cache; commits and outside edits invalidate it"""
+        with self.store.begin() as batch:
+            entry_id = batch.add({"project": "A", "start_time": "2024-01-01 09:00:00", "duration_seconds": 3600})
+        version = self.store.version
+        
+        first = self._report()
+        self.assertIs(self._report(), first)
+        self._report(("2024-01-01", "2024-01-31"))
+        self.assertEqual(len(self.computed), 2)
+        self.assertEqual(self.cache.hits, 1)
+        
+        with self.store.begin() as batch:
+            batch.update(entry_id, {"duration_seconds": 7200})
+        self.assertGreater(self.store.version, version)
+        self.assertEqual(self._report()['total'][()]['seconds'], 7200)
+        self.assertEqual(len(self.computed), 3)
+        
+        # The file changed outside the store: the signature differs
+        with open(self.data_file, 'w') as f:
+            json.dump([{"project": "B", "start_time": "2024-01-02 09:00:00", "duration_seconds": 600}], f)
+        self.assertEqual(self._report()['total'][()]['seconds'], 600)
+        self.assertEqual(len(self.computed), 4)
+        self.assertEqual(self._report()['total'][()]['seconds'], 600)
+        self.assertEqual(len(self.computed), 4)
+
+
+class TestBackgroundTask(unittest.TestCase):
+    """Tests for report computation on a worker thread"""
+    
+    def _finish(self, task):
+        task.thread.join(5)
+        return task.poll()
+    
+    def test_progress_and_result(self):
+        """Aggregation progress and the result arrive through the queue"""
+        facts = [("2024-01-01", "A", None, False, 60, 1)] * (ReportEngine.PROGRESS_EVERY * 2 + 1)
+        task = BackgroundTask(lambda task: ReportEngine.aggregate(
+            facts, {'total': ()}, progress=lambda done: task.progress(done, len(facts))
+        )).start()
+        messages = self._finish(task)
+        progress = [message[1] for message in messages if message[0] == 'progress']
+        self.assertEqual(progress, [ReportEngine.PROGRESS_EVERY, ReportEngine.PROGRESS_EVERY * 2])
+        self.assertEqual(messages[-1][0], 'done')
+        self.assertEqual(messages[-1][1]['total'][()]['count'], len(facts))
+    
+    def test_cancel_and_error(self):
+        """Cancelled tasks stop at the next progress call; errors are reported"""
+        started = threading.Event()
+        release = threading.Event()
+        
+        def compute(task):
+            started.set()
+            release.wait(5)
+            task.progress(1)
+            return "finished"
+        
+        task = BackgroundTask(compute).start()
+        started.wait(5)
+        task.cancel()
+        release.set()
+        self.assertEqual(self._finish(task), [('cancelled', None)])
+        
+        task = BackgroundTask(lambda task: ReportEngine.aggregate([], {'total': ('bogus',)})).start()
+        messages = self._finish(task)
+        self.assertEqual(messages[0][0], 'error')
+        self.assertIsInstance(messages[0][1], ValueError)
+
+
+class TestVectorEngine(unittest.TestCase):
+    """Tests that the NumPy aggregation path matches the pure Python engine"""
+    
+    def setUp(self):
+        self.facts = []
+        for i in range(400):
+            day = (date(2023, 1, 1) + timedelta(days=i * 7 % 500)).isoformat() if i % 50 else ""
+            project, project_id = [("A", "a"), ("B", "b"), ("Legacy", None), ("Other", None)][i % 4]
+            self.facts.append((day, project, project_id, i % 3 == 0, (i * 97) % 7200, 1))
+        self.rates = {"a": (100.0, "USD"), "b": (60.0, "EUR"), "legacy": (10.0, "USD")}
+        self.project_ids = {"Legacy": "legacy"}
+        self.measures = ('sum', 'count', 'min', 'max', 'split', 'revenue')
+    
+    def assertBucketsEqual(self, expected, actual):
+        self.assertEqual(set(expected), set(actual))
+        for key, bucket in expected.items():
+            for measure, value in bucket.items():
+                if isinstance(value, dict):
+                    self.assertEqual(set(value), set(actual[key][measure]))
+                    for currency, amount in value.items():
+                        self.assertAlmostEqual(amount, actual[key][measure][currency], places=6)
+                else:
+                    self.assertEqual(value, actual[key][measure], (key, measure))
+    
+    @unittest.skipUnless(VectorEngine.available(), "NumPy is not installed")
+    def test_aggregate_matches_pure_python(self):
+        """Every grouping and measure agrees with ReportEngine"""
+        groupings = {
+            'total': (),
+            'project': ('project',),
+            'month_invoiced': ('project_id', 'month', 'invoiced'),
+            'week': ('week',),
+            'quarter': ('year', 'quarter')
+        }
+        expected = ReportEngine.aggregate(self.facts, groupings, self.measures, self.rates, self.project_ids)
+        actual = VectorEngine.aggregate(self.facts, groupings, self.measures, self.rates, self.project_ids)
+        for name in groupings:
+            self.assertBucketsEqual(expected[name], actual[name])
+        self.assertEqual(VectorEngine.aggregate([], {'total': ()}), {'total': {}})
+    
+    @unittest.skipUnless(VectorEngine.available(), "NumPy is not installed")
+    def test_time_series_matches_pure_python(self):
+        """Calendar buckets agree with ReportEngine for every granularity"""
+        measures = ('sum', 'count', 'split', 'revenue')
+        for granularity in ReportEngine.GRANULARITIES:
+            expected = ReportEngine.time_series(self.facts, granularity, date(2023, 2, 15), date(2024, 3, 1), measures, self.rates, self.project_ids)
+            actual = VectorEngine.time_series(self.facts, granularity, date(2023, 2, 15), date(2024, 3, 1), measures, self.rates, self.project_ids)
+            self.assertEqual([row[:2] for row in expected], [row[:2] for row in actual])
+            self.assertBucketsEqual(
+                {row[0]: row[2] for row in expected},
+                {row[0]: row[2] for row in actual}
+            )
+    
+    def test_falls_back_without_numpy(self):
+        """Without NumPy the pure Python engine answers"""
+        with patch.object(main, 'np', None):
+            self.assertFalse(VectorEngine.available())
+            report = VectorEngine.aggregate(self.facts, {'project': ('project',)}, ('sum', 'count'))
+            self.assertEqual(report, ReportEngine.aggregate(self.facts, {'project': ('project',)}, ('sum', 'count')))
+
+
+class TestSessionStatistics(unittest.TestCase):
+    """Tests for streaming session length and work pattern statistics"""
+    
+    def test_percentiles_histogram_and_variance(self):
+        """Percentiles are accurate to one bucket; variance matches a two-pass computation"""
+        lengths = [i * 37 % 10000 for i in range(1, 2001)]
+        entries = [
+            {"project": "A" if i % 2 else "B", "start_time": "2024-01-01 09:00:00", "duration_seconds": seconds}
+            for i, seconds in enumerate(lengths)
+        ]
+        stats = SessionStatistics.from_entries(entries)
+        ordered = sorted(lengths)
+        for p in (10, 50, 90, 99):
+            exact = ordered[int(len(ordered) * p / 100) - 1]
+            self.assertLessEqual(abs(stats.percentile(p) - exact), SessionStatistics.BUCKET_SECONDS)
+        self.assertEqual(stats.percentile(100), max(lengths))
+        self.assertEqual(sum(count for _, _, count in stats.histogram()), len(lengths))
+        
+        project_a = [seconds for i, seconds in enumerate(lengths) if i % 2]
+        count, mean, deviation = stats.project_spread()["A"]
+        self.assertEqual(count, len(project_a))
+        self.assertAlmostEqual(mean, sum(project_a) / len(project_a))
+        variance = sum((seconds - mean) ** 2 for seconds in project_a) / (len(project_a) - 1)
+        self.assertAlmostEqual(deviation, variance ** 0.5)
+    
+    def test_heatmap_splits_sessions_across_hours(self):
+        """A session is spread over the weekday/hour cells it covers"""
+        stats = SessionStatistics()
+        # Sunday 23:30 for 90 minutes runs into Monday
+        stats.add(5400, datetime(2024, 1, 7, 23, 30), "A")
+        self.assertEqual(stats.heatmap[6][23], 1800)
+        self.assertEqual(stats.heatmap[0][0], 3600)
+        # Over a week long: every cell gets a full hour per whole week
+        stats.add(SessionStatistics.WEEK_SECONDS + 60, datetime(2024, 1, 1, 12, 0))
+        self.assertEqual(stats.heatmap[3][5], 3600)
+        self.assertEqual(stats.heatmap[0][12], 3660)
+        self.assertEqual(sum(map(sum, stats.heatmap)), 5400 + SessionStatistics.WEEK_SECONDS + 60)
+
+
+class TestIncrementalReport(unittest.TestCase):
+    """Tests for report groupings maintained from entry deltas"""
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.store = EntryStore(os.path.join(self.test_dir, 'work_hours.json'))
+        self.rollup = DailyRollup(self.store, os.path.join(self.test_dir, 'rollup.json'))
+        self.mismatches = []
+        self.live = IncrementalReport(
+            self.rollup, TimeTrackerApp.REPORT_GROUPINGS, verify=True, on_mismatch=self.mismatches.append
+        )
+        self.billing = ({"a": (100.0, "USD")}, {})
+    
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def _recomputed(self):
+        return ReportEngine.aggregate(
+            ReportEngine.entry_facts(self.store.load()), TimeTrackerApp.REPORT_GROUPINGS,
+            measures=IncrementalReport.MEASURES, rates=self.billing[0], project_ids=self.billing[1]
+        )
+    
+    def test_deltas_match_full_recompute(self):
+        """Stops, edits, toggles and deletes keep every grouping exact"""
+        with self.store.begin() as batch:
+            ids = batch.add_many([
+                {"project": "A", "project_id": "a", "start_time": "2024-01-01 09:00:00", "duration_seconds": 3600},
+                {"project": "B", "start_time": "2024-02-01 09:00:00", "duration_seconds": 600}
+            ])
+        self.assertEqual(self.live.report(self.billing), self._recomputed())
+        
+        with self.store.begin() as batch:
+            batch.add({"project": "A", "project_id": "a", "start_time": "2024-02-03 09:00:00", "duration_seconds": 1800})
+        with self.store.begin() as batch:
+            batch.update(ids[0], {"invoiced": "Yes"})
+            batch.update(ids[1], {"start_time": "2024-03-01 09:00:00", "duration_seconds": 900})
+        with self.store.begin() as batch:
+            batch.delete(ids[1])
+        
+        report = self.live.report(self.billing)
+        self.assertEqual(report, self._recomputed())
+        self.assertEqual(report['total'][()]['invoiced_revenue'], {"USD": 100.0})
+        self.assertNotIn(('2024-03',), report['month'])
+        self.assertEqual(self.mismatches, [])
+    
+    def test_verification_detects_drift(self):
+        """Verify mode reports and repairs aggregates that no longer match"""
+        with self.store.begin() as batch:
+            batch.add({"project": "A", "start_time": "2024-01-01 09:00:00", "duration_seconds": 60})
+        self.live.report()
+        self.live._groups['total'][()][("A", None, False)][0] += 5
+        
+        with self.store.begin() as batch:
+            batch.add({"project": "B", "start_time": "2024-01-02 09:00:00", "duration_seconds": 60})
+        self.assertEqual(len(self.mismatches), 1)
+        self.assertEqual(self.live.report()['total'][()]['seconds'], 120)
+
+
+class TestCsvImporter(unittest.TestCase):
+    """Tests for the streaming chunked CSV importer (no UI required)"""
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.csv_file = os.path.join(self.test_dir, 'import.csv')
+    
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_chunks_normalize_and_report_errors(self):
+        """Rows are normalized chunk by chunk and bad rows are reported by line"""
+        with open(self.csv_file, 'w', newline='', encoding='utf-8-sig') as f:
+            f.write("project,memo,start_time,stop_time,duration_seconds,invoiced\n")
+            f.write('A,"two\nlines",2024-01-01T09:00:00,2024-01-01 10:30:00,,yes\n')
+            f.write("B,,2024-01-02 09:00,,600,\n")
+            f.write(",no project,2024-01-03 09:00:00,,60,No\n")
+            f.write("C,,not a date,,60,No\n")
+            f.write("D,,2024-01-04 10:00:00,2024-01-04 09:00:00,,No\n")
+        
+        importer = CsvImporter(self.csv_file)
+        importer.CHUNK_ROWS = 2
+        progress = []
+        importer.run(progress=lambda done, total: progress.append((done, total)))
+        
+        self.assertEqual(len(progress), 3)
+        self.assertEqual(importer.bytes_read, importer.total_bytes)
+        self.assertEqual(importer.rows_read, 5)
+        first, second = importer.entries
+        self.assertEqual(first['memo'], "two\nlines")
+        self.assertEqual(first['start_time'], "2024-01-01 09:00:00")
+        self.assertEqual(first['duration_seconds'], 5400)
+        self.assertEqual(first['invoiced'], "Yes")
+        self.assertEqual(second['start_time'], "2024-01-02 09:00:00")
+        self.assertEqual((second['duration'], second['invoiced'], second['project_id']), ("00:10:00", "No", None))
+        self.assertEqual([line for line, _ in importer.errors], [5, 6, 7])
+        self.assertEqual(importer.error_count, 3)
+    
+    def test_offset_timestamps_become_local_time(self):
+        """Timestamps with a UTC offset are stored as local time, also next to plain ones"""
+        with open(self.csv_file, 'w', newline='', encoding='utf-8') as f:
+            f.write("project,start_time,stop_time\n")
+            f.write("Mixed,2024-03-01T09:00:00+00:00,2024-03-01 23:00:00\n")
+            f.write("Offsets,2024-03-01T09:00:00Z,2024-03-01T12:30:00+02:00\n")
+        
+        importer = CsvImporter(self.csv_file).run()
+        self.assertEqual(importer.errors, [])
+        local = lambda value: datetime.fromisoformat(value).astimezone().strftime("%Y-%m-%d %H:%M:%S")
+        mixed, offsets = importer.entries
+        self.assertEqual((mixed['start_time'], mixed['stop_time']), (local("2024-03-01T09:00:00+00:00"), "2024-03-01 23:00:00"))
+        self.assertEqual((offsets['start_time'], offsets['stop_time']),
+                         (local("2024-03-01T09:00:00+00:00"), local("2024-03-01T12:30:00+02:00")))
+        self.assertEqual(offsets['duration_seconds'], 5400)
+    
+    def test_imported_ids_are_replaced(self):
+        """Ids and seqs in the file are ignored so they cannot clash with stored entries"""
+        store = EntryStore(os.path.join(self.test_dir, 'work_hours.json'))
+        with store.begin() as batch:
+            existing_id = batch.add({"project": "Kept", "start_time": "2024-01-01 09:00:00", "duration_seconds": 60})
+        with open(self.csv_file, 'w', newline='', encoding='utf-8') as f:
+            f.write("id,project,start_time,duration_seconds,seq\n")
+            f.write(f"{existing_id},Imported,2024-02-01 09:00:00,600,99999999999999999\n")
+        
+        importer = CsvImporter(self.csv_file, existing=store.load()).run()
+        self.assertEqual(len(importer.entries), 1)
+        self.assertNotEqual(importer.entries[0]['id'], existing_id)
+        self.assertNotIn('seq', importer.entries[0])
+        with store.begin() as batch:
+            batch.add_many(importer.entries)
+        
+        self.assertEqual(len({entry['id'] for entry in store.load()}), 2)
+        self.assertEqual(store.get(existing_id)['project'], "Kept")
+        self.assertLess(store.sequence, 99999999999999999)
+    
+    def test_reimport_is_idempotent(self):
+        """Known rows are skipped and clashing rows are reported as conflicts"""
+        existing = [{"project": "A", "start_time": "2024-01-01 09:00:00", "stop_time": "2024-01-01 10:00:00", "duration_seconds": 3600}]
+        with open(self.csv_file, 'w', newline='', encoding='utf-8') as f:
+            f.write("project,start_time,stop_time,duration_seconds\n")
+            f.write("A,2024-01-01 09:00:00,2024-01-01 10:00:00,3600\n")
+            f.write("A,2024-01-01 09:00:00,2024-01-01 11:00:00,7200\n")
+            f.write("B,2024-01-02 09:00:00,2024-01-02 09:30:00,1800\n")
+            f.write("B,2024-01-02 09:00:00,2024-01-02 09:30:00,1800\n")
+        
+        importer = CsvImporter(self.csv_file, existing=existing).run()
+        self.assertEqual([entry['project'] for entry in importer.entries], ["B"])
+        self.assertEqual(importer.skipped_count, 2)
+        self.assertEqual(importer.conflict_count, 1)
+        self.assertEqual(importer.conflicts[0][0], 3)
+        
+        # Importing again on top of the result adds nothing
+        again = CsvImporter(self.csv_file, existing=existing + importer.entries).run()
+        self.assertEqual((len(again.entries), again.skipped_count, again.conflict_count), (0, 3, 1))
+    
+    def test_parallel_ranges_match_sequential(self):
+        """Ranges split on record boundaries parse to the same result in order"""
+        with open(self.csv_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['project', 'memo', 'start_time', 'duration_seconds'])
+            for i in range(300):
+                memo = 'quoted "text"\nover\nlines' if i % 7 == 0 else f"row {i}"
+                start = "bad" if i % 50 == 3 else f"2024-01-01 {i % 24:02d}:{i % 60:02d}:{i % 17:02d}"
+                writer.writerow([f"P{i % 5}", memo, start, i])
+        
+        sequential = CsvImporter(self.csv_file).run()
+        split = CsvImporter(self.csv_file)
+        split.SCAN_BLOCK_BYTES = 256
+        fieldnames, ranges = split.split_ranges(6)
+        self.assertEqual(len(ranges), 6)
+        for start, end, lines_before in ranges:
+            split.add_parsed(*main._parse_csv_range(self.csv_file, start, end, fieldnames, lines_before))
+        
+        without_ids = lambda entries: [{k: v for k, v in entry.items() if k != 'id'} for entry in entries]
+        self.assertEqual(without_ids(split.entries), without_ids(sequential.entries))
+        self.assertEqual(split.errors, sequential.errors)
+        self.assertEqual(split.rows_read, 300)
+        
+        with patch.object(CsvImporter, 'PARALLEL_MIN_BYTES', 0):
+            pooled = CsvImporter(self.csv_file).run(workers=2)
+        self.assertEqual(without_ids(pooled.entries), without_ids(sequential.entries))
+    
+    def test_cancelled_parallel_import_stops_workers(self):
+        """Cancelling stops the pool's processes instead of leaving them parsing"""
+        with open(self.csv_file, 'w', newline='', encoding='utf-8') as f:
+            f.write("project,start_time,duration_seconds\n")
+            for i in range(20000):
+                f.write(f"P{i % 5},2024-01-01 09:{i % 60:02d}:00,{i}\n")
+        
+        def cancel(done, total):
+            raise RuntimeError("cancelled")
+        
+        with patch.object(CsvImporter, 'PARALLEL_MIN_BYTES', 0):
+            with self.assertRaises(RuntimeError):
+                CsvImporter(self.csv_file).run(progress=cancel, workers=2)
+        deadline = time.time() + 10
+        while multiprocessing.active_children() and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(multiprocessing.active_children(), [])
+        
+        # A worker whose pool was cancelled gives up before its next chunk
+        importer = CsvImporter(self.csv_file)
+        fieldnames, [(start, end, lines_before)] = importer.split_ranges(1)
+        cancelled = multiprocessing.Event()
+        main._init_import_worker(cancelled)
+        try:
+            self.assertEqual(main._parse_csv_range(self.csv_file, start, end, fieldnames, lines_before)[0], 20000)
+            cancelled.set()
+            with self.assertRaises(RuntimeError):
+                main._parse_csv_range(self.csv_file, start, end, fieldnames, lines_before)
+        finally:
+            main._init_import_worker(None)
+    
+    def test_worker_count_is_capped(self):
+        """Automatic worker counts stop at MAX_WORKERS; configured ones at the CPU count"""
+        with patch('os.cpu_count', return_value=32):
+            self.assertEqual(CsvImporter.worker_count(), CsvImporter.MAX_WORKERS)
+            self.assertEqual(CsvImporter.worker_count(8), 8)
+            self.assertEqual(CsvImporter.worker_count("bad"), CsvImporter.MAX_WORKERS)
+        with patch('os.cpu_count', return_value=2):
+            self.assertEqual(CsvImporter.worker_count(), 2)
+            self.assertEqual(CsvImporter.worker_count(16), 2)
+        with patch('os.cpu_count', return_value=None):
+            self.assertEqual(CsvImporter.worker_count(), 1)
+
+
+class TestEntryExporter(unittest.TestCase):
+    """Tests for the streaming CSV / JSON Lines exporter (no UI required)"""
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.entries = [
+            {'id': 'a1', 'project': 'Alpha', 'memo': 'line one\nline two', 'start_time': '2024-01-01 09:00:00',
+             'stop_time': '2024-01-01 10:00:00', 'duration_seconds': 3600, 'invoiced': True, 'project_id': None},
+            {'id': 'b2', 'project': 'Beta', 'memo': 'Zürich', 'start_time': '2024-01-02 09:00:00',
+             'duration_seconds': 60}
+        ]
+    
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_csv_projects_fields_and_round_trips(self):
+        """CSV export drops unknown keys, blanks missing ones and re-imports cleanly"""
+        filename = os.path.join(self.test_dir, 'export.csv')
+        exporter = EntryExporter(filename)
+        progress = []
+        count = exporter.write(iter(self.entries), len(self.entries), progress=lambda done, total: progress.append((done, total)))
+        
+        self.assertEqual(count, 2)
+        self.assertEqual(progress[-1], (2, 2))
+        self.assertFalse(os.path.exists(filename + '.tmp'))
+        with open(filename, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(list(rows[0].keys()), EntryExporter.FIELDS)
+        self.assertEqual(rows[1]['stop_time'], '')
+        
+        imported = CsvImporter(filename, existing=self.entries).run()
+        self.assertEqual(imported.skipped_count, 2)
+    
+    def test_jsonl_keeps_keys_and_cancel_keeps_old_file(self):
+        """JSON Lines keeps every key; an aborted export leaves the target alone"""
+        filename = os.path.join(self.test_dir, 'export.jsonl')
+        exporter = EntryExporter(filename)
+        self.assertEqual(exporter.format, 'jsonl')
+        exporter.write(self.entries)
+        with open(filename, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(lines, self.entries)
+        
+        def cancel(done, total):
+            raise main.TaskCancelled()
+        
+        exporter.PROGRESS_EVERY = 1
+        with self.assertRaises(main.TaskCancelled):
+            exporter.write(iter([{'project': 'Gamma'}] * 5), progress=cancel)
+        with open(filename, encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 2)
+        self.assertFalse(os.path.exists(filename + '.tmp'))
+        
+        projected = EntryExporter(filename, fields=['project', 'id'])
+        projected.write(self.entries)
+        with open(filename, encoding='utf-8') as f:
+            self.assertEqual(json.loads(f.readline()), {'project': 'Alpha', 'id': 'a1'})
+
+
+class TestColumnarExporter(unittest.TestCase):
+    """Tests for the typed columnar analytics export (no UI required)"""
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_ttcol_round_trip_in_row_groups(self):
+        """Columns come back typed, with nulls, across several row groups"""
+        entries = [
+            {'id': f'e{i}', 'project': 'Ünïcode' if i % 2 else 'Plain', 'memo': '' if i % 3 else None,
+             'start_time': f'2024-01-{i + 1:02d} 09:00:00', 'stop_time': '' if i == 4 else f'2024-01-{i + 1:02d} 10:00:00',
+             'duration_seconds': 3600 + i, 'invoiced': 'Yes' if i % 2 else 'No', 'project_id': None}
+            for i in range(5)
+        ]
+        filename = os.path.join(self.test_dir, 'export.ttcol')
+        exporter = ColumnarExporter(filename, fmt='ttcol')
+        exporter.ROW_GROUP_SIZE = 2
+        progress = []
+        count = exporter.write(iter(entries), 5, progress=lambda done, total: progress.append(done))
+        
+        self.assertEqual(count, 5)
+        self.assertEqual(exporter.row_groups, 3)
+        self.assertEqual(progress, [2, 4, 5])
+        columns = ColumnarExporter.read_ttcol(filename)
+        self.assertEqual(columns['id'], [entry['id'] for entry in entries])
+        self.assertEqual(columns['project'][1], 'Ünïcode')
+        self.assertEqual(columns['memo'][:2], [None, ''])
+        self.assertEqual(columns['start_time'][0], int((datetime(2024, 1, 1, 9) - datetime(1970, 1, 1)).total_seconds()))
+        self.assertEqual(columns['stop_time'][0] - columns['start_time'][0], 3600)
+        self.assertIsNone(columns['stop_time'][4])
+        self.assertEqual(columns['duration_seconds'][4], 3604)
+        self.assertEqual(columns['invoiced'][:2], [False, True])
+        self.assertEqual(columns['project_id'], [None] * 5)
+        
+        with open(exporter.schema_file, encoding='utf-8') as f:
+            schema = json.load(f)
+        self.assertEqual(schema['rows'], 5)
+        self.assertEqual([column['name'] for column in schema['columns']], [name for name, _ in ColumnarExporter.COLUMNS])
+
+
+    def test_gross_duration_is_coerced(self):
+        """Unreadable gross durations become nulls instead of aborting the export"""
+        entries = [
+            {'project': 'A', 'start_time': '2024-01-01 09:00:00', 'duration_seconds': 60, 'gross_duration_seconds': '90'},
+            {'project': 'A', 'start_time': '2024-01-01 10:00:00', 'duration_seconds': 60, 'gross_duration_seconds': 'n/a'},
+            {'project': 'A', 'start_time': '2024-01-01 11:00:00', 'duration_seconds': 60}
+        ]
+        self.assertEqual(ColumnarExporter.columns_for(entries)['gross_duration_seconds'], [90, None, None])
+    
+    def test_parquet_without_pyarrow_is_refused(self):
+        """A .parquet or .arrow target is never silently written under another name"""
+        with patch.object(main, 'pa', None):
+            for name in ('export.parquet', 'export.arrow'):
+                with self.assertRaises(RuntimeError):
+                    ColumnarExporter(os.path.join(self.test_dir, name))
+            self.assertEqual(ColumnarExporter(os.path.join(self.test_dir, 'export.ttcol')).format, 'ttcol')
+        self.assertEqual(os.listdir(self.test_dir), [])
+
+
+class TestIncrementalExport(unittest.TestCase):
+    """Tests for mutation sequence numbers and high-water mark exports (no UI required)"""
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.store = EntryStore(os.path.join(self.test_dir, 'work_hours.json'))
+        self.export = IncrementalExport(self.store, os.path.join(self.test_dir, 'export_marks.json'))
+    
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def _run(self, target, name):
+        filename = os.path.join(self.test_dir, name)
+        count = self.export.run(target, filename)
+        with open(filename, newline='', encoding='utf-8') as f:
+            return count, [row['id'] for row in csv.DictReader(f)]
+    
+    def test_only_changes_since_mark_are_exported(self):
+        """Each target gets the entries added or changed since its own last run"""
+        with self.store.begin() as batch:
+            first, second = batch.add_many([
+                {'project': 'A', 'start_time': '2024-01-01 09:00:00', 'duration_seconds': 60},
+                {'project': 'B', 'start_time': '2024-01-02 09:00:00', 'duration_seconds': 60}
+            ])
+        self.assertEqual(self._run('billing', 'full.csv'), (2, [first, second]))
+        self.assertEqual(self.export.pending('billing')[0], [])
+        
+        with self.store.begin() as batch:
+            batch.update(first, {'invoiced': 'No'})     # unchanged: keeps its seq
+            batch.update(second, {'memo': 'edited'})
+            third = batch.add({'project': 'C', 'start_time': '2024-01-03 09:00:00', 'duration_seconds': 60})
+        count, ids = self._run('billing', 'delta.csv')
+        self.assertEqual((count, sorted(ids)), (2, sorted([second, third])))
+        self.assertEqual(self._run('warehouse', 'other.csv')[0], 3)
+        
+        # Replacing the data stamps only entries that differ; sequences survive reloads
+        data = [dict(entry) for entry in self.store.load()]
+        data[0]['memo'] = 'restored'
+        self.store.replace_all(data)
+        reopened = IncrementalExport(EntryStore(self.store.data_file), self.export.marks_file)
+        self.assertEqual([entry['id'] for entry in reopened.pending('billing')[0]], [first])
+        
+        self.export.reset('billing')
+        self.assertEqual(len(self.export.pending('billing')[0]), 3)
+        self.assertEqual(sorted(self.export.marks()), ['warehouse'])
+    
+    def test_deletions_are_exported_as_tombstones(self):
+        """Entries deleted since a target's mark are sent as deleted rows, then pruned"""
+        with self.store.begin() as batch:
+            first, second, third = batch.add_many([
+                {'project': 'A', 'start_time': '2024-01-01 09:00:00', 'duration_seconds': 60},
+                {'project': 'B', 'start_time': '2024-01-02 09:00:00', 'duration_seconds': 60},
+                {'project': 'C', 'start_time': '2024-01-03 09:00:00', 'duration_seconds': 60}
+            ])
+        self._run('billing', 'full.csv')
+        self._run('warehouse', 'full2.csv')
+        
+        with self.store.begin() as batch:
+            batch.delete(first)
+            batch.update(second, {'memo': 'edited'})
+        # The tombstone carries the sequence the store gave the deletion
+        self.assertEqual(self.export.tombstones()[0]['seq'], self.store.sequence)
+        self.assertGreater(self.store.sequence, self.store.get(second)['seq'])
+        # Deleting through a full replace is reported too
+        self.store.replace_all([entry for entry in self.store.load() if entry['id'] != third])
+        
+        filename = os.path.join(self.test_dir, 'delta.csv')
+        self.assertEqual(self.export.run('billing', filename), 3)
+        with open(filename, newline='', encoding='utf-8') as f:
+            rows = {row['id']: row for row in csv.DictReader(f)}
+        self.assertEqual(rows[first]['deleted'], 'Yes')
+        self.assertEqual(rows[third]['deleted'], 'Yes')
+        self.assertEqual((rows[second]['deleted'], rows[second]['memo']), ('No', 'edited'))
+        self.assertEqual(self.export.pending('billing')[0], [])
+        
+        # Kept until every target has them
+        self.assertEqual(len(self.export.tombstones()), 2)
+        self.assertEqual(self._run('warehouse', 'delta2.csv')[0], 3)
+        self.assertEqual(self.export.tombstones(), [])
+        
+        # With no export target there is nothing to record
+        self.export.reset('billing')
+        self.export.reset('warehouse')
+        with self.store.begin() as batch:
+            batch.delete(second)
+        self.assertEqual(self.export.tombstones(), [])
+
+
+class TestInvoiceBuilder(unittest.TestCase):
+    """Tests for batch invoice generation (no UI required)"""
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.store = EntryStore(os.path.join(self.test_dir, 'work_hours.json'))
+        with self.store.begin() as batch:
+            batch.add_many([
+                {'project': 'Alpha', 'memo': 'Design <draft>', 'start_time': '2024-03-01 09:00:00', 'duration_seconds': 3000},
+                {'project': 'Alpha', 'start_time': '2024-03-02 09:00:00', 'duration_seconds': 600},
+                {'project': 'Beta', 'start_time': '2024-03-03 09:00:00', 'duration_seconds': 5400, 'project_id': 'b'},
+                {'project': 'Beta', 'start_time': '2024-03-04 09:00:00', 'duration_seconds': 3600, 'invoiced': 'Yes'},
+                {'project': 'Alpha', 'start_time': '2024-04-01 09:00:00', 'duration_seconds': 3600},
+            ])
+        self.rates = {'a': (100.0, 'EUR'), 'b': (80.0, 'USD')}
+        self.project_ids = {'Alpha': 'a'}
+    
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_rounding_modes(self):
+        """Durations are rounded to the billing increment per mode"""
+        self.assertEqual(InvoiceBuilder({}, {}, 15, 'up').billed_seconds(60), 900)
+        self.assertEqual(InvoiceBuilder({}, {}, 15, 'down').billed_seconds(1700), 900)
+        self.assertEqual(InvoiceBuilder({}, {}, 15, 'nearest').billed_seconds(1350), 1800)
+        self.assertEqual(InvoiceBuilder({}, {}, 0).billed_seconds(61), 61)
+        with self.assertRaises(ValueError):
+            InvoiceBuilder({}, {}, 15, 'sideways')
+    
+    def test_build_write_and_mark(self):
+        """Uninvoiced entries in range become one invoice per project and are marked together"""
+        builder = InvoiceBuilder(self.rates, self.project_ids, 15, 'up')
+        invoices = builder.build(self.store.iter_entries(), '2024-03-01', '2024-03-31', issued=date(2024, 4, 2))
+        
+        self.assertEqual([invoice['project'] for invoice in invoices], ['Alpha', 'Beta'])
+        alpha, beta = invoices
+        self.assertEqual((alpha['number'], beta['number']), ('INV-2024-0001', 'INV-2024-0002'))
+        self.assertEqual([line['billed_seconds'] for line in alpha['lines']], [3600, 900])
+        self.assertEqual(str(alpha['total']), '125.00')
+        self.assertEqual((str(beta['total']), beta['currency'], len(beta['lines'])), ('120.00', 'USD', 1))
+        
+        written = builder.write(invoices, self.test_dir, ['csv', 'html', 'txt'])
+        self.assertEqual(len(written), 6)
+        with open(os.path.join(self.test_dir, 'INV-2024-0001.html'), encoding='utf-8') as f:
+            self.assertIn('Design &lt;draft&gt;', f.read())
+        with open(os.path.join(self.test_dir, 'INV-2024-0001.csv'), newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[-1][-1], '125.00')
+        self.assertEqual(rows[-1][4], '1.25')       # decimal hours, like the line rows
+        
+        notifications = []
+        self.store.subscribe(notifications.append)
+        with self.store.begin() as batch:
+            builder.mark(batch, invoices)
+        self.assertEqual(len(notifications), 1)
+        self.assertEqual(len(notifications[0].updated), 3)
+        numbers = sorted(entry.get('invoice_number') or '' for entry in self.store.load())
+        self.assertEqual(numbers, ['', '', 'INV-2024-0001', 'INV-2024-0001', 'INV-2024-0002'])
+        
+        # Invoiced entries are not billed again and numbering continues
+        again = builder.build(self.store.iter_entries(), None, None, issued=date(2024, 4, 2))
+        self.assertEqual([(invoice['number'], len(invoice['lines'])) for invoice in again], [('INV-2024-0003', 1)])
+
+
+    def test_projects_without_rate_are_skipped(self):
+        """No 0.00 invoices: unrated projects are listed instead of billed"""
+        with self.store.begin() as batch:
+            batch.add({'project': 'Gamma', 'start_time': '2024-03-05 09:00:00', 'duration_seconds': 1800})
+        builder = InvoiceBuilder(self.rates, self.project_ids)
+        invoices = builder.build(self.store.iter_entries(), '2024-03-01', '2024-03-31', issued=date(2024, 4, 2))
+        self.assertEqual([invoice['project'] for invoice in invoices], ['Alpha', 'Beta'])
+        self.assertEqual(builder.unrated, ['Gamma'])
+    
+    def test_numbers_are_never_reused(self):
+        """Un-invoiced or deleted entries do not free their numbers, and documents are not overwritten"""
+        counter_file = os.path.join(self.test_dir, 'invoice_counter.json')
+        out_dir = os.path.join(self.test_dir, 'invoices')
+        builder = InvoiceBuilder(self.rates, self.project_ids, counter_file=counter_file)
+        invoices = builder.build(self.store.iter_entries(), '2024-03-01', '2024-03-31', issued=date(2024, 4, 2))
+        builder.write(invoices, out_dir, ['csv'])
+        with self.store.begin() as batch:
+            builder.mark(batch, invoices)
+        builder.record(invoices)
+        
+        # Toggle every entry back to uninvoiced and delete one of them
+        with self.store.begin() as batch:
+            for entry in self.store.load():
+                batch.update(entry['id'], {'invoiced': 'No', 'invoice_number': None})
+            batch.delete(self.store.load()[0]['id'])
+        again = builder.build(self.store.iter_entries(), '2024-03-01', '2024-03-31', issued=date(2024, 4, 2))
+        self.assertEqual([invoice['number'] for invoice in again], ['INV-2024-0003', 'INV-2024-0004'])
+        self.assertEqual(InvoiceBuilder(self.rates, self.project_ids, counter_file=counter_file).issued(), {'INV-2024': 2})
+        
+        # An existing document is never overwritten, and nothing partial is left
+        again[1]['number'] = 'INV-2024-0001'
+        with open(os.path.join(out_dir, 'INV-2024-0001.csv'), encoding='utf-8') as f:
+            original = f.read()
+        with self.assertRaises(FileExistsError):
+            builder.write(again, out_dir, ['csv'])
+        self.assertEqual(sorted(os.listdir(out_dir)), ['INV-2024-0001.csv', 'INV-2024-0002.csv'])
+        with open(os.path.join(out_dir, 'INV-2024-0001.csv'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), original)
+
+
+class TestReportExporter(unittest.TestCase):
+    """Tests for exporting computed report results (no UI required)"""
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        entries = [
+            {'project': 'Alpha', 'start_time': '2024-01-01 09:00:00', 'duration_seconds': 7200, 'invoiced': 'Yes'},
+            {'project': 'Alpha', 'start_time': '2024-01-09 09:00:00', 'duration_seconds': 3600, 'invoiced': 'No'},
+            {'project': 'Beta', 'start_time': '2024-02-01 09:00:00', 'duration_seconds': 1800, 'invoiced': 'No'},
+        ]
+        facts = list(ReportEngine.entry_facts(entries))
+        rates, project_ids = {'a': (100.0, 'EUR')}, {'Alpha': 'a'}
+        self.report = ReportEngine.aggregate(facts, TimeTrackerApp.REPORT_GROUPINGS, measures=IncrementalReport.MEASURES,
+                                             rates=rates, project_ids=project_ids)
+        self.report['totals'] = self.report['total'][()]
+        self.series = ReportEngine.time_series(facts, 'week', date(2024, 1, 1), date(2024, 1, 14),
+                                               measures=('sum', 'count', 'revenue'), rates=rates, project_ids=project_ids)
+        self.statistics = SessionStatistics.from_entries(entries)
+    
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def _read(self, archive, name):
+        with archive.open(name) as member:
+            return list(csv.reader(io.TextIOWrapper(member, encoding='utf-8', newline='')))
+    
+    def test_zip_contains_every_computed_sheet(self):
+        """Each sheet serializes the computed results without recomputing them"""
+        filename = os.path.join(self.test_dir, 'report.zip')
+        exporter = ReportExporter(self.report, self.series, 'week', self.statistics)
+        sheets = exporter.write(filename)
+        self.assertEqual(sheets, ['summary.csv', 'invoicing.csv', 'revenue.csv', 'time_series_week.csv', 'statistics.csv'])
+        
+        with zipfile.ZipFile(filename) as archive:
+            summary = self._read(archive, 'summary.csv')
+            self.assertEqual(summary[0], ReportExporter.SUMMARY_FIELDS)
+            self.assertEqual(summary[1], ['Alpha', '3.00', '10800', '2', 'EUR', '300.00', '200.00', '100.00'])
+            self.assertEqual(summary[2], ['Beta', '0.50', '1800', '1', '', '', '', ''])
+            
+            invoicing = self._read(archive, 'invoicing.csv')
+            self.assertEqual(invoicing[-1][:4], ['All projects', '12600', '7200', '5400'])
+            
+            revenue = self._read(archive, 'revenue.csv')
+            self.assertIn(['month', '2024-01', 'EUR', '300.00', '200.00', '100.00'], revenue)
+            
+            series = self._read(archive, 'time_series_week.csv')
+            self.assertEqual([row[0] for row in series[1:]], ['2024-W01', '2024-W02'])
+            self.assertEqual(series[2][2:], ['3600', '1.00', '1', 'EUR', '100.00'])
+            
+            statistics = self._read(archive, 'statistics.csv')
+            self.assertIn(['summary', 'sessions', '3'], statistics)
+    
+    def test_csv_target_writes_summary_only(self):
+        """A .csv target gets the per-project summary in the original report format"""
+        filename = os.path.join(self.test_dir, 'report.csv')
+        self.assertEqual(ReportExporter(self.report).write(filename), ['summary.csv'])
+        with open(filename, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row['project'] for row in rows], ['Alpha', 'Beta'])
+        self.assertFalse(os.path.exists(filename + '.tmp'))
+
+
+class TestTimerSession(unittest.TestCase):
+    """Tests for the monotonic timer engine (no UI required)"""
+    
+    def setUp(self):
+        self.now_ns = 5 * 10 ** 9
+        self.wall = datetime(2024, 3, 31, 1, 59, 0)
+        self.session = TimerSession(clock=lambda: self.now_ns, wall_clock=lambda: self.wall)
+    
+    def advance(self, seconds):
+        self.now_ns += int(seconds * 10 ** 9)
+    
+    def test_pauses_lose_no_fractions_and_ignore_wall_clock(self):
+        """Sub-second segments add up exactly, whatever the wall clock does"""
+        self.session.start()
+        self.assertEqual((self.session.start_time, self.session.elapsed_seconds), (self.wall, 0))
+        for _ in range(4):
+            self.advance(0.6)
+            self.session.pause()
+            self.advance(30)
+            self.wall -= timedelta(hours=1)   # e.g. a DST change or clock correction
+            self.session.resume()
+        self.assertTrue(self.session.is_running)
+        self.assertFalse(self.session.is_paused)
+        self.assertEqual(self.session.elapsed_seconds, 2)
+        self.assertEqual(self.session.last_start, self.wall)
+        self.advance(0.7)
+        self.assertEqual(self.session.seconds(), 3)
+        self.assertEqual(self.session.stop(), 3)       # 3.1 s, rounded once
+        self.assertFalse(self.session.is_running)
+        self.session.reset()
+        self.assertIsNone(self.session.start_time)
+    
+    def test_next_tick_aligns_to_whole_seconds(self):
+        """Ticks are scheduled for just after the next whole elapsed second"""
+        self.session.start()
+        self.assertEqual(self.session.next_tick_ms(), 1001)
+        self.advance(1.2504)
+        self.assertEqual(self.session.next_tick_ms(), 750)
+        self.assertEqual(self.session.next_tick_ms(unit_seconds=60), 58750)
+        self.session.pause()
+        self.advance(100)
+        self.assertEqual(self.session.next_tick_ms(), 750)
+
+
+class TestIdleDetector(unittest.TestCase):
+    """Tests for idle detection and idle cutting (no UI required)"""
+    
+    def setUp(self):
+        self.now_ns = 0
+        self.os_idle = None
+    
+    def advance(self, seconds):
+        self.now_ns += int(seconds * 10 ** 9)
+    
+    def detector(self, provider=None):
+        return IdleDetector(300, clock=lambda: self.now_ns, provider=provider)
+    
+    def test_in_app_activity_moves_deadline(self):
+        """Activity only moves the deadline; idleness is found at the deadline and ended by input"""
+        self.os_idle = 10 ** 6             # no input elsewhere on the system
+        detector = self.detector(provider=lambda: self.os_idle)
+        self.assertEqual(detector.check(), (None, 300001))
+        self.advance(120)
+        detector.activity()
+        self.advance(299)
+        # Woken at the old deadline: the new one is 120 s later than planned
+        self.assertEqual(detector.check(), (None, 1001))
+        self.advance(1)
+        self.assertEqual(detector.check(), (None, IdleDetector.POLL_IDLE_MS))
+        self.assertTrue(detector.is_idle)
+        self.assertEqual(detector.idle_since_ns, 120 * 10 ** 9)
+        self.advance(900)
+        self.assertEqual(detector.activity(), (120 * 10 ** 9, 1320 * 10 ** 9))
+        self.assertFalse(detector.is_idle)
+        self.assertIsNone(detector.activity())
+        self.assertFalse(IdleDetector(0, provider=lambda: 0).enabled)
+        # Without system idle time there is no detection at all
+        self.assertFalse(IdleDetector(300).enabled)
+    
+    def test_system_provider_counts_other_applications(self):
+        """OS idle time keeps the user active and reports the return while polled"""
+        detector = self.detector(provider=lambda: self.os_idle)
+        self.advance(400)
+        self.os_idle = 30                  # typing in another application
+        self.assertEqual(detector.check(), (None, 270001))
+        self.advance(600)
+        self.os_idle = 630
+        self.assertEqual(detector.check(), (None, IdleDetector.POLL_IDLE_MS))
+        self.assertEqual(detector.idle_since_ns, 370 * 10 ** 9)
+        self.advance(5)
+        self.os_idle = 2                   # back, 2 s ago
+        span, delay = detector.check()
+        self.assertEqual(span, (370 * 10 ** 9, 1003 * 10 ** 9))
+        self.assertEqual(delay, 298001)
+        self.assertFalse(detector.is_idle)
+        
+        # A reading taken earlier (on a worker thread) is checked as of its time
+        reading = detector.read()
+        self.advance(400)
+        self.assertEqual(reading, (1005 * 10 ** 9, 2 * 10 ** 9))
+        self.assertEqual(detector.check(reading), (None, 298001))
+        
+        # A failing provider is reported and changes nothing until it recovers
+        errors = []
+        failing = [True]
+        
+        def flaky():
+            if failing[0]:
+                raise OSError("unavailable")
+            return self.os_idle
+        detector = IdleDetector(300, clock=lambda: self.now_ns, provider=flaky, on_error=errors.append)
+        self.assertEqual(detector.check(), (None, 300001))
+        self.assertEqual(errors, ["System idle time unavailable: unavailable"])
+        detector.idle_since_ns = self.now_ns - 600 * 10 ** 9
+        self.advance(5)
+        self.assertEqual(detector.check(), (None, IdleDetector.POLL_IDLE_MS))
+        self.assertTrue(detector.is_idle)
+        failing[0] = False
+        self.os_idle = 1
+        self.assertEqual(detector.check()[0], (self.now_ns - 605 * 10 ** 9, self.now_ns - 10 ** 9))
+    
+    def test_idle_gap_is_cut_from_running_segment(self):
+        """Net time excludes the idle gap; gross time still includes it"""
+        session = TimerSession(clock=lambda: self.now_ns, wall_clock=lambda: datetime(2024, 1, 1, 9, 0, 0))
+        session.start()
+        self.advance(600)
+        session.pause()
+        self.advance(60)
+        session.resume()
+        self.advance(1200)
+        # Idle since 5 minutes before the pause, back now: only the running part is cut
+        self.assertEqual(session.cut_idle(300 * 10 ** 9, self.now_ns), 1200 * 10 ** 9)
+        self.assertEqual(session.seconds(), 600)
+        self.advance(120.4)
+        self.assertEqual(session.stop(), 720)
+        self.assertEqual(session.gross_seconds(), 1920)
+        self.assertEqual(session.cut_idle(0, self.now_ns), 0)
+        
+        manager = TimerManager(clock=lambda: self.now_ns, wall_clock=lambda: datetime(2024, 1, 1, 9, 0, 0))
+        timer_id = manager.start("On-call")
+        self.advance(100)
+        self.assertEqual(manager.cut_idle(self.now_ns - 40 * 10 ** 9, self.now_ns), 40 * 10 ** 9)
+        record = manager.stop(timer_id)
+        self.assertEqual((record['duration_seconds'], record['gross_duration_seconds']), (60, 100))
+
+
+class TestTimerManager(unittest.TestCase):
+    """Tests for concurrent timers (no UI required)"""
+    
+    def setUp(self):
+        self.now_ns = 0
+        self.manager = TimerManager(clock=lambda: self.now_ns,
+                                    wall_clock=lambda: datetime(2024, 5, 6, 9, 0, 0))
+    
+    def advance(self, seconds):
+        self.now_ns += int(seconds * 10 ** 9)
+    
+    def test_independent_sessions_and_records(self):
+        """Each timer keeps its own time and stops into its own entry record"""
+        billable = self.manager.start("Client A", "PRJ-1", "Feature work")
+        self.advance(600)
+        on_call = self.manager.start("On-call")
+        self.advance(300)
+        self.assertTrue(self.manager.toggle_pause(billable))
+        self.advance(900)
+        self.assertFalse(self.manager.toggle_pause(billable))
+        self.advance(60.4)
+        self.assertEqual(self.manager.running(), [billable, on_call])
+        
+        record = self.manager.stop(billable)
+        self.assertEqual(record['project'], "Client A")
+        self.assertEqual(record['project_id'], "PRJ-1")
+        self.assertEqual(record['memo'], "Feature work")
+        self.assertEqual(record['duration_seconds'], 960)
+        self.assertEqual(record['duration'], "00:16:00")
+        self.assertEqual(record['start_time'], "2024-05-06 09:00:00")
+        self.assertEqual(record['invoiced'], "No")
+        self.assertNotIn(billable, self.manager)
+        self.assertEqual(self.manager.stop(on_call)['duration_seconds'], 1260)
+        self.assertEqual(len(self.manager), 0)
+    
+    def test_next_tick_is_soonest_running_timer(self):
+        """One tick serves every timer: the delay is the minimum over running ones"""
+        self.assertIsNone(self.manager.next_tick_ms())
+        first = self.manager.start("A")
+        self.advance(0.25)
+        second = self.manager.start("B")
+        self.advance(0.5)
+        # A is 0.75 s in, B 0.5 s
+        self.assertEqual(self.manager.next_tick_ms(), 251)
+        self.manager.toggle_pause(first)
+        self.assertEqual(self.manager.next_tick_ms(), 501)
+        self.assertEqual(self.manager.next_tick_ms(unit_seconds=60), 59501)
+        self.manager.toggle_pause(second)
+        self.assertIsNone(self.manager.next_tick_ms())
+    
+    def test_restore_numbers_past_first_id(self):
+        """Restored timers continue their checkpointed time under fresh IDs"""
+        manager = TimerManager(clock=lambda: self.now_ns, first_id=4)
+        running = manager.restore("On-call", None, "Pager", datetime(2024, 5, 6, 8, 0, 0), 120 * 10 ** 9,
+                                  idle_ns=30 * 10 ** 9)
+        paused = manager.restore("Client A", "PRJ-1", "", datetime(2024, 5, 6, 7, 0, 0), 60 * 10 ** 9, paused=True)
+        self.assertEqual((running, paused, manager.start("B")), (4, 5, 6))
+        self.advance(60)
+        self.assertEqual(manager.running(), [running, 6])
+        record = manager.stop(running)
+        self.assertEqual((record['duration_seconds'], record['gross_duration_seconds']), (180, 210))
+        self.assertEqual(record['start_time'], "2024-05-06 08:00:00")
+        self.assertEqual(manager.stop(paused)['duration_seconds'], 60)
+
+
+class TestSessionCheckpoint(unittest.TestCase):
+    """Tests for the crash-safe running session checkpoint (no UI required)"""
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.test_dir, 'session_checkpoint.bin')
+        self.state = {
+            'project': 'Client Ü', 'project_id': 'p1', 'memo': 'ä' * 1000,
+            'start_time': datetime(2024, 5, 1, 9, 0, 0), 'last_start': datetime(2024, 5, 1, 9, 30, 0),
+            'elapsed_ns': 1234567891234, 'idle_ns': 600 * 10 ** 9, 'paused': False
+        }
+    
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_round_trip_in_fixed_size_file(self):
+        """Checkpoints overwrite a fixed-size file in place and read back exactly"""
+        checkpoint = SessionCheckpoint(self.filename)
+        self.assertIsNone(checkpoint.read())
+        checkpoint.write(self.state)
+        checkpoint.write({**self.state, 'elapsed_ns': 1300000000000, 'paused': True})
+        self.assertEqual(os.path.getsize(self.filename), 2 * SessionCheckpoint.SLOT_SIZE)
+        
+        state = SessionCheckpoint(self.filename).read()
+        self.assertEqual((state['sequence'], state['elapsed_ns'], state['paused']), (2, 1300000000000, True))
+        self.assertEqual(state['idle_ns'], 600 * 10 ** 9)
+        self.assertEqual((state['project'], state['project_id']), ('Client Ü', 'p1'))
+        self.assertEqual((state['start_time'], state['last_start']), (self.state['start_time'], self.state['last_start']))
+        self.assertTrue(self.state['memo'].startswith(state['memo']))
+        self.assertEqual(len(state['memo'].encode('utf-8')), 740)
+        
+        # A later process continues the sequence in the other slot
+        resumed = SessionCheckpoint(self.filename)
+        resumed.write(self.state)
+        self.assertEqual(resumed.read()['sequence'], 3)
+        resumed.clear()
+        self.assertFalse(os.path.exists(self.filename))
+    
+    def test_torn_write_falls_back_to_previous_slot(self):
+        """A corrupted newest slot leaves the previous checkpoint readable"""
+        checkpoint = SessionCheckpoint(self.filename)
+        checkpoint.write(self.state)
+        checkpoint.write({**self.state, 'elapsed_ns': 99})
+        checkpoint._file.close()
+        with open(self.filename, 'r+b') as f:
+            f.seek(0)     # sequence 2 lives in slot 0
+            f.write(b'\xff' * 100)
+        self.assertEqual(SessionCheckpoint(self.filename).read()['elapsed_ns'], self.state['elapsed_ns'])
+    
+    def test_reads_version_1_slots_without_idle_time(self):
+        """Checkpoints written before idle time was stored still recover"""
+        checkpoint = SessionCheckpoint(self.filename)
+        record = SessionCheckpoint.HEADER_V1.pack(
+            SessionCheckpoint.MAGIC, 1, 0, 1, checkpoint._seconds(self.state['start_time']),
+            checkpoint._seconds(self.state['last_start']), checkpoint._seconds(self.state['start_time']), 5 * 10 ** 9)
+        record += b''.join(checkpoint._text(self.state.get(name), size) for name, size in SessionCheckpoint.TEXT_FIELDS)
+        record = record.ljust(SessionCheckpoint.SLOT_SIZE - 4, b'\0')
+        with open(self.filename, 'wb') as f:
+            f.write(record + struct.pack('<I', zlib.crc32(record)))
+        state = checkpoint.read()
+        self.assertEqual((state['elapsed_ns'], state['idle_ns'], state['project']), (5 * 10 ** 9, 0, 'Client Ü'))
+    
+    def test_restore_continues_timer(self):
+        """A restored session continues from the checkpointed elapsed time"""
+        now = [0]
+        session = TimerSession(clock=lambda: now[0])
+        session.restore(self.state['start_time'], 10 * 10 ** 9)
+        now[0] += 5 * 10 ** 9
+        self.assertEqual((session.seconds(), session.is_paused), (15, False))
+        session.restore(self.state['start_time'], 10 * 10 ** 9, paused=True)
+        now[0] += 5 * 10 ** 9
+        self.assertEqual((session.seconds(), session.is_paused), (10, True))
+        session.restore(self.state['start_time'], 10 * 10 ** 9, paused=True, idle_ns=self.state['idle_ns'])
+        self.assertEqual((session.stop(), session.gross_seconds()), (10, 610))
+        # Stopping again (e.g. to retry a failed save) changes nothing
+        self.assertEqual((session.stop(), session.gross_seconds()), (10, 610))
+
+
 if __name__ == '__main__':
     # Create test suite
     test_suite = unittest.TestSuite()
@@ -989,6 +2582,26 @@ if __name__ == '__main__':
     # Add integration tests
     test_suite.addTest(unittest.makeSuite(TestTimeTrackerIntegration))
     
+    # Add data layer tests
+    test_suite.addTest(unittest.makeSuite(TestEntryStore))
+    test_suite.addTest(unittest.makeSuite(TestCsvImporter))
+    test_suite.addTest(unittest.makeSuite(TestEntryExporter))
+    test_suite.addTest(unittest.makeSuite(TestColumnarExporter))
+    test_suite.addTest(unittest.makeSuite(TestIncrementalExport))
+    test_suite.addTest(unittest.makeSuite(TestInvoiceBuilder))
+    test_suite.addTest(unittest.makeSuite(TestReportExporter))
+    test_suite.addTest(unittest.makeSuite(TestTimerSession))
+    test_suite.addTest(unittest.makeSuite(TestTimerManager))
+    test_suite.addTest(unittest.makeSuite(TestIdleDetector))
+    test_suite.addTest(unittest.makeSuite(TestSessionCheckpoint))
+    test_suite.addTest(unittest.makeSuite(TestDailyRollup))
+    test_suite.addTest(unittest.makeSuite(TestReportEngine))
+    test_suite.addTest(unittest.makeSuite(TestVectorEngine))
+    test_suite.addTest(unittest.makeSuite(TestSessionStatistics))
+    test_suite.addTest(unittest.makeSuite(TestReportCache))
+    test_suite.addTest(unittest.makeSuite(TestIncrementalReport))
+    test_suite.addTest(unittest.makeSuite(TestBackgroundTask))
+    
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(test_suite)